@@ -0,0 +1,156 @@
+"""
+Асинхронная запись журнала активности.
+
+События складываются в ограниченную очередь и записываются фоновым потоком пачками
+в таблицы по месяцам. Если база данных недоступна или очередь переполнена,
+события пишутся в локальные сжатые файлы с ротацией, чтобы не задерживать запросы.
+"""
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from collections import defaultdict
+from logging.handlers import RotatingFileHandler
+
+from django.conf import settings
+from django.db import connection, DatabaseError
+from django.utils import timezone
+
+from activity.partitions import ensure_partition, month_key
+
+
+def _gzip_namer(name):
+    return f'{name}.gz'
+
+
+def _gzip_rotator(source, destination):
+    with open(source, 'rb') as source_file, gzip.open(destination, 'wb') as destination_file:
+        shutil.copyfileobj(source_file, destination_file)
+    os.remove(source)
+
+
+class ActivityWriter:
+    def __init__(self):
+        self._queue = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._fallback = None
+
+    @property
+    def queue(self):
+        if self._queue is None:
+            with self._lock:
+                if self._queue is None:
+                    self._queue = queue.Queue(maxsize=settings.ACTIVITY_LOG_QUEUE_SIZE)
+        return self._queue
+
+    def log(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.write_fallback([event])
+            return
+        if settings.ACTIVITY_LOG_ASYNC:
+            self._ensure_thread()
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='activity-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + settings.ACTIVITY_LOG_FLUSH_INTERVAL
+            while len(batch) < settings.ACTIVITY_LOG_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self.write(batch)
+            finally:
+                # Поток не обслуживает запросы, поэтому соединение закрывается после каждой пачки
+                connection.close()
+
+    def flush(self):
+        """
+        Записывает всё, что накопилось в очереди, в текущем потоке. Возвращает количество событий.
+        """
+        batch = []
+        while True:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self.write(batch)
+        return len(batch)
+
+    def write(self, batch):
+        by_month = defaultdict(list)
+        for event in batch:
+            by_month[month_key(event['occurred_at'])].append(event)
+        for month, events in by_month.items():
+            try:
+                model = ensure_partition(month)
+                model.objects.bulk_create([model(**event) for event in events])
+            except DatabaseError:
+                logging.getLogger(__name__).exception('Не удалось записать журнал активности в базу данных')
+                self.write_fallback(events)
+
+    def write_fallback(self, events):
+        logger = self._get_fallback_logger()
+        for event in events:
+            logger.info(json.dumps(event, default=str, ensure_ascii=False))
+
+    def _get_fallback_logger(self):
+        if self._fallback is None:
+            with self._lock:
+                if self._fallback is None:
+                    directory = str(settings.ACTIVITY_LOG_FALLBACK_DIR)
+                    os.makedirs(directory, exist_ok=True)
+                    handler = RotatingFileHandler(
+                        os.path.join(directory, 'activity.jsonl'),
+                        maxBytes=settings.ACTIVITY_LOG_FALLBACK_MAX_BYTES,
+                        backupCount=settings.ACTIVITY_LOG_FALLBACK_BACKUP_COUNT,
+                        encoding='utf-8',
+                    )
+                    handler.namer = _gzip_namer
+                    handler.rotator = _gzip_rotator
+                    logger = logging.getLogger('activity.fallback')
+                    logger.setLevel(logging.INFO)
+                    logger.propagate = False
+                    logger.addHandler(handler)
+                    self._fallback = logger
+        return self._fallback
+
+
+writer = ActivityWriter()
+
+
+def log_event(action, user=None, obj=None, object_type='', object_id=None, **payload):
+    """
+    Добавляет событие в журнал активности, не обращаясь к базе данных в текущем потоке.
+    Объект можно передать целиком (obj) или типом и id.
+    """
+    if obj is not None:
+        object_type, object_id = obj._meta.model_name, obj.pk
+    writer.log({
+        'occurred_at': timezone.now(),
+        'user_id': getattr(user, 'pk', None),
+        'action': action,
+        'object_type': object_type,
+        'object_id': object_id,
+        'payload': payload or None,
+    })
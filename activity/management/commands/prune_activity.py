@@ -0,0 +1,21 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from activity.partitions import drop_partitions_before
+
+
+class Command(BaseCommand):
+    help = 'Удаляет таблицы журнала активности за месяцы старше срока хранения'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-months', type=int, default=settings.ACTIVITY_LOG_RETENTION_MONTHS,
+                            help='Сколько последних месяцев хранить, включая текущий')
+
+    def handle(self, *args, **options):
+        today = timezone.now().date()
+        months = today.year * 12 + today.month - 1 - (options['keep_months'] - 1)
+        dropped = drop_partitions_before(date(months // 12, months % 12 + 1, 1))
+        self.stdout.write('Удалены месяцы: ' + (', '.join(f'{month:%Y-%m}' for month in dropped) or 'нет'))
@@ -0,0 +1,19 @@
+from activity.log import log_event
+
+
+class LogUpdateMixin:
+    """
+    Записывает в журнал активности успешное изменение объекта через представление обновления.
+    Действие называется '<модель>.update', в данных события - список изменённых полей.
+    """
+    def update(self, request, *args, **kwargs):
+        response = super().update(request, *args, **kwargs)
+        model_name = self.get_queryset().model._meta.model_name
+        log_event(
+            f'{model_name}.update',
+            request.user,
+            object_type=model_name,
+            object_id=kwargs.get('pk'),
+            fields=sorted(request.data.keys()),
+        )
+        return response
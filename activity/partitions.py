@@ -0,0 +1,142 @@
+"""
+Журнал активности в таблицах по месяцам: activity_event_YYYYMM.
+
+Таблицы создаются по мере необходимости и удаляются целиком по истечении срока хранения.
+Запросы по интервалу времени обращаются только к таблицам нужных месяцев.
+"""
+import threading
+from datetime import date
+
+from django.apps.registry import Apps
+from django.db import connection, models, DatabaseError
+from django.db.models import Count
+
+TABLE_PREFIX = 'activity_event_'
+
+# Отдельный реестр, чтобы модели разделов не попадали в миграции
+partition_apps = Apps()
+_models = {}
+_existing_tables = set()
+_lock = threading.Lock()
+
+
+def month_key(value):
+    """
+    Возвращает первое число месяца для даты или даты-времени.
+    """
+    return date(value.year, value.month, 1)
+
+
+def next_month(month):
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def table_name(month):
+    return f'{TABLE_PREFIX}{month:%Y%m}'
+
+
+def get_partition_model(month):
+    """
+    Возвращает модель таблицы событий за месяц.
+    """
+    month = month_key(month)
+    with _lock:
+        model = _models.get(month)
+        if model is None:
+            suffix = f'{month:%Y%m}'
+
+            class Meta:
+                app_label = 'activity'
+                apps = partition_apps
+                db_table = table_name(month)
+                managed = False
+                indexes = [
+                    models.Index(fields=['occurred_at'], name=f'activity_{suffix}_time'),
+                    models.Index(fields=['action', 'occurred_at'], name=f'activity_{suffix}_action'),
+                ]
+
+            model = type(f'ActivityEvent{suffix}', (models.Model,), {
+                '__module__': __name__,
+                'Meta': Meta,
+                'id': models.BigAutoField(primary_key=True),
+                'occurred_at': models.DateTimeField(),
+                'user_id': models.BigIntegerField(null=True),
+                'action': models.CharField(max_length=50),
+                'object_type': models.CharField(max_length=30, blank=True),
+                'object_id': models.BigIntegerField(null=True),
+                'payload': models.JSONField(null=True),
+            })
+            _models[month] = model
+        return model
+
+
+def list_partitions():
+    """
+    Возвращает отсортированный список месяцев, для которых есть таблицы.
+    """
+    months = []
+    for name in connection.introspection.table_names():
+        if name.startswith(TABLE_PREFIX):
+            suffix = name[len(TABLE_PREFIX):]
+            if len(suffix) == 6 and suffix.isdigit():
+                months.append(date(int(suffix[:4]), int(suffix[4:]), 1))
+    return sorted(months)
+
+
+def ensure_partition(month):
+    """
+    Создаёт таблицу за месяц, если её ещё нет, и возвращает её модель.
+    """
+    model = get_partition_model(month)
+    name = model._meta.db_table
+    if name in _existing_tables:
+        return model
+    if name not in connection.introspection.table_names():
+        try:
+            with connection.schema_editor() as schema_editor:
+                schema_editor.create_model(model)
+        except DatabaseError:
+            # Таблицу мог одновременно создать другой процесс
+            if name not in connection.introspection.table_names():
+                raise
+    _existing_tables.add(name)
+    return model
+
+
+def drop_partitions_before(month):
+    """
+    Удаляет таблицы за месяцы раньше указанного. Возвращает список удалённых месяцев.
+    """
+    dropped = []
+    for partition in list_partitions():
+        if partition >= month_key(month):
+            break
+        model = get_partition_model(partition)
+        with connection.schema_editor() as schema_editor:
+            schema_editor.delete_model(model)
+        _existing_tables.discard(model._meta.db_table)
+        dropped.append(partition)
+    return dropped
+
+
+def partitions_between(start, end):
+    """
+    Возвращает существующие таблицы, пересекающиеся с интервалом [start, end).
+    """
+    first, last = month_key(start), month_key(end)
+    return [month for month in list_partitions() if first <= month <= last]
+
+
+def count_events(start, end, action=None, group_by='action'):
+    """
+    Считает события за интервал [start, end) с группировкой по полю.
+    Запрос выполняется только по таблицам месяцев, попадающих в интервал.
+    """
+    totals = {}
+    for month in partitions_between(start, end):
+        queryset = get_partition_model(month).objects.filter(occurred_at__gte=start, occurred_at__lt=end)
+        if action:
+            queryset = queryset.filter(action=action)
+        for key, total in queryset.values_list(group_by).annotate(total=Count('id')).order_by():
+            totals[key] = totals.get(key, 0) + total
+    return totals
@@ -0,0 +1,113 @@
+import json
+import os
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from activity.log import writer
+from activity.partitions import list_partitions, drop_partitions_before, count_events, TABLE_PREFIX
+from courses.models import Section
+from users.models import User
+
+
+def event(year, month, action='material.view', user_id=1):
+    return {
+        'occurred_at': datetime(year, month, 15, tzinfo=dt_timezone.utc),
+        'user_id': user_id,
+        'action': action,
+        'object_type': 'material',
+        'object_id': 1,
+        'payload': None,
+    }
+
+
+class ActivityLogTestCase(TransactionTestCase):
+    def setUp(self):
+        """
+        Настройка тестового окружения: синхронная запись журнала и временный каталог для резервных файлов.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        settings_override = override_settings(ACTIVITY_LOG_ASYNC=False, ACTIVITY_LOG_FALLBACK_DIR=self.directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # События, накопленные другими тестами, записываются и удаляются вместе с таблицами
+        writer.flush()
+        drop_partitions_before(datetime(9999, 1, 1))
+
+    def tearDown(self):
+        drop_partitions_before(datetime(9999, 1, 1))
+
+    def test_events_written_to_month_partitions(self):
+        """
+        Проверяет, что события попадают в таблицы своих месяцев, а подсчёт за месяц
+        обращается только к его таблице.
+        """
+        for item in (event(2026, 1), event(2026, 1, 'exam.submit'), event(2026, 2), event(2026, 3)):
+            writer.log(item)
+        self.assertEqual(writer.flush(), 4)
+        self.assertEqual([f'{month:%Y%m}' for month in list_partitions()], ['202601', '202602', '202603'])
+
+        start = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+        end = datetime(2026, 1, 31, tzinfo=dt_timezone.utc)
+        with CaptureQueriesContext(connection) as queries:
+            totals = count_events(start, end)
+        self.assertEqual(totals, {'material.view': 1, 'exam.submit': 1})
+        scanned = {name for query in queries for name in ('202601', '202602', '202603')
+                   if f'{TABLE_PREFIX}{name}' in query['sql']}
+        self.assertEqual(scanned, {'202601'})
+
+    def test_prune_drops_whole_partitions(self):
+        """
+        Проверяет, что очистка по сроку хранения удаляет таблицы старых месяцев целиком.
+        """
+        for item in (event(2020, 1), event(2020, 2), event(2026, 10)):
+            writer.log(item)
+        writer.flush()
+        with mock.patch('django.utils.timezone.now', return_value=datetime(2026, 10, 19, tzinfo=dt_timezone.utc)):
+            call_command('prune_activity', keep_months=3, stdout=open(os.devnull, 'w'))
+        self.assertEqual([f'{month:%Y%m}' for month in list_partitions()], ['202610'])
+
+    def test_fallback_to_files_when_database_fails(self):
+        """
+        Проверяет, что при ошибке базы данных события сохраняются в резервный файл.
+        """
+        writer.log(event(2026, 5))
+        with mock.patch('activity.log.ensure_partition', side_effect=DatabaseError('unavailable')), \
+                self.assertLogs('activity.log', level='ERROR'):
+            writer.flush()
+        with open(os.path.join(self.directory.name, 'activity.jsonl'), encoding='utf-8') as file:
+            self.assertEqual(json.loads(file.readline())['action'], 'material.view')
+
+    def test_update_view_logged(self):
+        """
+        Проверяет, что изменение раздела через API записывается в журнал активности.
+        """
+        user = User.objects.create(email='testuser@example.com', password='testpass123412')
+        section = Section.objects.create(title='Test Section', owner=user)
+        client = APIClient()
+        client.force_authenticate(user=user)
+        response = client.put(f'/courses/sections/{section.id}/update/', {'title': 'Updated', 'is_public': True})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        writer.flush()
+        totals = count_events(datetime(2000, 1, 1, tzinfo=dt_timezone.utc), datetime(9999, 1, 1, tzinfo=dt_timezone.utc))
+        self.assertEqual(totals, {'section.update': 1})
+
+    def test_stats_rejects_invalid_dates(self):
+        """
+        Проверяет, что статистика отвечает 400 на дату неверного формата и на невозможную дату.
+        """
+        client = APIClient()
+        client.force_authenticate(user=User.objects.create(email='staff@example.com', is_staff=True))
+        for value in ('вчера', '2026-13-45T00:00'):
+            response = client.get('/activity/stats/', {'start': value})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('start', response.data)
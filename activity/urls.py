@@ -0,0 +1,7 @@
+from django.urls import path
+
+from activity.views import ActivityStatsAPIView
+
+urlpatterns = [
+    path('stats/', ActivityStatsAPIView.as_view(), name='activity_stats'),
+]
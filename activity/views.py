@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import permissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from activity.partitions import count_events, partitions_between
+
+GROUP_FIELDS = ('action', 'object_type', 'user_id')
+
+
+class ActivityStatsAPIView(APIView):
+    """
+    API для получения статистики журнала активности за интервал времени.
+    Доступно только персоналу. По умолчанию - за последние 30 дней с группировкой по действию.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        end = self._parse(request.query_params.get('end'), 'end') or timezone.now()
+        start = self._parse(request.query_params.get('start'), 'start') or end - timedelta(days=30)
+        group_by = request.query_params.get('group_by', 'action')
+        if group_by not in GROUP_FIELDS:
+            raise ValidationError({'group_by': f'Допустимые значения: {", ".join(GROUP_FIELDS)}.'})
+
+        totals = count_events(start, end, action=request.query_params.get('action'), group_by=group_by)
+        return Response({
+            'start': start,
+            'end': end,
+            'partitions': [f'{month:%Y-%m}' for month in partitions_between(start, end)],
+            'totals': totals,
+        })
+
+    def _parse(self, value, name):
+        if not value:
+            return None
+        try:
+            parsed = parse_datetime(value)
+        except ValueError:
+            # Формат верный, но дата невозможна, например 2026-13-45T00:00
+            parsed = None
+        if parsed is None:
+            raise ValidationError({name: 'Неверный формат даты и времени.'})
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
@@ -0,0 +1,45 @@
+"""
+Быстрый рендерер JSON для API.
+
+Если установлен orjson, ответы кодируются им, иначе используется стандартный json из DRF.
+Даты, Decimal, ленивые строки переводов и прочие типы, которые orjson не знает
+или кодирует иначе, передаются в DRF JSONEncoder.default, поэтому ответ совпадает
+с ответом стандартного рендерера.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    # Даты кодируются через DRF: без перевода смещения +00:00 в Z и с другим числом знаков orjson их отдаёт иначе
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Рендерер JSON на orjson с запасным вариантом на стандартной библиотеке.
+    Стандартный рендерер используется, если orjson не установлен, если запрошен отступ
+    или настройки UNICODE_JSON и COMPACT_JSON отличаются от значений по умолчанию,
+    а также если orjson не смог закодировать данные (например, слишком большое целое).
+    NaN и бесконечность orjson кодирует как null.
+    """
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Как и стандартный рендерер, экранируем \u2028 и \u2029, чтобы ответ был корректным JavaScript
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
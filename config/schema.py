@@ -0,0 +1,164 @@
+"""
+Заранее сгенерированная схема OpenAPI.
+
+Схема строится командой generate_openapi_schema при сборке или развёртывании
+и отдаётся как статический файл с ETag и готовой gzip-версией.
+drf_yasg импортируется только при генерации схемы.
+"""
+import gzip
+import hashlib
+import os
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse, Http404
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+from django.utils.html import escape
+
+SCHEMA_INFO = {
+    'title': 'Self-education API',
+    'default_version': 'v1',
+    'description': 'API для проекта самообучения',
+    'terms_of_service': 'https://www.google.com/policies/terms/',
+    'contact_email': 'contact@snippets.local',
+    'license_name': 'BSD License',
+}
+
+_lock = threading.Lock()
+_loaded = {}
+
+
+def get_schema_path():
+    return str(settings.OPENAPI_SCHEMA_PATH)
+
+
+def build_schema():
+    """
+    Строит схему по всем представлениям проекта и возвращает её в виде JSON.
+    """
+    from drf_yasg import openapi
+    from drf_yasg.codecs import OpenAPICodecJson
+    from drf_yasg.generators import OpenAPISchemaGenerator
+
+    info = openapi.Info(
+        title=SCHEMA_INFO['title'],
+        default_version=SCHEMA_INFO['default_version'],
+        description=SCHEMA_INFO['description'],
+        terms_of_service=SCHEMA_INFO['terms_of_service'],
+        contact=openapi.Contact(email=SCHEMA_INFO['contact_email']),
+        license=openapi.License(name=SCHEMA_INFO['license_name']),
+    )
+    generator = OpenAPISchemaGenerator(info=info)
+    schema = generator.get_schema(request=None, public=True)
+    return OpenAPICodecJson(validators=[]).encode(schema)
+
+
+def write_schema(path=None):
+    """
+    Генерирует схему и записывает её вместе со сжатой копией (.gz).
+    Файлы заменяются атомарно, чтобы работающие процессы не прочитали их частично.
+    """
+    path = path or get_schema_path()
+    content = build_schema()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    for target, data in ((path, content), (f'{path}.gz', gzip.compress(content, mtime=0))):
+        temporary = f'{target}.tmp'
+        with open(temporary, 'wb') as file:
+            file.write(data)
+        os.replace(temporary, target)
+    return content
+
+
+def load_schema():
+    """
+    Возвращает (json, gzip, etag) для файла схемы. Файлы перечитываются только при изменении.
+    """
+    path = get_schema_path()
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    with _lock:
+        if _loaded.get('key') != (path, mtime):
+            with open(path, 'rb') as file:
+                content = file.read()
+            try:
+                with open(f'{path}.gz', 'rb') as file:
+                    compressed = file.read()
+            except FileNotFoundError:
+                compressed = gzip.compress(content, mtime=0)
+            _loaded.update(
+                key=(path, mtime),
+                schema=(content, compressed, '"%s"' % hashlib.sha256(content).hexdigest()[:32]),
+            )
+        return _loaded['schema']
+
+
+def schema_json_view(request):
+    """
+    Отдаёт файл схемы. Поддерживает If-None-Match и сжатие gzip.
+    """
+    schema = load_schema()
+    if schema is None:
+        raise Http404('Схема не сгенерирована: выполните manage.py generate_openapi_schema')
+    content, compressed, etag = schema
+
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponse(status=304)
+    elif 'gzip' in request.headers.get('Accept-Encoding', ''):
+        response = HttpResponse(compressed, content_type='application/json')
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(content, content_type='application/json')
+    response['ETag'] = etag
+    response['Cache-Control'] = f'public, max-age={settings.OPENAPI_SCHEMA_MAX_AGE}'
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+SWAGGER_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+  <meta charset="utf-8">
+  <title>%(title)s</title>
+  <link rel="stylesheet" href="%(css)s">
+</head>
+<body>
+  <div id="swagger-ui"></div>
+  <script src="%(js)s"></script>
+  <script>SwaggerUIBundle({url: "%(schema_url)s", dom_id: "#swagger-ui"});</script>
+</body>
+</html>
+"""
+
+REDOC_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+  <meta charset="utf-8">
+  <title>%(title)s</title>
+</head>
+<body>
+  <redoc spec-url="%(schema_url)s"></redoc>
+  <script src="%(js)s"></script>
+</body>
+</html>
+"""
+
+
+def swagger_ui_view(request):
+    return HttpResponse(SWAGGER_PAGE % {
+        'title': escape(SCHEMA_INFO['title']),
+        'css': static('drf-yasg/swagger-ui-dist/swagger-ui.css'),
+        'js': static('drf-yasg/swagger-ui-dist/swagger-ui-bundle.js'),
+        'schema_url': reverse('schema-json'),
+    })
+
+
+def redoc_view(request):
+    return HttpResponse(REDOC_PAGE % {
+        'title': escape(SCHEMA_INFO['title']),
+        'js': static('drf-yasg/redoc/redoc.min.js'),
+        'schema_url': reverse('schema-json'),
+    })
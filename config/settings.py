@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 import os
+import sys
 from datetime import timedelta
 from pathlib import Path
 from dotenv import load_dotenv
@@ -30,6 +31,8 @@ DEBUG = os.getenv('DEBUG')
 
 ALLOWED_HOSTS = []
 
+TESTING = sys.argv[1:2] == ['test']
+
 
 # Application definition
 
@@ -48,10 +51,16 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt',
     'corsheaders',
     'exams',
+    'activity',
+    'tenants',
+    'webhooks',
+    'jobs',
+    'profiling',
 
 ]
 
 MIDDLEWARE = [
+    'profiling.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -60,6 +69,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'tenants.middleware.TenantMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -97,6 +107,16 @@ DATABASES = {
     }
 }
 
+# Школы, строки которых хранятся в отдельных базах: TENANT_DATABASES=school-a:school_a,school-b:school_b.
+# Отдельная база подключается с параметрами default, имя берётся из DATABASE_NAME_<ПСЕВДОНИМ>
+TENANT_DATABASES = dict(item.split(':', 1) for item in os.getenv('TENANT_DATABASES', '').split(',') if item)
+# В тестах подключаются две дополнительные базы, чтобы проверить размещение строк школ
+TEST_TENANT_DATABASES = ['tenant_a', 'tenant_b'] if TESTING else []
+for alias in [*TENANT_DATABASES.values(), *TEST_TENANT_DATABASES]:
+    DATABASES.setdefault(alias, {**DATABASES['default'], 'NAME': os.getenv(f'DATABASE_NAME_{alias.upper()}', alias)})
+
+DATABASE_ROUTERS = ['tenants.routers.TenantRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -142,8 +162,25 @@ AUTH_USER_MODEL = 'users.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+        'users.authentication.RevocableJWTAuthentication',
+    ),
+    # JSON кодируется и разбирается через orjson, если он установлен
+    'DEFAULT_RENDERER_CLASSES': (
+        'config.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'config.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+    # Частота для courses.throttling задаётся по ключу '<throttle_scope>.<ip|user|exam>'
+    'DEFAULT_THROTTLE_RATES': {
+        'submit.user': '30/min',
+        'submit.exam': '5/min',
+        'token.ip': '10/min',
+        'register.ip': '5/hour',
+    },
 }
 
 SIMPLE_JWT = {
@@ -174,8 +211,16 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_EXP_CLAIM': 'refresh_exp',
     'SLIDING_TOKEN_LIFETIME': timedelta(minutes=50),
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
+
+    'TOKEN_REFRESH_SERIALIZER': 'users.serializers.RevocableTokenRefreshSerializer',
 }
 
+# Отзыв токенов (users.revocation): как часто снимок отзывов в памяти процесса синхронизируется с базой,
+# минимальная ёмкость фильтра Блума и допустимая доля ложных срабатываний, требующих запроса к базе
+TOKEN_REVOCATION_SYNC_INTERVAL = 30
+TOKEN_REVOCATION_BLOOM_CAPACITY = 10000
+TOKEN_REVOCATION_BLOOM_ERROR_RATE = 0.001
+
 CORS_ALLOWED_ORIGINS = [
     "https://read-only.example.com",
     "https://read-and-write.example.com",
@@ -184,3 +229,103 @@ CORS_ALLOWED_ORIGINS = [
 CSRF_TRUSTED_ORIGINS = [
     "https://read-and-write.example.com",
 ]
+
+# Кодек сжатия содержимого материалов: 'zlib', 'lzma' или 'none'
+MATERIAL_CONTENT_CODEC = 'zlib'
+
+# Кеш отрисованного HTML материалов: число записей в памяти процесса и время жизни в кеше Django
+MATERIAL_RENDER_CACHE_SIZE = 256
+MATERIAL_RENDER_CACHE_TIMEOUT = 60 * 60 * 24
+
+# История материалов: каждая N-я версия хранится целиком, остальные - разницей с предыдущей
+MATERIAL_REVISION_SNAPSHOT_INTERVAL = 10
+
+# Вложения материалов: каталог хранилища, ограничения размера файла и одной части загрузки,
+# время жизни незавершённой загрузки в секундах и отдача файлов веб-сервером:
+# None - отдаёт Django, 'x-accel-redirect' - nginx (internal location ATTACHMENT_ACCEL_PREFIX), 'x-sendfile' - Apache
+ATTACHMENT_ROOT = BASE_DIR / 'var' / 'attachments'
+ATTACHMENT_MAX_SIZE = 512 * 1024 * 1024
+ATTACHMENT_MAX_CHUNK_SIZE = 8 * 1024 * 1024
+ATTACHMENT_UPLOAD_MAX_AGE = 60 * 60 * 24
+ATTACHMENT_SENDFILE = None
+ATTACHMENT_ACCEL_PREFIX = '/protected/attachments/'
+
+# Минимальная оценка сходства материалов (коэффициент Жаккара по шинглам) для отчёта о похожих материалах
+MATERIAL_SIMILARITY_THRESHOLD = 0.8
+
+# Заранее сгенерированная схема OpenAPI (manage.py generate_openapi_schema)
+OPENAPI_SCHEMA_PATH = BASE_DIR / 'var' / 'openapi.json'
+OPENAPI_SCHEMA_MAX_AGE = 60 * 5
+
+# Буфер событий прогресса: максимум различных пар пользователь - материал и период сброса в секундах
+PROGRESS_BUFFER_MAX_SIZE = 10000
+PROGRESS_FLUSH_INTERVAL = 5
+
+# Уведомления интеграторов: событий в одном запросе, число попыток, задержка между попытками
+# в секундах (удваивается с каждой попыткой до максимума), таймаут запроса и число параллельных отправок
+WEBHOOK_BATCH_SIZE = 50
+WEBHOOK_MAX_ATTEMPTS = 8
+WEBHOOK_RETRY_BASE_DELAY = 30
+WEBHOOK_RETRY_MAX_DELAY = 60 * 60
+WEBHOOK_TIMEOUT = 10
+WEBHOOK_WORKERS = 4
+WEBHOOK_POLL_INTERVAL = 5
+
+# Кеш Django хранит состояние прохождений тестов (exams.sessions), счётчики ограничения частоты запросов
+# и отрисованные материалы. Он должен быть общим для всех процессов (веб-процессы и run_workers),
+# поэтому в рабочем окружении нужен Redis: REDIS_URL=redis://localhost:6379/0 и пакет redis.
+# LocMemCache без REDIS_URL подходит только для разработки с одним процессом (manage.py check --deploy предупреждает)
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': REDIS_URL}}
+else:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+# Прохождение тестов с ограничением времени: как часто автосохранения из кеша записываются в базу
+# и сколько секунд после срока ещё принимаются ответы (задержка сети)
+EXAM_SESSION_FLUSH_INTERVAL = 30
+EXAM_SESSION_GRACE = 10
+
+# Фоновые задачи (manage.py run_workers): число процессов, пауза между проверками очереди,
+# попытки и задержка перед повтором (удваивается с каждой попыткой), время, после которого
+# незавершённая задача возвращается в очередь, и ограничение одновременных задач по очередям
+JOB_WORKER_PROCESSES = 2
+JOB_POLL_INTERVAL = 1
+JOB_DEFAULT_MAX_ATTEMPTS = 3
+JOB_RETRY_DELAY = 10
+JOB_LOCK_TIMEOUT = 60 * 30
+JOB_QUEUE_CONCURRENCY = {
+    'purge': 1,
+    'webhooks': 1,
+}
+# Периодические задачи, которые run_workers ставит в очередь сам: имя задачи - интервал в секундах.
+# Для доставки событий с меньшей задержкой можно вместо задачи запустить команду deliver_webhooks
+JOB_SCHEDULE = {
+    'webhooks.deliver': 60,
+    'exams.finish_expired_sessions': 60 * 5,
+    'courses.purge_deleted_sections': 60 * 10,
+    'courses.collect_attachments': 60 * 60 * 24,
+    'users.prune_revoked_tokens': 60 * 60,
+}
+
+# Журнал активности: асинхронная запись пачками в таблицы по месяцам
+# При запуске тестов фоновый поток не запускается, события записываются вызовом writer.flush()
+ACTIVITY_LOG_ASYNC = not TESTING
+ACTIVITY_LOG_QUEUE_SIZE = 10000
+ACTIVITY_LOG_BATCH_SIZE = 500
+ACTIVITY_LOG_FLUSH_INTERVAL = 2
+ACTIVITY_LOG_RETENTION_MONTHS = 12
+# Резервная запись в сжатые файлы с ротацией, если база данных недоступна
+ACTIVITY_LOG_FALLBACK_DIR = BASE_DIR / 'var' / 'activity'
+ACTIVITY_LOG_FALLBACK_MAX_BYTES = 10 * 1024 * 1024
+ACTIVITY_LOG_FALLBACK_BACKUP_COUNT = 10
+
+# Профилирование медленных запросов: доля профилируемых запросов (0 - выключено), порог в секундах,
+# начиная с которого профиль сохраняется, каталог и число хранимых профилей,
+# ограничение числа записанных SQL-запросов и функций в описании профиля
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_SLOW_THRESHOLD = float(os.getenv('PROFILING_SLOW_THRESHOLD', '1'))
+PROFILING_ROOT = BASE_DIR / 'var' / 'profiles'
+PROFILING_MAX_CAPTURES = 200
+PROFILING_MAX_QUERIES = 500
+PROFILING_TOP_FUNCTIONS = 50
@@ -1,16 +1,91 @@
 from django.contrib import admin
-from .models import Section, Material
+from django.contrib.admin.utils import get_fields_from_path
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+from .cloning import clone_section
+from .models import Section, Material, SectionPurge
+from .paginators import EstimatedCountPaginator
+from .tasks import purge_deleted_sections
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Базовые настройки списка для больших таблиц: приблизительное количество строк,
+    без второго подсчёта общего количества и сортировка по первичному ключу.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    ordering = ('-id',)
+
+    # '^' и '=' в search_fields - регистрозависимые startswith и exact. Стандартные istartswith и iexact
+    # на PostgreSQL превращаются в UPPER(...) LIKE UPPER(...) и не используют обычные индексы,
+    # а startswith использует индекс *_like с varchar_pattern_ops, который Django создаёт для db_index
+    SEARCH_LOOKUPS = {'^': 'startswith', '=': 'exact'}
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Ищет строку поиска целиком по полям search_fields через индексы.
+        Поля, для которых строка не является допустимым значением (например, id), пропускаются.
+        """
+        search_fields = self.get_search_fields(request)
+        search_term = search_term.strip()
+        if not search_term or any(field[0] not in self.SEARCH_LOOKUPS for field in search_fields):
+            return super().get_search_results(request, queryset, search_term)
+        condition = Q()
+        for field in search_fields:
+            path = field[1:]
+            try:
+                value = get_fields_from_path(self.model, path)[-1].to_python(search_term)
+            except ValidationError:
+                continue
+            condition |= Q(**{f'{path}__{self.SEARCH_LOOKUPS[field[0]]}': value})
+        # Поиск идёт только по прямым связям, поэтому повторов строк не бывает
+        return (queryset.filter(condition) if condition else queryset.none()), False
 
 
 @admin.register(Section)
-class CourseAdmin(admin.ModelAdmin):
+class CourseAdmin(LargeTableAdmin):
     list_display = ('id', 'title', 'owner', 'is_public')
-    list_filter = ('owner',)
-    search_fields = ('owner', 'title')
+    list_filter = ('is_public',)
+    list_select_related = ('owner',)
+    search_fields = ('=id', '^title', '=owner__email')
+    autocomplete_fields = ('owner',)
+    actions = ('clone_sections',)
+
+    @admin.action(description='Копировать выбранные разделы')
+    def clone_sections(self, request, queryset):
+        for section in queryset:
+            clone_section(section)
+        self.message_user(request, f'Скопировано разделов: {len(queryset)}')
+
+    # Удаление из админки, как и через API, только помечает разделы удалёнными,
+    # а содержимое удаляется порциями фоновой задачей очистки
+
+    def get_deleted_objects(self, objs, request):
+        # Дерево связанных объектов не собирается: сейчас удаляются только сами разделы
+        objs = list(objs)
+        return [str(obj) for obj in objs], {self.opts.verbose_name_plural: len(objs)}, set(), []
+
+    def delete_model(self, request, obj):
+        self.delete_queryset(request, [obj])
+
+    def delete_queryset(self, request, queryset):
+        for section in queryset:
+            section.soft_delete()
+            transaction.on_commit(purge_deleted_sections.enqueue, using=section._state.db)
 
 
 @admin.register(Material)
-class ClientAdmin(admin.ModelAdmin):
+class ClientAdmin(LargeTableAdmin):
     list_display = ('id', 'title', 'owner', 'is_public', 'section')
-    list_filter = ('owner', 'section')
-    search_fields = ('owner', 'title', 'section')
\ No newline at end of file
+    list_filter = ('is_public',)
+    list_select_related = ('owner', 'section')
+    search_fields = ('=id', '^title', '=owner__email', '^section__title')
+    autocomplete_fields = ('owner', 'section')
+
+
+@admin.register(SectionPurge)
+class SectionPurgeAdmin(admin.ModelAdmin):
+    list_display = ('id', 'section_id', 'stage', 'deleted_rows', 'created_at', 'finished_at')
+    list_filter = ('stage',)
@@ -0,0 +1,257 @@
+"""
+Хранение вложений материалов в файловой системе по хешу содержимого.
+
+Файл с хешем SHA-256 h хранится в ATTACHMENT_ROOT/h[:2]/h[2:4]/h, поэтому повторная загрузка
+того же файла не занимает места. Загрузка идёт частями: каждая часть записывается во временный
+файл по своему смещению, так что повтор части после обрыва безопасен, а клиент продолжает
+с received. После получения последней части файл добавляется в хранилище жёсткой ссылкой,
+а временный файл удаляется после создания вложения.
+
+Скачивание отдаётся веб-сервером через X-Accel-Redirect (nginx) или X-Sendfile (Apache),
+если это включено в ATTACHMENT_SENDFILE, иначе - потоком из файла. Диапазоны (Range)
+отдаются из файла, отображённого в память через mmap.
+"""
+import hashlib
+import mmap
+import os
+import re
+import time
+from datetime import timedelta
+from pathlib import Path
+from urllib.parse import quote
+
+from django.conf import settings
+from django.db import router, transaction
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+
+from courses.models import Attachment, AttachmentUpload
+from courses.streaming import RangeNotSatisfiable, parse_range_header
+from tenants.context import get_tenant_databases
+
+CHUNK_SIZE = 64 * 1024
+# Файлы хранилища моложе этого числа секунд не удаляются: вложение на них ещё может создаваться
+BLOB_GRACE_PERIOD = 60
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+
+class UploadError(Exception):
+    pass
+
+
+class UploadOffsetMismatch(UploadError):
+    def __init__(self, received):
+        super().__init__(f'Ожидается часть, начинающаяся с байта {received}.')
+        self.received = received
+
+
+def get_root():
+    return Path(settings.ATTACHMENT_ROOT)
+
+
+def get_blob_path(sha256):
+    return get_root() / sha256[:2] / sha256[2:4] / sha256
+
+
+def get_upload_path(upload_id):
+    return get_root() / 'uploads' / str(upload_id)
+
+
+def parse_content_range(header):
+    """
+    Разбирает заголовок Content-Range части загрузки. Возвращает (начало, конец включительно, размер).
+    """
+    match = CONTENT_RANGE_RE.match((header or '').strip())
+    if match is None:
+        raise UploadError('Нужен заголовок Content-Range: bytes начало-конец/размер.')
+    start, end, total = map(int, match.groups())
+    if end < start:
+        raise UploadError('Неверный диапазон Content-Range.')
+    return start, end, total
+
+
+def write_chunk(upload, stream, start, end, total):
+    """
+    Записывает часть загрузки из потока запроса в её место во временном файле.
+    Часть должна начинаться с уже полученного смещения или раньше него (повтор после обрыва).
+    Возвращает новое значение received.
+    """
+    if total != upload.size or end >= upload.size:
+        raise UploadError(f'Размер файла - {upload.size} байт.')
+    if start > upload.received:
+        raise UploadOffsetMismatch(upload.received)
+    if end - start + 1 > settings.ATTACHMENT_MAX_CHUNK_SIZE:
+        raise UploadError(f'Часть больше {settings.ATTACHMENT_MAX_CHUNK_SIZE} байт.')
+
+    path = get_upload_path(upload.pk)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT, 0o600)
+    try:
+        offset = start
+        remaining = end - start + 1
+        while remaining:
+            data = stream.read(min(CHUNK_SIZE, remaining))
+            if not data:
+                break
+            os.pwrite(fd, data, offset)
+            offset += len(data)
+            remaining -= len(data)
+    finally:
+        os.close(fd)
+    if remaining:
+        raise UploadError('Тело запроса короче диапазона Content-Range.')
+
+    received = max(upload.received, end + 1)
+    using = router.db_for_write(AttachmentUpload, instance=upload)
+    # Условное обновление: параллельный запрос с той же частью не уменьшит received
+    AttachmentUpload.objects.using(using).filter(pk=upload.pk, received__lt=received).update(
+        received=received, updated_at=timezone.now()
+    )
+    upload.received = received
+    return received
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _store_blob(path, sha256):
+    """
+    Добавляет временный файл в хранилище жёсткой ссылкой, не удаляя его.
+    Если такой файл уже хранится, используется он. В обоих случаях время изменения файла
+    обновляется, чтобы сборка мусора не удалила его до создания вложения (см. BLOB_GRACE_PERIOD).
+    """
+    blob_path = get_blob_path(sha256)
+    while True:
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(path, blob_path)
+        except FileExistsError:
+            pass
+        try:
+            os.utime(blob_path)
+        except FileNotFoundError:
+            # Ненужный файл удалила сборка мусора между проверками, добавляем заново
+            continue
+        return blob_path
+
+
+def complete_upload(upload):
+    """
+    Добавляет полностью полученный файл в хранилище и создаёт вложение.
+    Файл хешируется и попадает в хранилище до транзакции, а временный файл удаляется только
+    после её фиксации: если вложение не создалось, загрузку можно завершить повторно.
+    Загрузку завершает только тот запрос, который удалил её строку, для параллельного повтора
+    последней части возвращается None.
+    """
+    using = router.db_for_write(AttachmentUpload, instance=upload)
+    path = get_upload_path(upload.pk)
+    try:
+        sha256 = hash_file(path)
+    except FileNotFoundError:
+        # Временный файл удалил параллельный запрос, который уже завершил загрузку
+        return None
+    _store_blob(path, sha256)
+    with transaction.atomic(using=using):
+        deleted, _ = AttachmentUpload.objects.using(using).filter(pk=upload.pk).delete()
+        if not deleted:
+            return None
+        attachment = Attachment.objects.using(using).create(
+            material_id=upload.material_id,
+            owner_id=upload.owner_id,
+            filename=upload.filename,
+            content_type=upload.content_type,
+            size=upload.size,
+            sha256=sha256,
+        )
+        transaction.on_commit(lambda: path.unlink(missing_ok=True), using=using)
+    return attachment
+
+
+def _iter_mmap(path, start, end):
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        view = memoryview(mapped)
+        try:
+            for offset in range(start, end + 1, CHUNK_SIZE):
+                yield bytes(view[offset:min(offset + CHUNK_SIZE, end + 1)])
+        finally:
+            view.release()
+
+
+def _content_disposition(filename):
+    return f"attachment; filename*=UTF-8''{quote(filename)}"
+
+
+def attachment_response(request, attachment):
+    """
+    Формирует ответ со скачиванием вложения с поддержкой If-None-Match и Range.
+    """
+    etag = f'"{attachment.sha256}"'
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponse(status=304)
+        response['ETag'] = etag
+        return response
+
+    path = get_blob_path(attachment.sha256)
+    mode = settings.ATTACHMENT_SENDFILE
+    if mode == 'x-accel-redirect':
+        response = HttpResponse(content_type=attachment.content_type)
+        response['X-Accel-Redirect'] = settings.ATTACHMENT_ACCEL_PREFIX + str(path.relative_to(get_root()))
+    elif mode == 'x-sendfile':
+        response = HttpResponse(content_type=attachment.content_type)
+        response['X-Sendfile'] = str(path)
+    else:
+        try:
+            byte_range = parse_range_header(request.headers.get('Range'), attachment.size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{attachment.size}'
+            return response
+        if request.headers.get('If-Range', etag) != etag:
+            byte_range = None
+        if byte_range is None:
+            response = FileResponse(open(path, 'rb'), content_type=attachment.content_type)
+        else:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                _iter_mmap(path, start, end), content_type=attachment.content_type, status=206
+            )
+            response['Content-Range'] = f'bytes {start}-{end}/{attachment.size}'
+            response['Content-Length'] = end - start + 1
+        response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Content-Disposition'] = _content_disposition(attachment.filename)
+    return response
+
+
+def collect_garbage(upload_max_age=None, now=None):
+    """
+    Удаляет файлы хранилища, на которые не ссылается ни одно вложение во всех базах школ,
+    и временные файлы загрузок, которых больше нет или которые не обновлялись дольше upload_max_age секунд.
+    Возвращает (удалено файлов хранилища, удалено загрузок).
+    """
+    now = now or timezone.now()
+    upload_max_age = settings.ATTACHMENT_UPLOAD_MAX_AGE if upload_max_age is None else upload_max_age
+    referenced, uploads = set(), set()
+    for using in get_tenant_databases():
+        referenced.update(Attachment.objects.using(using).values_list('sha256', flat=True).distinct())
+        expired = AttachmentUpload.objects.using(using).filter(updated_at__lt=now - timedelta(seconds=upload_max_age))
+        expired.delete()
+        uploads.update(str(pk) for pk in AttachmentUpload.objects.using(using).values_list('pk', flat=True))
+
+    root = get_root()
+    removed_blobs = removed_uploads = 0
+    for path in root.glob('??/??/*'):
+        # Файл, добавленный или использованный повторно только что, мог ещё не попасть в базу
+        if path.name not in referenced and path.stat().st_mtime < time.time() - BLOB_GRACE_PERIOD:
+            path.unlink()
+            removed_blobs += 1
+    for path in (root / 'uploads').glob('*'):
+        if path.name not in uploads:
+            path.unlink()
+            removed_uploads += 1
+    return removed_blobs, removed_uploads
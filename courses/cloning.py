@@ -0,0 +1,104 @@
+"""
+Копирование раздела со всем содержимым: материалами, их сигнатурами для поиска похожих,
+тестами, вопросами и ответами.
+
+Каждый уровень дерева читается одним values_list() с отбором по исходному разделу через соединение
+таблиц (а не по списку id, который упёрся бы в ограничение числа параметров запроса) и записывается
+одним bulk_create(). Соответствие старых id новым хранится в памяти и подставляется во внешние ключи
+следующего уровня.
+Копии материалов начинают историю со снимка скопированного содержимого, вложения копируются
+только строками: файлы хранятся по хешу содержимого и остаются общими.
+Число запросов не зависит от размера раздела (на SQLite bulk_create дополнительно делится
+на порции из-за ограничения числа параметров запроса). Прогресс, повторения и прохождения тестов
+пользователей не копируются.
+"""
+from django.db import models, transaction
+
+from courses.fields import decompress_text
+from courses.models import Section, Material, MaterialSignature, MaterialBand, MaterialRevision, Attachment
+from exams.models import Exam, Question, Answer
+
+
+def _copy_fields(model):
+    return [
+        field for field in model._meta.concrete_fields
+        if not (field.primary_key and isinstance(field, models.AutoField))
+    ]
+
+
+def clone_rows(model, queryset, parent_attname, parent_ids, using, **overrides):
+    """
+    Копирует строки queryset, заменяя внешний ключ parent_attname по соответствию parent_ids
+    и поля из overrides. Возвращает соответствие {старый id: новый id}.
+    """
+    fields = _copy_fields(model)
+    attnames = [field.attname for field in fields]
+    rows = list(queryset.order_by('pk').values_list('pk', *attnames))
+    objects = []
+    for pk, *values in rows:
+        data = dict(zip(attnames, values))
+        data[parent_attname] = parent_ids[data[parent_attname]]
+        data.update(overrides)
+        objects.append(model(**data))
+    model._base_manager.db_manager(using).bulk_create(objects)
+    return {row[0]: obj.pk for row, obj in zip(rows, objects)}
+
+
+def _snapshot_rows(section_id, using):
+    rows = Material.all_objects.using(using).filter(section_id=section_id).values_list(
+        'pk', 'content', 'owner_id'
+    )
+    return [(pk, content, owner_id, len(decompress_text(content))) for pk, content, owner_id in rows]
+
+
+def clone_section(section, owner=None, title=None):
+    """
+    Копирует раздел в одной транзакции в той же базе. Если указан owner, он становится владельцем
+    раздела и всего содержимого. Возвращает новый раздел.
+    """
+    using = section._state.db
+    owner_overrides = {'owner_id': owner.pk} if owner is not None else {}
+    with transaction.atomic(using=using):
+        clone = Section.objects.db_manager(using).create(
+            title=title or f'{section.title} (копия)',
+            description=section.description,
+            owner_id=owner.pk if owner is not None else section.owner_id,
+            tenant=section.tenant,
+            is_public=section.is_public,
+        )
+        material_ids = clone_rows(
+            Material, Material.all_objects.using(using).filter(section_id=section.pk),
+            'section_id', {section.pk: clone.pk}, using, **owner_overrides
+        )
+        # Содержимое хранится сжатым так же, как снимок версии, поэтому байты копируются без распаковки
+        MaterialRevision.objects.using(using).bulk_create([
+            MaterialRevision(
+                material_id=pk, number=1, is_snapshot=True, data=content, size=size, author_id=owner_id
+            )
+            for pk, content, owner_id, size in _snapshot_rows(clone.pk, using)
+        ])
+        clone_rows(
+            MaterialSignature, MaterialSignature.objects.using(using).filter(material__section_id=section.pk),
+            'material_id', material_ids, using
+        )
+        clone_rows(
+            MaterialBand, MaterialBand.objects.using(using).filter(material__section_id=section.pk),
+            'material_id', material_ids, using
+        )
+        clone_rows(
+            Attachment, Attachment.objects.using(using).filter(material__section_id=section.pk),
+            'material_id', material_ids, using, **owner_overrides
+        )
+        exam_ids = clone_rows(
+            Exam, Exam.all_objects.using(using).filter(material__section_id=section.pk),
+            'material_id', material_ids, using, **owner_overrides
+        )
+        question_ids = clone_rows(
+            Question, Question.all_objects.using(using).filter(exam__material__section_id=section.pk),
+            'exam_id', exam_ids, using
+        )
+        clone_rows(
+            Answer, Answer.all_objects.using(using).filter(question__exam__material__section_id=section.pk),
+            'question_id', question_ids, using
+        )
+    return clone
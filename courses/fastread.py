@@ -0,0 +1,109 @@
+"""
+Быстрое чтение списков без создания экземпляров моделей и полей сериализатора на каждую строку.
+
+ValuesSerializer строит ответ из кортежей QuerySet.values_list() по заранее собранному
+описанию полей. Ответ совпадает с ответом соответствующего ModelSerializer,
+поэтому используется только для чтения списков.
+"""
+from collections import defaultdict
+
+from rest_framework.response import Response
+
+
+class ValuesSerializer:
+    """
+    Сериализатор только для чтения на основе values_list().
+
+    fields - поля ответа в том же порядке, что и у ModelSerializer. Внешние ключи отдаются как id,
+    обратные связи (например, answers у вопроса) - списком, который строит сериализатор из related.
+    converters - функции для значений, которые в базе хранятся не так, как отдаются в ответе.
+    """
+    model = None
+    fields = []
+    converters = {}
+    related = {}
+
+    def __init__(self, instance, context=None):
+        self.instance = instance
+        self.context = context or {}
+
+    @classmethod
+    def get_mapping(cls):
+        """
+        Собирает описание полей один раз для класса: пути для values_list,
+        индексы полей с преобразованием и вложенные списки.
+        """
+        mapping = cls.__dict__.get('_mapping')
+        if mapping is not None:
+            return mapping
+
+        names, lookups, nested = [], [], []
+        for name in cls.fields:
+            field = cls.model._meta.get_field(name)
+            if field.one_to_many:
+                nested.append((name, cls.related[name], field.field.attname))
+            else:
+                names.append(name)
+                lookups.append(field.attname if field.is_relation else name)
+        if nested and 'id' not in names:
+            raise ValueError(f'{cls.__name__}: для вложенных списков в fields должно быть поле id')
+        converters = [(index, cls.converters[name]) for index, name in enumerate(names) if name in cls.converters]
+
+        mapping = names, lookups, converters, nested
+        cls._mapping = mapping
+        return mapping
+
+    @classmethod
+    def get_rows(cls, queryset, group_by=None):
+        """
+        Возвращает строки ответа. Если указан group_by, возвращает пары (значение group_by, строка).
+        """
+        names, lookups, converters, nested = cls.get_mapping()
+        extra = [group_by] if group_by else []
+        rows = []
+        keys = []
+        for values in queryset.values_list(*lookups, *extra):
+            if converters:
+                values = list(values)
+                for index, convert in converters:
+                    if values[index] is not None:
+                        values[index] = convert(values[index])
+            rows.append(dict(zip(names, values)))
+            if group_by:
+                keys.append(values[-1])
+
+        for name, serializer_class, fk in nested:
+            children = defaultdict(list)
+            # Родительские строки отбираются подзапросом: список id без постраничного вывода
+            # может превысить ограничение числа параметров запроса (SQLite)
+            child_queryset = serializer_class.model._default_manager.using(queryset.db).filter(
+                **{f'{fk}__in': queryset.values('pk')}
+            ).order_by(fk, 'pk')
+            for parent_id, child in serializer_class.get_rows(child_queryset, group_by=fk):
+                children[parent_id].append(child)
+            for row in rows:
+                row[name] = children[row['id']]
+
+        if group_by:
+            return list(zip(keys, rows))
+        return rows
+
+    @property
+    def data(self):
+        return self.get_rows(self.instance)
+
+
+class FastListMixin:
+    """
+    Отдаёт список через values_serializer_class вместо сериализатора модели.
+    Постраничный вывод, если он включён, обрабатывается обычным сериализатором.
+    """
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        return Response(self.values_serializer_class(queryset, context=self.get_serializer_context()).data)
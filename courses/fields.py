@@ -0,0 +1,169 @@
+import lzma
+import zlib
+
+from django import forms
+from django.conf import settings
+from django.db import models
+from django.db.models.query_utils import DeferredAttribute
+
+
+# Первый байт хранимого значения указывает, каким способом оно сжато
+CODECS = {
+    b'0': (lambda data: data, lambda data: data),
+    b'z': (lambda data: zlib.compress(data, 6), zlib.decompress),
+    b'x': (lambda data: lzma.compress(data, preset=6), lzma.decompress),
+}
+CODEC_NAMES = {'none': b'0', 'zlib': b'z', 'lzma': b'x'}
+
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _iter_plain(data, chunk_size):
+    for offset in range(0, len(data), chunk_size):
+        yield bytes(data[offset:offset + chunk_size])
+
+
+def _iter_zlib(data, chunk_size):
+    decompressor = zlib.decompressobj()
+    tail = data
+    while tail:
+        chunk = decompressor.decompress(tail, chunk_size)
+        tail = decompressor.unconsumed_tail
+        if chunk:
+            yield chunk
+    chunk = decompressor.flush()
+    if chunk:
+        yield chunk
+
+
+def _iter_lzma(data, chunk_size):
+    decompressor = lzma.LZMADecompressor()
+    offset = 0
+    while not decompressor.eof:
+        chunk = b''
+        if decompressor.needs_input:
+            chunk = bytes(data[offset:offset + chunk_size])
+            offset += chunk_size
+            if not chunk:
+                return
+        chunk = decompressor.decompress(chunk, chunk_size)
+        if chunk:
+            yield chunk
+
+
+STREAM_DECODERS = {b'0': _iter_plain, b'z': _iter_zlib, b'x': _iter_lzma}
+
+
+def compress_text(text, codec=None):
+    """
+    Сжимает строку выбранным кодеком. Если сжатие не даёт выигрыша, текст хранится как есть.
+    """
+    data = text.encode('utf-8')
+    marker = CODEC_NAMES[codec or getattr(settings, 'MATERIAL_CONTENT_CODEC', 'zlib')]
+    compressed = CODECS[marker][0](data)
+    if len(compressed) >= len(data):
+        return b'0' + data
+    return marker + compressed
+
+
+def decompress_text(value):
+    """
+    Восстанавливает строку из хранимого значения.
+    """
+    value = bytes(value)
+    return CODECS[value[:1]][1](value[1:]).decode('utf-8')
+
+
+def iter_decompressed(value, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Распаковывает хранимое значение порциями не больше chunk_size байт UTF-8,
+    не собирая весь текст в памяти.
+    """
+    value = memoryview(bytes(value))
+    return STREAM_DECODERS[bytes(value[:1])](value[1:], chunk_size)
+
+
+class CompressedTextDescriptor(DeferredAttribute):
+    """
+    Распаковывает значение при первом обращении к атрибуту и запоминает результат.
+    Пока к атрибуту не обращались, в экземпляре хранятся сжатые байты.
+    """
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        value = super().__get__(instance, cls)
+        if isinstance(value, (bytes, memoryview)):
+            value = decompress_text(value)
+            instance.__dict__[self.field.attname] = value
+        return value
+
+    def __set__(self, instance, value):
+        # Дескриптор данных, иначе значение из __dict__ возвращалось бы в обход __get__
+        instance.__dict__[self.field.attname] = value
+
+
+class CompressedTextField(models.BinaryField):
+    """
+    Текстовое поле, которое хранится в базе в сжатом виде (по умолчанию zlib).
+    Если указан size_field, при сохранении изменённого текста в это поле модели записывается
+    его размер в байтах UTF-8, чтобы не распаковывать значение ради Content-Length.
+    Поле размера должно быть объявлено в модели после сжатого поля.
+    """
+    descriptor_class = CompressedTextDescriptor
+
+    def __init__(self, *args, size_field=None, **kwargs):
+        self.size_field = size_field
+        kwargs.setdefault('editable', True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.editable:
+            del kwargs['editable']
+        else:
+            kwargs['editable'] = False
+        if self.size_field is not None:
+            kwargs['size_field'] = self.size_field
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        # Не распаковываем значение, которое не менялось после загрузки
+        value = model_instance.__dict__.get(self.attname)
+        if self.size_field is not None and isinstance(value, str):
+            setattr(model_instance, self.size_field, len(value.encode('utf-8')))
+        return value
+
+    def get_stored_value(self, instance):
+        """
+        Возвращает значение в хранимом сжатом виде, не распаковывая его.
+        """
+        if self.attname not in instance.__dict__:
+            instance.refresh_from_db(fields=[self.attname])
+        value = instance.__dict__[self.attname]
+        if isinstance(value, str):
+            return compress_text(value)
+        return value
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if isinstance(value, str):
+            value = compress_text(value)
+        return super().get_db_prep_value(value, connection, prepared)
+
+    def to_python(self, value):
+        if isinstance(value, (bytes, memoryview)):
+            return decompress_text(value)
+        return value
+
+    def value_from_object(self, obj):
+        return getattr(obj, self.attname)
+
+    def value_to_string(self, obj):
+        return self.value_from_object(obj)
+
+    def formfield(self, **kwargs):
+        return models.Field.formfield(self, **{
+            'form_class': forms.CharField,
+            'widget': forms.Textarea,
+            **kwargs,
+        })
@@ -0,0 +1,97 @@
+import io
+import time
+from types import SimpleNamespace
+
+from django.db import transaction
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from config.parsers import FastJSONParser
+from config.renderers import FastJSONRenderer, orjson
+from courses.models import Section, Material, MaterialProgress
+from courses.serializers import MaterialSerializer, MaterialProgressSerializer, SectionDashboardSerializer
+from courses.views import SectionDashboardAPIView
+from exams.models import Exam, Question, Answer
+from exams.serializers import ExamSerializer
+from users.models import User
+
+SAMPLE_TEXT = 'Рекурсивная функция вызывает сама себя и должна приближаться к базовому случаю. '
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает скорость кодирования и разбора JSON стандартными и быстрыми классами на типичных ответах API'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--materials', type=int, default=50, help='Количество материалов в разделе')
+        parser.add_argument('--exams', type=int, default=3, help='Количество тестов у материала')
+        parser.add_argument('--questions', type=int, default=10, help='Количество вопросов в тесте')
+        parser.add_argument('--repeat', type=int, default=20, help='Количество повторов замера')
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson не установлен, быстрые классы используют стандартный json'))
+
+        # Все данные создаются в транзакции, которая в конце откатывается
+        with transaction.atomic():
+            payloads = self._build_payloads(options)
+            transaction.set_rollback(True)
+
+        for title, data in payloads:
+            standard = JSONRenderer().render(data)
+            fast = FastJSONRenderer().render(data)
+            if standard != fast:
+                self.stdout.write(self.style.ERROR(f'{title}: ответы рендереров различаются'))
+            self.stdout.write(f'{title} ({len(standard) / 1024:.1f} KiB)')
+            self._compare('  кодирование', lambda r: r.render(data), JSONRenderer(), FastJSONRenderer(), options)
+            self._compare(
+                '  разбор', lambda p: p.parse(io.BytesIO(standard)), JSONParser(), FastJSONParser(), options
+            )
+
+    def _build_payloads(self, options):
+        user = User.objects.create(email='bench-json@example.com')
+        section = Section.objects.create(title='Benchmark', owner=user, description=SAMPLE_TEXT, is_public=True)
+        materials = Material.objects.bulk_create([
+            Material(section=section, owner=user, title=f'Материал {i}', content=SAMPLE_TEXT * 40, is_public=True)
+            for i in range(options['materials'])
+        ])
+        exams = Exam.objects.bulk_create([
+            Exam(material=material, owner=user, title=f'Тест {i}', description=SAMPLE_TEXT, is_public=True)
+            for material in materials for i in range(options['exams'])
+        ])
+        questions = Question.objects.bulk_create([
+            Question(exam=exam, text=f'{i}. {SAMPLE_TEXT}') for exam in exams for i in range(options['questions'])
+        ])
+        Answer.objects.bulk_create([
+            Answer(question=question, text=f'Вариант {i}', is_correct=i == 0) for question in questions for i in range(4)
+        ])
+        now = timezone.now()
+        MaterialProgress.objects.bulk_create([
+            MaterialProgress(user=user, material=material, first_opened_at=now, last_seen_at=now, completed_at=now)
+            for material in materials
+        ])
+
+        view = SectionDashboardAPIView(request=SimpleNamespace(user=user), kwargs={'pk': section.pk})
+        exam = Exam.objects.prefetch_related('questions__answers').get(pk=exams[0].pk)
+        return [
+            ('Страница курса', SectionDashboardSerializer(view.get_queryset().get(pk=section.pk)).data),
+            ('Тест с вопросами', ExamSerializer(exam).data),
+            ('Список материалов', MaterialSerializer(Material.objects.with_content().filter(section=section), many=True).data),
+            ('Прогресс пользователя', MaterialProgressSerializer(MaterialProgress.objects.filter(user=user), many=True).data),
+        ]
+
+    def _compare(self, title, func, standard, fast, options):
+        standard_time = self._measure(func, standard, options['repeat'])
+        fast_time = self._measure(func, fast, options['repeat'])
+        self.stdout.write(
+            f'{title}: {standard_time * 1000:.2f} мс -> {fast_time * 1000:.2f} мс (x{standard_time / fast_time:.1f})'
+        )
+
+    def _measure(self, func, arg, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func(arg)
+            timings.append(time.perf_counter() - started)
+        return min(timings)
@@ -0,0 +1,65 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from courses.models import Section, Material
+from courses.serializers import MaterialSerializer, MaterialValuesSerializer
+from exams.models import Exam, Question, Answer
+from exams.serializers import QuestionSerializer, QuestionValuesSerializer, AnswerSerializer, AnswerValuesSerializer
+from users.models import User
+
+SAMPLE_TEXT = 'Каждый рекурсивный вызов должен приближать задачу к базовому случаю. '
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает скорость списков через сериализаторы моделей и через values_list()'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=2000, help='Количество строк в каждом списке')
+        parser.add_argument('--repeat', type=int, default=5, help='Количество повторов замера')
+
+    def handle(self, *args, **options):
+        count = options['count']
+
+        # Все данные создаются в транзакции, которая в конце откатывается
+        with transaction.atomic():
+            user = User.objects.create(email='bench-lists@example.com')
+            section = Section.objects.create(title='Benchmark', owner=user)
+            materials = Material.objects.bulk_create([
+                Material(section=section, owner=user, title=f'Материал {i}', content=SAMPLE_TEXT * 20)
+                for i in range(count)
+            ])
+            exam = Exam.objects.create(title='Benchmark', material=materials[0], owner=user)
+            questions = Question.objects.bulk_create([Question(exam=exam, text=f'{i}. {SAMPLE_TEXT}') for i in range(count)])
+            Answer.objects.bulk_create([
+                Answer(question=question, text=f'Вариант {i}', is_correct=i == 0) for question in questions for i in range(4)
+            ])
+
+            cases = [
+                ('Материалы', Material.objects.with_content().filter(section=section), MaterialSerializer, MaterialValuesSerializer),
+                ('Вопросы с ответами', Question.objects.filter(exam=exam), QuestionSerializer, QuestionValuesSerializer),
+                ('Ответы', Answer.objects.filter(question__exam=exam), AnswerSerializer, AnswerValuesSerializer),
+            ]
+            for title, queryset, serializer_class, values_serializer_class in cases:
+                standard = JSONRenderer().render(serializer_class(queryset.all(), many=True).data)
+                fast = JSONRenderer().render(values_serializer_class(queryset.all()).data)
+                if standard != fast:
+                    self.stdout.write(self.style.ERROR(f'{title}: ответы различаются'))
+                standard_time = self._measure(lambda: serializer_class(queryset.all(), many=True).data, options['repeat'])
+                fast_time = self._measure(lambda: values_serializer_class(queryset.all()).data, options['repeat'])
+                self.stdout.write(
+                    f'{title} ({count} шт.): {standard_time * 1000:.1f} мс -> {fast_time * 1000:.1f} мс '
+                    f'(x{standard_time / fast_time:.1f})'
+                )
+
+            transaction.set_rollback(True)
+
+    def _measure(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
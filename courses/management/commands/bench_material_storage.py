@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from courses.fields import compress_text
+from courses.models import Section, Material
+from users.models import User
+
+SAMPLE_PARAGRAPH = (
+    'Функция называется рекурсивной, если она вызывает сама себя. '
+    'Каждый рекурсивный вызов должен приближать задачу к базовому случаю, '
+    'иначе вызовы никогда не закончатся и программа завершится с ошибкой переполнения стека. '
+)
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает объём хранения и время чтения материалов со сжатием и без него'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=500, help='Количество материалов')
+        parser.add_argument('--paragraphs', type=int, default=200, help='Количество абзацев в материале')
+
+    def handle(self, *args, **options):
+        content = '\n\n'.join(f'{i}. {SAMPLE_PARAGRAPH}' for i in range(options['paragraphs']))
+
+        # Все данные создаются в транзакции, которая в конце откатывается
+        with transaction.atomic():
+            user = User.objects.create(email='bench-storage@example.com')
+            section = Section.objects.create(title='Benchmark', owner=user)
+            Material.objects.bulk_create([
+                Material(section=section, owner=user, title=f'Material {i}', content=content)
+                for i in range(options['count'])
+            ])
+            materials = Material.objects.filter(section=section)
+
+            raw_size = len(content.encode('utf-8')) * options['count']
+            stored_size = sum(len(value) for value in materials.values_list('content', flat=True))
+            self.stdout.write(f'Исходный объём:  {raw_size / 1024:.1f} KiB')
+            self.stdout.write(f'Хранимый объём:  {stored_size / 1024:.1f} KiB ({stored_size / raw_size:.1%})')
+
+            self._measure('Только владельцы (содержимое отложено)', lambda: list(materials.values_list('owner_id', flat=True)))
+            self._measure('Список материалов без содержимого', lambda: list(materials.all()))
+            self._measure('Список материалов с распаковкой', lambda: [m.content for m in materials.with_content()])
+            self._measure('Сжатие одного материала', lambda: compress_text(content))
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'База данных: {connection.vendor}')
+
+    def _measure(self, title, func, repeat=5):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        self.stdout.write(f'{title}: {min(timings) * 1000:.2f} мс')
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from courses.attachments import collect_garbage
+
+
+class Command(BaseCommand):
+    help = 'Удаляет файлы вложений без ссылок во всех базах школ и устаревшие незавершённые загрузки'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--upload-max-age', type=int, default=None,
+            help='Через сколько секунд без новых частей загрузка считается брошенной (ATTACHMENT_UPLOAD_MAX_AGE)',
+        )
+
+    def handle(self, *args, **options):
+        blobs, uploads = collect_garbage(options['upload_max_age'])
+        self.stdout.write(f'Удалено файлов: {blobs}, незавершённых загрузок: {uploads}')
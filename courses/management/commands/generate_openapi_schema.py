@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from config.schema import write_schema, get_schema_path
+
+
+class Command(BaseCommand):
+    help = 'Генерирует схему OpenAPI и сохраняет её вместе со сжатой копией для отдачи как статический файл'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=None, help='Путь к файлу схемы (по умолчанию OPENAPI_SCHEMA_PATH)')
+
+    def handle(self, *args, **options):
+        path = options['output'] or get_schema_path()
+        content = write_schema(path)
+        self.stdout.write(f'Схема записана в {path} ({len(content)} байт)')
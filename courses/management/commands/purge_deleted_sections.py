@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from courses.purge import purge_deleted_sections, DEFAULT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Удаляет содержимое разделов, помеченных на удаление, порциями снизу вверх'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Размер порции удаления')
+        parser.add_argument('--max-batches', type=int, default=None, help='Ограничение числа порций на задачу')
+
+    def handle(self, *args, **options):
+        finished = purge_deleted_sections(options['batch_size'], options['max_batches'])
+        self.stdout.write(f'Завершено задач очистки: {finished}')
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.models import Material
+from courses.similarity import index_material, find_similar, find_clusters
+from tenants.context import get_tenant_databases, use_tenant
+
+
+class Command(BaseCommand):
+    help = 'Выводит группы похожих материалов или материалы, похожие на данный'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reindex', action='store_true', help='Пересчитать сигнатуры всех материалов')
+        parser.add_argument('--material', type=int, help='id материала для поиска похожих')
+        parser.add_argument('--tenant', default='', help='Школа, в которой искать похожие материалы')
+        parser.add_argument('--threshold', type=float, help='Минимальная оценка сходства от 0 до 1')
+        parser.add_argument('--batch-size', type=int, default=500, help='Размер порции при пересчёте')
+
+    def handle(self, *args, **options):
+        if options['reindex']:
+            for using in get_tenant_databases():
+                updated = 0
+                materials = Material.objects.using(using).with_content().order_by('pk')
+                for material in materials.iterator(chunk_size=options['batch_size']):
+                    updated += index_material(material)
+                self.stdout.write(f'{using}: обновлено сигнатур: {updated}')
+
+        with use_tenant(options['tenant']):
+            if options['material'] is not None:
+                material = Material.objects.filter(pk=options['material']).first()
+                if material is None:
+                    raise CommandError(f'Материал {options["material"]} не найден')
+                for material_id, similarity in find_similar(material, options['threshold']):
+                    self.stdout.write(f'{material_id}\t{similarity:.2f}')
+                return
+
+            clusters = find_clusters(options['threshold'], tenant=options['tenant'])
+            for cluster in clusters:
+                self.stdout.write(', '.join(map(str, cluster)))
+            self.stdout.write(f'Групп похожих материалов: {len(clusters)}')
@@ -0,0 +1,78 @@
+from django.db import migrations, models
+
+import courses.fields
+from courses.fields import compress_text, decompress_text
+
+CHUNK_SIZE = 500
+
+
+def iter_chunks(Material, field):
+    """
+    Перебирает материалы порциями по первичному ключу, чтобы не загружать всю таблицу в память.
+    """
+    last_pk = 0
+    while True:
+        chunk = list(
+            Material.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', field)[:CHUNK_SIZE]
+        )
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1][0]
+
+
+def compress_content(apps, schema_editor):
+    Material = apps.get_model('courses', 'Material')
+    for chunk in iter_chunks(Material, 'content'):
+        Material.objects.bulk_update(
+            [Material(pk=pk, content_compressed=compress_text(content)) for pk, content in chunk],
+            ['content_compressed'],
+        )
+
+
+def decompress_content(apps, schema_editor):
+    Material = apps.get_model('courses', 'Material')
+    for chunk in iter_chunks(Material, 'content_compressed'):
+        Material.objects.bulk_update(
+            [Material(pk=pk, content=decompress_text(value)) for pk, value in chunk],
+            ['content'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_alter_material_owner_alter_material_section'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='material',
+            name='content_compressed',
+            field=courses.fields.CompressedTextField(null=True, verbose_name='содержимое материалов'),
+        ),
+        migrations.AlterField(
+            model_name='material',
+            name='content',
+            field=models.TextField(null=True, verbose_name='содержимое материалов'),
+        ),
+        migrations.RunPython(compress_content, decompress_content),
+        migrations.RemoveField(
+            model_name='material',
+            name='content',
+        ),
+        migrations.RenameField(
+            model_name='material',
+            old_name='content_compressed',
+            new_name='content',
+        ),
+        migrations.AlterField(
+            model_name='material',
+            name='content',
+            field=courses.fields.CompressedTextField(verbose_name='содержимое материалов'),
+        ),
+        migrations.AlterModelOptions(
+            name='material',
+            options={'base_manager_name': 'objects', 'verbose_name': 'материалы', 'verbose_name_plural': 'материалы'},
+        ),
+    ]
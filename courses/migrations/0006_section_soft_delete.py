@@ -0,0 +1,57 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:06
+
+import django.db.models.manager
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_compress_material_content'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SectionPurge',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('section_id', models.BigIntegerField(db_index=True, verbose_name='id раздела')),
+                ('stage', models.CharField(choices=[('answers', 'ответы'), ('questions', 'вопросы'), ('exams', 'тесты'), ('materials', 'материалы'), ('section', 'раздел'), ('done', 'завершена')], default='answers', max_length=20, verbose_name='этап')),
+                ('deleted_rows', models.PositiveBigIntegerField(default=0, verbose_name='удалено строк')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='создана')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='обновлена')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='завершена')),
+            ],
+            options={
+                'verbose_name': 'очистка раздела',
+                'verbose_name_plural': 'очистка разделов',
+            },
+        ),
+        migrations.AlterModelOptions(
+            name='material',
+            options={'base_manager_name': 'all_objects', 'verbose_name': 'материалы', 'verbose_name_plural': 'материалы'},
+        ),
+        migrations.AlterModelOptions(
+            name='section',
+            options={'base_manager_name': 'all_objects', 'verbose_name': 'раздел', 'verbose_name_plural': 'разделы'},
+        ),
+        migrations.AlterModelManagers(
+            name='material',
+            managers=[
+                ('objects', django.db.models.manager.Manager()),
+                ('all_objects', django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.AlterModelManagers(
+            name='section',
+            managers=[
+                ('objects', django.db.models.manager.Manager()),
+                ('all_objects', django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='section',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='помечен на удаление'),
+        ),
+    ]
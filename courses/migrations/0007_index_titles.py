@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0006_section_soft_delete'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='material',
+            name='title',
+            field=models.CharField(db_index=True, max_length=200, verbose_name='название материалов'),
+        ),
+        migrations.AlterField(
+            model_name='section',
+            name='title',
+            field=models.CharField(db_index=True, max_length=200, verbose_name='название раздела'),
+        ),
+    ]
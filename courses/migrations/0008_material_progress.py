@@ -0,0 +1,36 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0007_index_titles'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MaterialProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'открыт'), (2, 'пройден')], default=1, verbose_name='статус')),
+                ('first_opened_at', models.DateTimeField(verbose_name='впервые открыт')),
+                ('last_seen_at', models.DateTimeField(verbose_name='последнее обращение')),
+                ('completed_at', models.DateTimeField(blank=True, null=True, verbose_name='пройден')),
+                ('material', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress', to='courses.material', verbose_name='материал')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress', to=settings.AUTH_USER_MODEL, verbose_name='пользователь')),
+            ],
+            options={
+                'verbose_name': 'прогресс по материалу',
+                'verbose_name_plural': 'прогресс по материалам',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='materialprogress',
+            constraint=models.UniqueConstraint(fields=('user', 'material'), name='unique_material_progress'),
+        ),
+    ]
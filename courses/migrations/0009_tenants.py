@@ -0,0 +1,47 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:26
+
+import django.db.models.deletion
+import tenants.context
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0008_material_progress'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='material',
+            name='tenant',
+            field=models.SlugField(blank=True, default=tenants.context.get_default_tenant, verbose_name='школа'),
+        ),
+        migrations.AddField(
+            model_name='section',
+            name='tenant',
+            field=models.SlugField(blank=True, default=tenants.context.get_default_tenant, verbose_name='школа'),
+        ),
+        migrations.AlterField(
+            model_name='material',
+            name='owner',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='materials', to=settings.AUTH_USER_MODEL, verbose_name='владелец'),
+        ),
+        migrations.AlterField(
+            model_name='materialprogress',
+            name='user',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='progress', to=settings.AUTH_USER_MODEL, verbose_name='пользователь'),
+        ),
+        migrations.AlterField(
+            model_name='section',
+            name='owner',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='владелец'),
+        ),
+        migrations.AlterField(
+            model_name='sectionpurge',
+            name='stage',
+            field=models.CharField(choices=[('answers', 'ответы'), ('questions', 'вопросы'), ('exams', 'тесты'), ('progress', 'прогресс'), ('materials', 'материалы'), ('section', 'раздел'), ('done', 'завершена')], default='answers', max_length=20, verbose_name='этап'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0009_tenants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sectionpurge',
+            name='stage',
+            field=models.CharField(choices=[('answers', 'ответы'), ('reviews', 'повторения'), ('questions', 'вопросы'), ('exams', 'тесты'), ('progress', 'прогресс'), ('materials', 'материалы'), ('section', 'раздел'), ('done', 'завершена')], default='answers', max_length=20, verbose_name='этап'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0010_purge_reviews_stage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MaterialSignature',
+            fields=[
+                ('material', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='courses.material', verbose_name='материал')),
+                ('content_hash', models.CharField(max_length=64, verbose_name='хеш содержимого')),
+                ('signature', models.BinaryField(verbose_name='сигнатура')),
+            ],
+            options={
+                'verbose_name': 'сигнатура материала',
+                'verbose_name_plural': 'сигнатуры материалов',
+            },
+        ),
+        migrations.AlterField(
+            model_name='sectionpurge',
+            name='stage',
+            field=models.CharField(choices=[('answers', 'ответы'), ('reviews', 'повторения'), ('questions', 'вопросы'), ('exams', 'тесты'), ('progress', 'прогресс'), ('bands', 'полосы сигнатур'), ('signatures', 'сигнатуры'), ('materials', 'материалы'), ('section', 'раздел'), ('done', 'завершена')], default='answers', max_length=20, verbose_name='этап'),
+        ),
+        migrations.CreateModel(
+            name='MaterialBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField(verbose_name='номер полосы')),
+                ('hash', models.BigIntegerField(verbose_name='хеш полосы')),
+                ('material', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bands', to='courses.material', verbose_name='материал')),
+            ],
+            options={
+                'verbose_name': 'полоса сигнатуры',
+                'verbose_name_plural': 'полосы сигнатур',
+                'indexes': [models.Index(fields=['band', 'hash'], name='material_band_hash_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='materialband',
+            constraint=models.UniqueConstraint(fields=('material', 'band'), name='unique_material_band'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:44
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+# Шаг позиций из courses.ordering.POSITION_GAP
+POSITION_GAP = 1 << 16
+
+
+def number_positions(apps, schema_editor):
+    # Существующие строки сохраняют порядок по первичному ключу
+    Material = apps.get_model('courses', 'Material')
+    Material._base_manager.using(schema_editor.connection.alias).update(position=F('id') * POSITION_GAP)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0012_purge_sessions_stage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='material',
+            options={'base_manager_name': 'all_objects', 'ordering': ['section', 'position', 'id'], 'verbose_name': 'материалы', 'verbose_name_plural': 'материалы'},
+        ),
+        migrations.AddField(
+            model_name='material',
+            name='position',
+            field=models.BigIntegerField(default=0, verbose_name='позиция в разделе'),
+        ),
+        migrations.RunPython(number_positions, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='material',
+            index=models.Index(fields=['section', 'position', 'id'], name='material_position_idx'),
+        ),
+    ]
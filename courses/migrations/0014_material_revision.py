@@ -0,0 +1,42 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0013_material_position'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sectionpurge',
+            name='stage',
+            field=models.CharField(choices=[('answers', 'ответы'), ('reviews', 'повторения'), ('sessions', 'прохождения тестов'), ('questions', 'вопросы'), ('exams', 'тесты'), ('progress', 'прогресс'), ('bands', 'полосы сигнатур'), ('signatures', 'сигнатуры'), ('revisions', 'версии материалов'), ('materials', 'материалы'), ('section', 'раздел'), ('done', 'завершена')], default='answers', max_length=20, verbose_name='этап'),
+        ),
+        migrations.CreateModel(
+            name='MaterialRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField(verbose_name='номер версии')),
+                ('is_snapshot', models.BooleanField(default=False, verbose_name='полный снимок')),
+                ('data', models.BinaryField(verbose_name='снимок или разница со сжатием')),
+                ('size', models.PositiveIntegerField(verbose_name='размер содержимого, символов')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='создана')),
+                ('author', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='material_revisions', to=settings.AUTH_USER_MODEL, verbose_name='автор')),
+                ('material', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='courses.material', verbose_name='материал')),
+            ],
+            options={
+                'verbose_name': 'версия материала',
+                'verbose_name_plural': 'версии материалов',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='materialrevision',
+            constraint=models.UniqueConstraint(fields=('material', 'number'), name='unique_material_revision'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:52
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0014_material_revision'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sectionpurge',
+            name='stage',
+            field=models.CharField(choices=[('answers', 'ответы'), ('reviews', 'повторения'), ('sessions', 'прохождения тестов'), ('questions', 'вопросы'), ('exams', 'тесты'), ('progress', 'прогресс'), ('bands', 'полосы сигнатур'), ('signatures', 'сигнатуры'), ('revisions', 'версии материалов'), ('attachments', 'вложения'), ('uploads', 'загрузки вложений'), ('materials', 'материалы'), ('section', 'раздел'), ('done', 'завершена')], default='answers', max_length=20, verbose_name='этап'),
+        ),
+        migrations.CreateModel(
+            name='Attachment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('filename', models.CharField(max_length=255, verbose_name='имя файла')),
+                ('content_type', models.CharField(max_length=100, verbose_name='тип содержимого')),
+                ('size', models.PositiveBigIntegerField(verbose_name='размер, байт')),
+                ('sha256', models.CharField(db_index=True, max_length=64, verbose_name='хеш SHA-256')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='загружен')),
+                ('material', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attachments', to='courses.material', verbose_name='материал')),
+                ('owner', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='attachments', to=settings.AUTH_USER_MODEL, verbose_name='владелец')),
+            ],
+            options={
+                'verbose_name': 'вложение',
+                'verbose_name_plural': 'вложения',
+            },
+        ),
+        migrations.CreateModel(
+            name='AttachmentUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255, verbose_name='имя файла')),
+                ('content_type', models.CharField(max_length=100, verbose_name='тип содержимого')),
+                ('size', models.PositiveBigIntegerField(verbose_name='размер, байт')),
+                ('received', models.PositiveBigIntegerField(default=0, verbose_name='получено, байт')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='начата')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='обновлена')),
+                ('material', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attachment_uploads', to='courses.material', verbose_name='материал')),
+                ('owner', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='attachment_uploads', to=settings.AUTH_USER_MODEL, verbose_name='владелец')),
+            ],
+            options={
+                'verbose_name': 'загрузка вложения',
+                'verbose_name_plural': 'загрузки вложений',
+            },
+        ),
+    ]
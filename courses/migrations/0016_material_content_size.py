@@ -0,0 +1,50 @@
+# Generated by Django 5.0.14 on 2026-10-19 19:12
+
+import courses.fields
+from django.db import migrations, models
+
+from courses.fields import iter_decompressed
+
+CHUNK_SIZE = 500
+
+
+def fill_content_size(apps, schema_editor):
+    """
+    Записывает размер содержимого существующих материалов, распаковывая его порциями.
+    """
+    Material = apps.get_model('courses', 'Material')
+    manager = Material._base_manager.using(schema_editor.connection.alias)
+    last_pk = 0
+    while True:
+        chunk = list(manager.filter(pk__gt=last_pk).order_by('pk').values_list('pk', 'content')[:CHUNK_SIZE])
+        if not chunk:
+            return
+        manager.bulk_update(
+            [
+                Material(pk=pk, content_size=sum(len(part) for part in iter_decompressed(content)))
+                for pk, content in chunk
+            ],
+            ['content_size'],
+        )
+        last_pk = chunk[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0015_material_attachments'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='material',
+            name='content_size',
+            field=models.PositiveBigIntegerField(default=0, editable=False, verbose_name='размер содержимого, байт UTF-8'),
+        ),
+        migrations.AlterField(
+            model_name='material',
+            name='content',
+            field=courses.fields.CompressedTextField(size_field='content_size', verbose_name='содержимое материалов'),
+        ),
+        migrations.RunPython(fill_content_size, migrations.RunPython.noop),
+    ]
@@ -1,35 +1,303 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from courses.fields import CompressedTextField
+from tenants.context import get_default_tenant
 
 
 User = get_user_model()
 NULLABLE = {'blank': True, 'null': True}
 
 
+class AliveSectionManager(models.Manager):
+    """
+    Менеджер, скрывающий объекты из разделов, помеченных на удаление.
+    section_lookup - путь от модели до раздела.
+    """
+    section_lookup = None
+
+    def get_queryset(self):
+        lookup = f'{self.section_lookup}__deleted_at__isnull' if self.section_lookup else 'deleted_at__isnull'
+        return super().get_queryset().filter(**{lookup: True})
+
+
 class Section(models.Model):
-    title = models.CharField(max_length=200, verbose_name='название раздела')
-    owner = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name='владелец')
+    title = models.CharField(max_length=200, db_index=True, verbose_name='название раздела')
+    # Пользователи хранятся в базе по умолчанию, а разделы - в базе школы, поэтому ограничения внешнего ключа нет
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, db_constraint=False, verbose_name='владелец')
+    tenant = models.SlugField(max_length=50, blank=True, default=get_default_tenant, verbose_name='школа')
     description = models.TextField(verbose_name='Описание раздела', **NULLABLE)
     is_public = models.BooleanField(default=False, verbose_name='признак публичности')
+    deleted_at = models.DateTimeField(db_index=True, verbose_name='помечен на удаление', **NULLABLE)
+
+    objects = AliveSectionManager()
+    all_objects = models.Manager()
 
     def __str__(self):
         return self.title
 
+    def soft_delete(self):
+        """
+        Помечает раздел удалённым и ставит его в очередь на очистку.
+        Раздел и всё его содержимое сразу скрываются из выборок, а строки удаляются позже
+        командой purge_deleted_sections.
+        """
+        self.deleted_at = timezone.now()
+        self.save(update_fields=['deleted_at'])
+        SectionPurge.objects.using(self._state.db).create(section_id=self.pk)
+
     class Meta:
         verbose_name = 'раздел'
         verbose_name_plural = 'разделы'
+        base_manager_name = 'all_objects'
+
+
+class SectionPurge(models.Model):
+    """
+    Задача на удаление содержимого раздела, помеченного на удаление, и её прогресс.
+    """
+    STAGE_CHOICES = [
+        ('answers', 'ответы'),
+        ('reviews', 'повторения'),
+        ('sessions', 'прохождения тестов'),
+        ('questions', 'вопросы'),
+        ('exams', 'тесты'),
+        ('progress', 'прогресс'),
+        ('bands', 'полосы сигнатур'),
+        ('signatures', 'сигнатуры'),
+        ('revisions', 'версии материалов'),
+        ('attachments', 'вложения'),
+        ('uploads', 'загрузки вложений'),
+        ('materials', 'материалы'),
+        ('section', 'раздел'),
+        ('done', 'завершена'),
+    ]
+    STAGES = [stage for stage, _ in STAGE_CHOICES]
+
+    section_id = models.BigIntegerField(db_index=True, verbose_name='id раздела')
+    stage = models.CharField(max_length=20, choices=STAGE_CHOICES, default='answers', verbose_name='этап')
+    deleted_rows = models.PositiveBigIntegerField(default=0, verbose_name='удалено строк')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='создана')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='обновлена')
+    finished_at = models.DateTimeField(verbose_name='завершена', **NULLABLE)
+
+    def __str__(self):
+        return f'Очистка раздела {self.section_id}: {self.stage}'
+
+    class Meta:
+        verbose_name = 'очистка раздела'
+        verbose_name_plural = 'очистка разделов'
+
+
+class MaterialQuerySet(models.QuerySet):
+    def with_content(self):
+        """
+        Загружает содержимое материалов вместе с остальными полями.
+        """
+        return self.defer(None)
+
+
+class MaterialManager(models.Manager.from_queryset(MaterialQuerySet)):
+    """
+    Менеджер материалов, по умолчанию не загружающий содержимое.
+    Содержимое читается из базы и распаковывается только при обращении к нему.
+    """
+    def get_queryset(self):
+        return super().get_queryset().defer('content')
+
+
+class AliveMaterialManager(AliveSectionManager, MaterialManager):
+    section_lookup = 'section'
 
 
 class Material(models.Model):
     section = models.ForeignKey(Section, on_delete=models.CASCADE, verbose_name='название раздела', related_name='materials')
-    owner = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name='владелец', related_name='materials')
-    title = models.CharField(max_length=200, verbose_name='название материалов')
-    content = models.TextField(verbose_name='содержимое материалов')
+    owner = models.ForeignKey(
+        User, on_delete=models.CASCADE, db_constraint=False, verbose_name='владелец', related_name='materials'
+    )
+    tenant = models.SlugField(max_length=50, blank=True, default=get_default_tenant, verbose_name='школа')
+    title = models.CharField(max_length=200, db_index=True, verbose_name='название материалов')
+    content = CompressedTextField(size_field='content_size', verbose_name='содержимое материалов')
+    content_size = models.PositiveBigIntegerField(default=0, editable=False,
+                                                  verbose_name='размер содержимого, байт UTF-8')
     is_public = models.BooleanField(default=False, verbose_name='признак публичности')
+    # Позиции идут с промежутками, см. courses.ordering
+    position = models.BigIntegerField(default=0, verbose_name='позиция в разделе')
+
+    objects = AliveMaterialManager()
+    all_objects = MaterialManager()
+
+    position_parent = 'section'
 
     def __str__(self):
         return f'{self.title} из раздела {self.section}'
 
+    def save(self, *args, update_fields=None, **kwargs):
+        # Размер содержимого пересчитывается вместе с ним, см. CompressedTextField.size_field
+        if update_fields is not None and 'content' in update_fields:
+            update_fields = {*update_fields, 'content_size'}
+        super().save(*args, update_fields=update_fields, **kwargs)
+
     class Meta:
         verbose_name = 'материалы'
         verbose_name_plural = 'материалы'
+        base_manager_name = 'all_objects'
+        ordering = ['section', 'position', 'id']
+        indexes = [
+            models.Index(fields=['section', 'position', 'id'], name='material_position_idx'),
+        ]
+
+
+class MaterialRevision(models.Model):
+    """
+    Версия содержимого материала. Каждая MATERIAL_REVISION_SNAPSHOT_INTERVAL-я версия хранится
+    целиком (снимок), остальные - разницей с предыдущей версией. Хранение и восстановление -
+    в courses.revisions.
+    """
+    material = models.ForeignKey(Material, on_delete=models.CASCADE, related_name='revisions', verbose_name='материал')
+    number = models.PositiveIntegerField(verbose_name='номер версии')
+    is_snapshot = models.BooleanField(default=False, verbose_name='полный снимок')
+    data = models.BinaryField(verbose_name='снимок или разница со сжатием')
+    size = models.PositiveIntegerField(verbose_name='размер содержимого, символов')
+    author = models.ForeignKey(
+        User, on_delete=models.SET_NULL, db_constraint=False, related_name='material_revisions',
+        verbose_name='автор', **NULLABLE
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='создана')
+
+    def __str__(self):
+        return f'{self.material_id}: версия {self.number}'
+
+    class Meta:
+        verbose_name = 'версия материала'
+        verbose_name_plural = 'версии материалов'
+        constraints = [
+            models.UniqueConstraint(fields=['material', 'number'], name='unique_material_revision'),
+        ]
+
+
+class Attachment(models.Model):
+    """
+    Файл, прикреплённый к материалу. Содержимое хранится в файловой системе по хешу SHA-256,
+    поэтому одинаковые файлы хранятся один раз. Хранение - в courses.attachments.
+    """
+    material = models.ForeignKey(Material, on_delete=models.CASCADE, related_name='attachments', verbose_name='материал')
+    owner = models.ForeignKey(
+        User, on_delete=models.CASCADE, db_constraint=False, related_name='attachments', verbose_name='владелец'
+    )
+    filename = models.CharField(max_length=255, verbose_name='имя файла')
+    content_type = models.CharField(max_length=100, verbose_name='тип содержимого')
+    size = models.PositiveBigIntegerField(verbose_name='размер, байт')
+    sha256 = models.CharField(max_length=64, db_index=True, verbose_name='хеш SHA-256')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='загружен')
+
+    def __str__(self):
+        return self.filename
+
+    class Meta:
+        verbose_name = 'вложение'
+        verbose_name_plural = 'вложения'
+
+
+class AttachmentUpload(models.Model):
+    """
+    Незавершённая загрузка вложения по частям. Полученные байты лежат во временном файле,
+    received - сколько байт с начала файла уже получено.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    material = models.ForeignKey(
+        Material, on_delete=models.CASCADE, related_name='attachment_uploads', verbose_name='материал'
+    )
+    owner = models.ForeignKey(
+        User, on_delete=models.CASCADE, db_constraint=False, related_name='attachment_uploads', verbose_name='владелец'
+    )
+    filename = models.CharField(max_length=255, verbose_name='имя файла')
+    content_type = models.CharField(max_length=100, verbose_name='тип содержимого')
+    size = models.PositiveBigIntegerField(verbose_name='размер, байт')
+    received = models.PositiveBigIntegerField(default=0, verbose_name='получено, байт')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='начата')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='обновлена')
+
+    def __str__(self):
+        return f'{self.filename}: {self.received} из {self.size}'
+
+    class Meta:
+        verbose_name = 'загрузка вложения'
+        verbose_name_plural = 'загрузки вложений'
+
+
+class MaterialProgress(models.Model):
+    """
+    Прогресс пользователя по материалу.
+    Записывается пачками из буфера courses.progress, а не при каждом событии.
+    """
+    STATUS_OPENED = 1
+    STATUS_COMPLETED = 2
+    STATUS_CHOICES = [
+        (STATUS_OPENED, 'открыт'),
+        (STATUS_COMPLETED, 'пройден'),
+    ]
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, db_constraint=False, related_name='progress', verbose_name='пользователь'
+    )
+    material = models.ForeignKey(Material, on_delete=models.CASCADE, related_name='progress', verbose_name='материал')
+    status = models.PositiveSmallIntegerField(choices=STATUS_CHOICES, default=STATUS_OPENED, verbose_name='статус')
+    first_opened_at = models.DateTimeField(verbose_name='впервые открыт')
+    last_seen_at = models.DateTimeField(verbose_name='последнее обращение')
+    completed_at = models.DateTimeField(verbose_name='пройден', **NULLABLE)
+
+    def __str__(self):
+        return f'{self.user} - {self.material_id}: {self.get_status_display()}'
+
+    class Meta:
+        verbose_name = 'прогресс по материалу'
+        verbose_name_plural = 'прогресс по материалам'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'material'], name='unique_material_progress'),
+        ]
+
+
+class MaterialSignature(models.Model):
+    """
+    MinHash-сигнатура содержимого материала для поиска похожих материалов.
+    Расчёт и поиск - в courses.similarity.
+    """
+    material = models.OneToOneField(
+        Material, on_delete=models.CASCADE, primary_key=True, related_name='signature', verbose_name='материал'
+    )
+    content_hash = models.CharField(max_length=64, verbose_name='хеш содержимого')
+    signature = models.BinaryField(verbose_name='сигнатура')
+
+    def __str__(self):
+        return f'Сигнатура материала {self.material_id}'
+
+    class Meta:
+        verbose_name = 'сигнатура материала'
+        verbose_name_plural = 'сигнатуры материалов'
+
+
+class MaterialBand(models.Model):
+    """
+    Хеш полосы MinHash-сигнатуры (LSH). Материалы с совпадающим хешем хотя бы одной полосы
+    считаются кандидатами в похожие.
+    """
+    material = models.ForeignKey(Material, on_delete=models.CASCADE, related_name='bands', verbose_name='материал')
+    band = models.PositiveSmallIntegerField(verbose_name='номер полосы')
+    hash = models.BigIntegerField(verbose_name='хеш полосы')
+
+    def __str__(self):
+        return f'Полоса {self.band} материала {self.material_id}'
+
+    class Meta:
+        verbose_name = 'полоса сигнатуры'
+        verbose_name_plural = 'полосы сигнатур'
+        constraints = [
+            models.UniqueConstraint(fields=['material', 'band'], name='unique_material_band'),
+        ]
+        indexes = [
+            models.Index(fields=['band', 'hash'], name='material_band_hash_idx'),
+        ]
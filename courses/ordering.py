@@ -0,0 +1,127 @@
+"""
+Явный порядок материалов в разделе и вопросов в тесте.
+
+Позиции назначаются с шагом POSITION_GAP, поэтому перемещение элемента записывает одну строку:
+новая позиция - середина между соседями. Когда промежуток между соседями становится меньше
+MIN_GAP, фоновая задача заново расставляет позиции списка с шагом POSITION_GAP. Если промежуток
+исчерпан полностью, список перенумеровывается сразу в транзакции перемещения.
+
+Модель с позицией задаёт поле position и атрибут position_parent - внешний ключ на список.
+Списки сортируются по (родитель, position, id) по индексу на эти поля.
+"""
+from django.db import router, transaction
+from django.db.models import Max
+from rest_framework import status
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.response import Response
+
+from courses.ownership import get_object_owner_id
+from jobs.registry import enqueue
+
+POSITION_GAP = 1 << 16
+MIN_GAP = 1 << 4
+
+
+def get_parent_attname(model):
+    return model._meta.get_field(model.position_parent).attname
+
+
+def get_siblings(model, parent_id, using):
+    return model._base_manager.db_manager(using).filter(**{get_parent_attname(model): parent_id})
+
+
+def append_position(instance):
+    """
+    Возвращает позицию в конце списка, в который добавляется объект.
+    """
+    model = type(instance)
+    using = router.db_for_write(model, instance=instance)
+    last = get_siblings(model, getattr(instance, get_parent_attname(model)), using).aggregate(
+        last=Max('position')
+    )['last']
+    return POSITION_GAP if last is None else last + POSITION_GAP
+
+
+def assign_position(sender, instance, raw=False, **kwargs):
+    """
+    Обработчик pre_save: новый объект без позиции добавляется в конец списка.
+    """
+    if not raw and instance._state.adding and not instance.position:
+        instance.position = append_position(instance)
+
+
+def rebalance(model, parent_id, using=None):
+    """
+    Расставляет позиции списка заново с шагом POSITION_GAP, сохраняя порядок.
+    Возвращает количество строк.
+    """
+    using = using or router.db_for_write(model)
+    siblings = get_siblings(model, parent_id, using)
+    items = [
+        model(pk=pk, position=(index + 1) * POSITION_GAP)
+        for index, pk in enumerate(siblings.order_by('position', 'pk').values_list('pk', flat=True))
+    ]
+    siblings.bulk_update(items, ['position'])
+    return len(items)
+
+
+def _bounds(siblings, after, before):
+    if before is not None:
+        high = siblings.filter(pk=before).values_list('position', flat=True).first()
+        if high is None:
+            raise LookupError(before)
+        low = siblings.filter(position__lt=high).order_by('-position').values_list('position', flat=True).first()
+        return (high - 2 * POSITION_GAP if low is None else low), high
+    if after is not None:
+        low = siblings.filter(pk=after).values_list('position', flat=True).first()
+        if low is None:
+            raise LookupError(after)
+        high = siblings.filter(position__gt=low).order_by('position').values_list('position', flat=True).first()
+        return low, (low + 2 * POSITION_GAP if high is None else high)
+    high = siblings.order_by('position').values_list('position', flat=True).first()
+    high = POSITION_GAP if high is None else high
+    return high - 2 * POSITION_GAP, high
+
+
+def move(instance, after=None, before=None):
+    """
+    Ставит объект после элемента after или перед элементом before того же списка,
+    а без них - в начало списка. Записывает только позицию объекта.
+    Если элемент не найден в списке, выбрасывает LookupError. Возвращает новую позицию.
+    """
+    model = type(instance)
+    using = router.db_for_write(model, instance=instance)
+    parent_id = getattr(instance, get_parent_attname(model))
+    siblings = get_siblings(model, parent_id, using).exclude(pk=instance.pk)
+    with transaction.atomic(using=using):
+        low, high = _bounds(siblings, after, before)
+        if high - low < 2:
+            rebalance(model, parent_id, using)
+            low, high = _bounds(siblings, after, before)
+        position = (low + high) // 2
+        model._base_manager.db_manager(using).filter(pk=instance.pk).update(position=position)
+        if high - low < 2 * MIN_GAP:
+            transaction.on_commit(
+                lambda: enqueue('courses.rebalance_positions', {'model': model._meta.label_lower, 'parent_id': parent_id}),
+                using=using,
+            )
+    instance.position = position
+    return position
+
+
+class MoveMixin:
+    """
+    Перемещение объекта в списке POST-запросом с MoveSerializer. Доступно владельцу или модераторам.
+    """
+    def post(self, request, *args, **kwargs):
+        user = request.user
+        instance = self.get_object()
+        if get_object_owner_id(request, instance) != user.pk and not user.groups.filter(name='Moderators').exists():
+            raise PermissionDenied("У вас нет разрешения изменять порядок.")
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            position = move(instance, **serializer.validated_data)
+        except LookupError as exc:
+            raise ValidationError({'detail': f'Элемент {exc} не найден в этом списке.'})
+        return Response({'id': instance.pk, 'position': position}, status=status.HTTP_200_OK)
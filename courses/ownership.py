@@ -0,0 +1,53 @@
+from django.apps import apps
+
+# Путь от модели до id владельца. Для вложений, вопросов и ответов владельцем считается владелец материала
+OWNER_LOOKUPS = {
+    'courses.section': 'owner_id',
+    'courses.material': 'owner_id',
+    'courses.attachment': 'material__owner_id',
+    'exams.exam': 'owner_id',
+    'exams.question': 'exam__material__owner_id',
+    'exams.answer': 'question__exam__material__owner_id',
+}
+
+REQUEST_CACHE_ATTR = '_owner_ids'
+
+
+def _get_request_cache(request):
+    if request is None:
+        return {}
+    owner_ids = getattr(request, REQUEST_CACHE_ATTR, None)
+    if owner_ids is None:
+        owner_ids = {}
+        setattr(request, REQUEST_CACHE_ATTR, owner_ids)
+    return owner_ids
+
+
+def get_owner_id(request, model, pk):
+    """
+    Возвращает id владельца объекта модели по первичному ключу одним запросом
+    через цепочку связей. Результат запоминается на время запроса.
+    """
+    if isinstance(model, str):
+        model = apps.get_model(model)
+    label = model._meta.label_lower
+    owner_ids = _get_request_cache(request)
+    key = (label, pk)
+    if key not in owner_ids:
+        owner_ids[key] = model._base_manager.filter(pk=pk).values_list(OWNER_LOOKUPS[label], flat=True).first()
+    return owner_ids[key]
+
+
+def get_object_owner_id(request, obj):
+    """
+    Возвращает id владельца объекта. Если владелец хранится в самом объекте,
+    запрос к базе данных не выполняется.
+    """
+    lookup = OWNER_LOOKUPS[obj._meta.label_lower]
+    if '__' not in lookup:
+        return getattr(obj, lookup)
+    return get_owner_id(request, type(obj), obj.pk)
+
+
+def is_owner(request, obj):
+    return get_object_owner_id(request, obj) == request.user.pk
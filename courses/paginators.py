@@ -0,0 +1,39 @@
+from django.core.paginator import Paginator
+from django.db import connections, router
+from django.utils.functional import cached_property
+
+# Ниже этого порога оценка неточна, и дешевле посчитать строки честно
+ESTIMATE_THRESHOLD = 10000
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор для больших таблиц. Если выборка не отфильтрована, количество строк
+    берётся из статистики PostgreSQL (pg_class.reltuples) вместо полного COUNT(*).
+    Для других баз данных и отфильтрованных выборок используется обычный подсчёт.
+    """
+
+    @cached_property
+    def count(self):
+        estimate = self._get_estimate()
+        if estimate is not None:
+            return estimate
+        return super().count
+
+    def _get_estimate(self):
+        queryset = self.object_list
+        model = getattr(queryset, 'model', None)
+        if model is None:
+            return None
+        if queryset.query.where != model._default_manager.all().query.where:
+            return None
+        database = router.db_for_read(model)
+        connection = connections[database]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples FROM pg_class WHERE relname = %s', [model._meta.db_table])
+            row = cursor.fetchone()
+        if row is None or row[0] < ESTIMATE_THRESHOLD:
+            return None
+        return int(row[0])
@@ -1,4 +1,7 @@
-from rest_framework.permissions import BasePermission
+from rest_framework.permissions import BasePermission, SAFE_METHODS
+
+from courses.ownership import is_owner
+from tenants.context import get_user_tenant
 
 
 class IsModerator(BasePermission):
@@ -21,8 +24,19 @@ class IsModeratorReadOnly(BasePermission):
 
 
 class IsOwner(BasePermission):
-
+    """
+    Правило доступа для владельца объекта. Владелец определяется через courses.ownership
+    без загрузки объектов пользователя и промежуточных объектов.
+    """
     def has_object_permission(self, request, view, obj):
-        if request.user == obj.owner:
+        if is_owner(request, obj):
             return request.method in ['GET', 'PUT', 'PATCH', 'DELETE']
         return False
+
+
+class IsPublicReadOnly(BasePermission):
+    """
+    Правило доступа, разрешающее только чтение публичных объектов школы пользователя.
+    """
+    def has_object_permission(self, request, view, obj):
+        return request.method in SAFE_METHODS and obj.is_public and obj.tenant == get_user_tenant(request.user)
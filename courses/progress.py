@@ -0,0 +1,209 @@
+import atexit
+import threading
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import close_old_connections, connections, router, transaction
+
+from courses.models import MaterialProgress
+
+# Функции выбора большего и меньшего значения в выражении ON CONFLICT DO UPDATE.
+# В PostgreSQL LEAST пропускает NULL, в SQLite min() с NULL даёт NULL - это покрывает COALESCE.
+UPSERT_FUNCTIONS = {
+    'postgresql': ('GREATEST', 'LEAST'),
+    'sqlite': ('max', 'min'),
+}
+PROGRESS_FIELDS = ['user_id', 'material_id', 'status', 'first_opened_at', 'last_seen_at', 'completed_at']
+
+
+@dataclass
+class ProgressState:
+    status: int
+    first_opened_at: object
+    last_seen_at: object
+    completed_at: object = None
+
+    def merge(self, other):
+        """
+        Объединяет два состояния: статус только повышается, первое открытие - самое раннее,
+        последнее обращение - самое позднее.
+        """
+        self.status = max(self.status, other.status)
+        self.first_opened_at = min(self.first_opened_at, other.first_opened_at)
+        self.last_seen_at = max(self.last_seen_at, other.last_seen_at)
+        completed = [value for value in (self.completed_at, other.completed_at) if value is not None]
+        self.completed_at = min(completed) if completed else None
+
+
+def event_to_state(event, occurred_at):
+    completed = event == 'complete'
+    return ProgressState(
+        status=MaterialProgress.STATUS_COMPLETED if completed else MaterialProgress.STATUS_OPENED,
+        first_opened_at=occurred_at,
+        last_seen_at=occurred_at,
+        completed_at=occurred_at if completed else None,
+    )
+
+
+class ProgressBuffer:
+    """
+    Буфер событий прогресса в памяти процесса.
+
+    События по одной паре пользователь - материал сливаются в одно состояние,
+    поэтому размер буфера ограничен числом различных пар, а не числом событий.
+    Буфер сбрасывается в базу одним INSERT ... ON CONFLICT DO UPDATE на каждую базу школы по таймеру,
+    при переполнении и при завершении процесса. Слияние с сохранённой строкой выполняется в самом
+    выражении обновления, поэтому одновременный сброс из другого процесса не понизит статус
+    и не сдвинет время первого открытия. База запоминается при добавлении события,
+    поскольку сброс выполняется вне запроса.
+    """
+    def __init__(self, max_size=None, flush_interval=None):
+        self._max_size = max_size
+        self._flush_interval = flush_interval
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer = None
+
+    @property
+    def max_size(self):
+        return self._max_size or settings.PROGRESS_BUFFER_MAX_SIZE
+
+    @property
+    def flush_interval(self):
+        if self._flush_interval is not None:
+            return self._flush_interval
+        return settings.PROGRESS_FLUSH_INTERVAL
+
+    def add(self, user_id, material_id, event, occurred_at):
+        state = event_to_state(event, occurred_at)
+        key = (router.db_for_write(MaterialProgress), user_id, material_id)
+        with self._lock:
+            current = self._pending.get(key)
+            if current is None:
+                self._pending[key] = state
+            else:
+                current.merge(state)
+            overflow = len(self._pending) >= self.max_size
+        if overflow:
+            self.flush()
+        else:
+            self._schedule()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def _schedule(self):
+        if not self.flush_interval or self._timer is not None:
+            return
+        with self._lock:
+            if self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _flush_from_timer(self):
+        with self._lock:
+            self._timer = None
+        close_old_connections()
+        try:
+            self.flush()
+        finally:
+            close_old_connections()
+
+    def flush(self):
+        """
+        Записывает накопленные состояния в базу. Возвращает количество записанных строк.
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            by_database = {}
+            for (using, user_id, material_id), state in pending.items():
+                by_database.setdefault(using, {})[(user_id, material_id)] = state
+            for using, states in by_database.items():
+                if connections[using].vendor in UPSERT_FUNCTIONS:
+                    self._upsert(using, states)
+                else:
+                    self._locked_merge(using, states)
+            return len(pending)
+
+    def _upsert(self, using, pending):
+        """
+        Записывает состояния пачками INSERT ... ON CONFLICT DO UPDATE, сливая их с сохранёнными
+        строками средствами базы: статус и время последнего обращения только растут,
+        время первого открытия и прохождения - только уменьшаются.
+        """
+        connection = connections[using]
+        greatest, least = UPSERT_FUNCTIONS[connection.vendor]
+        opts = MaterialProgress._meta
+        qn = connection.ops.quote_name
+        table = qn(opts.db_table)
+        fields = [opts.get_field(name) for name in PROGRESS_FIELDS]
+        columns = {field.name: qn(field.column) for field in fields}
+        update = ', '.join([
+            f'{columns["status"]} = {greatest}({table}.{columns["status"]}, EXCLUDED.{columns["status"]})',
+            f'{columns["first_opened_at"]} = '
+            f'{least}({table}.{columns["first_opened_at"]}, EXCLUDED.{columns["first_opened_at"]})',
+            f'{columns["last_seen_at"]} = '
+            f'{greatest}({table}.{columns["last_seen_at"]}, EXCLUDED.{columns["last_seen_at"]})',
+            f'{columns["completed_at"]} = COALESCE('
+            f'{least}({table}.{columns["completed_at"]}, EXCLUDED.{columns["completed_at"]}), '
+            f'{table}.{columns["completed_at"]}, EXCLUDED.{columns["completed_at"]})',
+        ])
+        objs = [
+            MaterialProgress(user_id=user_id, material_id=material_id, **state.__dict__)
+            for (user_id, material_id), state in sorted(pending.items())
+        ]
+        batch_size = max(connection.ops.bulk_batch_size(fields, objs), 1)
+        placeholder = '(' + ', '.join(['%s'] * len(fields)) + ')'
+        with connection.cursor() as cursor:
+            for start in range(0, len(objs), batch_size):
+                batch = objs[start:start + batch_size]
+                params = [
+                    field.get_db_prep_save(getattr(obj, field.attname), connection)
+                    for obj in batch for field in fields
+                ]
+                cursor.execute(
+                    f'INSERT INTO {table} ({", ".join(columns[field.name] for field in fields)}) '
+                    f'VALUES {", ".join([placeholder] * len(batch))} '
+                    f'ON CONFLICT ({columns["user"]}, {columns["material"]}) DO UPDATE SET {update}',
+                    params,
+                )
+
+    def _locked_merge(self, using, pending):
+        """
+        Запасной путь для баз без ON CONFLICT: сохранённые строки блокируются select_for_update
+        и сливаются с буфером в одной транзакции с записью.
+        """
+        with transaction.atomic(using=using):
+            self._merge_existing(using, pending)
+            MaterialProgress.objects.using(using).bulk_create(
+                [
+                    MaterialProgress(user_id=user_id, material_id=material_id, **state.__dict__)
+                    for (user_id, material_id), state in pending.items()
+                ],
+                update_conflicts=True,
+                unique_fields=['user', 'material'],
+                update_fields=['status', 'first_opened_at', 'last_seen_at', 'completed_at'],
+            )
+
+    def _merge_existing(self, using, pending):
+        """
+        Дополняет состояния сохранёнными в базе одним запросом с блокировкой строк,
+        чтобы пройденный материал не стал снова открытым, а время первого открытия не сдвинулось.
+        """
+        user_ids = {user_id for user_id, _ in pending}
+        material_ids = {material_id for _, material_id in pending}
+        existing = MaterialProgress.objects.using(using).select_for_update().filter(
+            user_id__in=user_ids, material_id__in=material_ids
+        ).values_list('user_id', 'material_id', 'status', 'first_opened_at', 'last_seen_at', 'completed_at')
+        for user_id, material_id, *values in existing:
+            state = pending.get((user_id, material_id))
+            if state is not None:
+                state.merge(ProgressState(*values))
+
+progress_buffer = ProgressBuffer()
+atexit.register(progress_buffer.flush)
@@ -0,0 +1,79 @@
+from django.db import transaction, router
+from django.utils import timezone
+
+from courses.models import (
+    Section, Material, MaterialProgress, MaterialBand, MaterialSignature, MaterialRevision, SectionPurge,
+    Attachment, AttachmentUpload,
+)
+from exams.models import Exam, Question, Answer, ReviewItem, ExamSession
+from tenants.context import get_tenant_databases
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Для каждого этапа: модель и путь от неё до раздела. Удаление идёт снизу вверх,
+# поэтому каскадное удаление в базе данных не срабатывает и строки не загружаются в память
+STAGE_TARGETS = {
+    'answers': (Answer, 'question__exam__material__section_id'),
+    'reviews': (ReviewItem, 'question__exam__material__section_id'),
+    'sessions': (ExamSession, 'exam__material__section_id'),
+    'questions': (Question, 'exam__material__section_id'),
+    'exams': (Exam, 'material__section_id'),
+    'progress': (MaterialProgress, 'material__section_id'),
+    'bands': (MaterialBand, 'material__section_id'),
+    'signatures': (MaterialSignature, 'material__section_id'),
+    'revisions': (MaterialRevision, 'material__section_id'),
+    'attachments': (Attachment, 'material__section_id'),
+    'uploads': (AttachmentUpload, 'material__section_id'),
+    'materials': (Material, 'section_id'),
+    'section': (Section, 'pk'),
+}
+
+
+def delete_batch(model, lookup, section_id, batch_size, using=None):
+    """
+    Удаляет одну порцию строк модели, относящихся к разделу, без загрузки объектов.
+    Возвращает количество удалённых строк.
+    """
+    using = using or router.db_for_write(model)
+    manager = model._base_manager.db_manager(using)
+    ids = list(manager.filter(**{lookup: section_id}).values_list('pk', flat=True)[:batch_size])
+    if not ids:
+        return 0
+    return manager.filter(pk__in=ids)._raw_delete(using)
+
+
+def purge_section(purge, batch_size=DEFAULT_BATCH_SIZE, max_batches=None):
+    """
+    Выполняет задачу очистки раздела порциями, сохраняя прогресс после каждой порции.
+    Прерванную задачу можно продолжить с сохранённого этапа.
+    Возвращает True, если задача завершена. Строки удаляются в той базе, из которой загружена задача.
+    """
+    using = purge._state.db
+    batches = 0
+    while purge.stage != 'done':
+        if max_batches is not None and batches >= max_batches:
+            return False
+        model, lookup = STAGE_TARGETS[purge.stage]
+        with transaction.atomic(using=using):
+            deleted = delete_batch(model, lookup, purge.section_id, batch_size, using)
+            if deleted:
+                purge.deleted_rows += deleted
+            else:
+                purge.stage = SectionPurge.STAGES[SectionPurge.STAGES.index(purge.stage) + 1]
+                if purge.stage == 'done':
+                    purge.finished_at = timezone.now()
+            purge.save(update_fields=['stage', 'deleted_rows', 'finished_at', 'updated_at'])
+        batches += 1
+    return True
+
+
+def purge_deleted_sections(batch_size=DEFAULT_BATCH_SIZE, max_batches=None):
+    """
+    Обрабатывает незавершённые задачи очистки во всех базах школ. Возвращает количество завершённых задач.
+    """
+    finished = 0
+    for using in get_tenant_databases():
+        for purge in SectionPurge.objects.using(using).exclude(stage='done').order_by('pk'):
+            if purge_section(purge, batch_size, max_batches):
+                finished += 1
+    return finished
@@ -0,0 +1,208 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.html import escape
+
+# Меняется при изменении правил отрисовки, чтобы не отдавать устаревший HTML из кеша
+RENDERER_VERSION = 2
+CACHE_KEY_FORMAT = 'material_html:%(version)s:%(digest)s'
+
+HEADING_RE = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+BULLET_RE = re.compile(r'^\s*[-*+]\s+(.*)$')
+ORDERED_RE = re.compile(r'^\s*\d+[.)]\s+(.*)$')
+QUOTE_RE = re.compile(r'^\s*>\s?(.*)$')
+RULE_RE = re.compile(r'^\s*([-*_])(\s*\1){2,}\s*$')
+FENCE_RE = re.compile(r'^\s*```')
+
+CODE_SPAN_RE = re.compile(r'`([^`]+)`')
+LINK_RE = re.compile(r'\[([^\]]+)\]\(([^)\s]+)\)')
+# Выделение только на границах слов, чтобы не разбирать snake_case и 2*3*4
+STRONG_RE = re.compile(r'(?<!\w)(\*\*|__)(?=\S)(.+?)(?<=\S)\1(?!\w)')
+EMPHASIS_RE = re.compile(r'(?<!\w)(\*|_)(?=\S)(.+?)(?<=\S)\1(?!\w)')
+SAFE_URL_RE = re.compile(r'^(https?://|mailto:|/|#)', re.IGNORECASE)
+
+
+def _render_emphasis(text):
+    text = STRONG_RE.sub(r'<strong>\2</strong>', text)
+    return EMPHASIS_RE.sub(r'<em>\2</em>', text)
+
+
+def _render_link(match):
+    text, url = match.groups()
+    if not SAFE_URL_RE.match(url):
+        return _render_emphasis(text)
+    return f'<a href="{url}" rel="nofollow noopener">{_render_emphasis(text)}</a>'
+
+
+def _render_text(text):
+    """
+    Отрисовывает ссылки и выделение. Выделение применяется к тексту ссылок, но не к их адресам.
+    """
+    parts = []
+    position = 0
+    for match in LINK_RE.finditer(text):
+        parts.append(_render_emphasis(text[position:match.start()]))
+        parts.append(_render_link(match))
+        position = match.end()
+    parts.append(_render_emphasis(text[position:]))
+    return ''.join(parts)
+
+
+def render_inline(text):
+    """
+    Отрисовывает строчную разметку. Текст экранируется до разбора,
+    поэтому HTML из исходного текста в результат не попадает.
+    """
+    parts = []
+    position = 0
+    for match in CODE_SPAN_RE.finditer(text):
+        parts.append(_render_text(escape(text[position:match.start()])))
+        parts.append(f'<code>{escape(match.group(1))}</code>')
+        position = match.end()
+    parts.append(_render_text(escape(text[position:])))
+    return ''.join(parts)
+
+
+def render_markdown(text):
+    """
+    Преобразует Markdown в безопасный HTML.
+    Поддерживаются заголовки, абзацы, списки, цитаты, блоки кода, горизонтальные линии,
+    выделение, код и ссылки с разрешёнными схемами.
+    """
+    html = []
+    paragraph = []
+    list_tag = None
+    lines = text.replace('\r\n', '\n').split('\n')
+
+    def close_paragraph():
+        if paragraph:
+            html.append(f'<p>{render_inline(" ".join(paragraph))}</p>')
+            paragraph.clear()
+
+    def close_list():
+        nonlocal list_tag
+        if list_tag:
+            html.append(f'</{list_tag}>')
+            list_tag = None
+
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        index += 1
+
+        if FENCE_RE.match(line):
+            close_paragraph()
+            close_list()
+            code = []
+            while index < len(lines) and not FENCE_RE.match(lines[index]):
+                code.append(lines[index])
+                index += 1
+            index += 1
+            html.append(f'<pre><code>{escape(chr(10).join(code))}</code></pre>')
+            continue
+
+        if not line.strip():
+            close_paragraph()
+            close_list()
+            continue
+
+        heading = HEADING_RE.match(line)
+        if heading:
+            close_paragraph()
+            close_list()
+            level = len(heading.group(1))
+            html.append(f'<h{level}>{render_inline(heading.group(2))}</h{level}>')
+            continue
+
+        if RULE_RE.match(line):
+            close_paragraph()
+            close_list()
+            html.append('<hr>')
+            continue
+
+        for tag, pattern in (('ul', BULLET_RE), ('ol', ORDERED_RE)):
+            item = pattern.match(line)
+            if item:
+                close_paragraph()
+                if list_tag != tag:
+                    close_list()
+                    html.append(f'<{tag}>')
+                    list_tag = tag
+                html.append(f'<li>{render_inline(item.group(1))}</li>')
+                break
+        else:
+            quote = QUOTE_RE.match(line)
+            if quote:
+                close_paragraph()
+                close_list()
+                html.append(f'<blockquote><p>{render_inline(quote.group(1))}</p></blockquote>')
+            else:
+                close_list()
+                paragraph.append(line.strip())
+
+    close_paragraph()
+    close_list()
+    return '\n'.join(html)
+
+
+class LRUCache:
+    """
+    Ограниченный по размеру потокобезопасный кеш, вытесняющий давно не использованные записи.
+    """
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return None
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+local_cache = LRUCache(getattr(settings, 'MATERIAL_RENDER_CACHE_SIZE', 256))
+
+
+def content_digest(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def render_material_content(text):
+    """
+    Возвращает HTML для содержимого материала.
+    Результат кешируется по хешу содержимого сначала в памяти процесса, затем в кеше Django,
+    поэтому одинаковый текст отрисовывается один раз для всех материалов.
+    """
+    digest = content_digest(text)
+    rendered = local_cache.get(digest)
+    if rendered is not None:
+        return rendered
+
+    key = CACHE_KEY_FORMAT % {'version': RENDERER_VERSION, 'digest': digest}
+    rendered = cache.get(key)
+    if rendered is None:
+        rendered = render_markdown(text)
+        cache.set(key, rendered, getattr(settings, 'MATERIAL_RENDER_CACHE_TIMEOUT', 60 * 60 * 24))
+    local_cache.set(digest, rendered)
+    return rendered
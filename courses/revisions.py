@@ -0,0 +1,118 @@
+"""
+История содержимого материалов.
+
+Версия с номером n хранится целиком (снимок), если (n - 1) делится на MATERIAL_REVISION_SNAPSHOT_INTERVAL,
+иначе - разницей с версией n - 1 по строкам. Разница - список операций: [начало, конец] копирует
+строки предыдущей версии, строка вставляется как есть. Снимки и разницы сжимаются тем же кодеком,
+что и содержимое материалов. Восстановление версии читает одним запросом ближайший снимок
+и не больше MATERIAL_REVISION_SNAPSHOT_INTERVAL - 1 разниц после него.
+"""
+import difflib
+import json
+
+from django.conf import settings
+from django.db import router, transaction
+
+from courses.fields import compress_text, decompress_text
+from courses.models import MaterialRevision
+
+
+def make_delta(old, new):
+    """
+    Возвращает операции, которые превращают текст old в new.
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    ops = []
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append([i1, i2])
+        elif j1 != j2:
+            ops.append(''.join(new_lines[j1:j2]))
+    return ops
+
+
+def apply_delta(old, ops):
+    old_lines = old.splitlines(keepends=True)
+    return ''.join(''.join(old_lines[op[0]:op[1]]) if isinstance(op, list) else op for op in ops)
+
+
+def is_snapshot_number(number):
+    return (number - 1) % settings.MATERIAL_REVISION_SNAPSHOT_INTERVAL == 0
+
+
+def _revisions(material_id, using):
+    return MaterialRevision.objects.using(using).filter(material_id=material_id)
+
+
+def _rebuild(rows):
+    """
+    Восстанавливает содержимое по строкам (номер, снимок, данные) от снимка по порядку номеров.
+    """
+    content = None
+    for number, is_snapshot, data in rows:
+        text = decompress_text(data)
+        content = text if is_snapshot else apply_delta(content, json.loads(text))
+    return content
+
+
+def get_revision_content(material_id, number, using=None):
+    """
+    Возвращает содержимое версии материала или None, если такой версии нет.
+    """
+    using = using or router.db_for_read(MaterialRevision)
+    revisions = _revisions(material_id, using)
+    snapshot = (
+        revisions.filter(number__lte=number, is_snapshot=True)
+        .order_by('-number').values_list('number', flat=True).first()
+    )
+    if snapshot is None:
+        return None
+    rows = list(
+        revisions.filter(number__gte=snapshot, number__lte=number)
+        .order_by('number').values_list('number', 'is_snapshot', 'data')
+    )
+    if rows[-1][0] != number:
+        return None
+    return _rebuild(rows)
+
+
+def record_revision(material, content, author_id=None):
+    """
+    Записывает новую версию содержимого материала, если оно отличается от последней версии.
+    Возвращает версию или None.
+    """
+    using = router.db_for_write(MaterialRevision, instance=material)
+    with transaction.atomic(using=using):
+        last = _revisions(material.pk, using).order_by('-number').values_list('number', flat=True).first()
+        number = 1 if last is None else last + 1
+        previous = None if last is None else get_revision_content(material.pk, last, using)
+        if previous == content:
+            return None
+        if previous is None or is_snapshot_number(number):
+            is_snapshot, data = True, content
+        else:
+            is_snapshot, data = False, json.dumps(make_delta(previous, content), ensure_ascii=False)
+        return MaterialRevision.objects.using(using).create(
+            material_id=material.pk,
+            number=number,
+            is_snapshot=is_snapshot,
+            data=compress_text(data),
+            size=len(content),
+            author_id=author_id,
+        )
+
+
+def diff_revisions(material_id, first, second, using=None):
+    """
+    Возвращает разницу двух версий в формате unified diff или None, если версии нет.
+    """
+    old = get_revision_content(material_id, first, using)
+    new = get_revision_content(material_id, second, using)
+    if old is None or new is None:
+        return None
+    return ''.join(difflib.unified_diff(
+        old.splitlines(keepends=True), new.splitlines(keepends=True),
+        fromfile=f'версия {first}', tofile=f'версия {second}',
+    ))
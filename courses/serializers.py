@@ -1,13 +1,36 @@
+from django.conf import settings
 from rest_framework import serializers
-from .models import Section, Material
+from .fastread import ValuesSerializer
+from .fields import decompress_text
+from .models import Section, Material, MaterialProgress, MaterialRevision, Attachment, AttachmentUpload
+from .rendering import render_material_content
+
+CONTENT_FORMATS = ('markdown', 'html')
 
 
 class MaterialSerializer(serializers.ModelSerializer):
+    content = serializers.CharField()
+
     class Meta:
         model = Material
         fields = ['id', 'section', 'title', 'content', 'owner']
         read_only_fields = ['owner']
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if self.context.get('content_format') == 'html':
+            data['content'] = render_material_content(data['content'])
+        return data
+
+
+class MaterialValuesSerializer(ValuesSerializer):
+    """
+    Быстрый вариант MaterialSerializer для списков.
+    """
+    model = Material
+    fields = ['id', 'section', 'title', 'content', 'owner']
+    converters = {'content': decompress_text}
+
 
 class SectionSerializer(serializers.ModelSerializer):
     materials_count = serializers.SerializerMethodField()
@@ -20,3 +43,101 @@ class SectionSerializer(serializers.ModelSerializer):
 
     def get_materials_count(self, instance):
         return instance.materials.count()  # lessons из модели Courses через related_name
+
+
+class ProgressEventSerializer(serializers.Serializer):
+    material = serializers.IntegerField()
+    event = serializers.ChoiceField(choices=['open', 'complete'])
+    occurred_at = serializers.DateTimeField(required=False)
+
+
+class MaterialProgressSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MaterialProgress
+        fields = ['material', 'status', 'first_opened_at', 'last_seen_at', 'completed_at']
+
+
+class MaterialRevisionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MaterialRevision
+        fields = ['number', 'is_snapshot', 'size', 'author', 'created_at']
+
+
+class AttachmentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Attachment
+        fields = ['id', 'material', 'owner', 'filename', 'content_type', 'size', 'sha256', 'created_at']
+
+
+class AttachmentUploadSerializer(serializers.ModelSerializer):
+    """
+    Начало загрузки вложения: имя, тип и размер файла. Части отправляются запросами PUT
+    с заголовком Content-Range, received показывает, с какого байта продолжать.
+    """
+    content_type = serializers.CharField(max_length=100, required=False, default='application/octet-stream')
+
+    class Meta:
+        model = AttachmentUpload
+        fields = ['id', 'material', 'filename', 'content_type', 'size', 'received', 'created_at', 'updated_at']
+        read_only_fields = ['material', 'received']
+
+    def validate_filename(self, value):
+        # Путь клиента не нужен: имя используется только в Content-Disposition
+        return value.replace('\\', '/').rsplit('/', 1)[-1] or 'file'
+
+    def validate_size(self, value):
+        if value == 0:
+            raise serializers.ValidationError('Файл не должен быть пустым.')
+        if value > settings.ATTACHMENT_MAX_SIZE:
+            raise serializers.ValidationError(f'Размер файла не должен превышать {settings.ATTACHMENT_MAX_SIZE} байт.')
+        return value
+
+
+class MoveSerializer(serializers.Serializer):
+    """
+    Перемещение в списке: {"after": id} - после элемента, {"before": id} - перед элементом,
+    {"after": null} - в начало списка.
+    """
+    after = serializers.IntegerField(required=False, allow_null=True)
+    before = serializers.IntegerField(required=False)
+
+    def validate(self, attrs):
+        if ('after' in attrs) == ('before' in attrs):
+            raise serializers.ValidationError('Нужно указать after или before.')
+        return attrs
+
+
+class SectionCloneSerializer(serializers.ModelSerializer):
+    """
+    Параметры копирования раздела и ответ с созданной копией. Название по умолчанию - '<название> (копия)'.
+    """
+    title = serializers.CharField(max_length=200, required=False)
+
+    class Meta:
+        model = Section
+        fields = ['id', 'title', 'description', 'owner', 'is_public']
+        read_only_fields = ['description', 'owner', 'is_public']
+
+
+class DashboardExamSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+    is_public = serializers.BooleanField()
+    questions_count = serializers.IntegerField()
+
+
+class DashboardMaterialSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+    owner = serializers.IntegerField(source='owner_id')
+    is_public = serializers.BooleanField()
+    exams_count = serializers.IntegerField()
+    exams = DashboardExamSerializer(source='visible_exams', many=True)
+
+
+class SectionDashboardSerializer(serializers.ModelSerializer):
+    materials = DashboardMaterialSerializer(source='visible_materials', many=True)
+
+    class Meta:
+        model = Section
+        fields = ['id', 'title', 'description', 'owner', 'is_public', 'materials']
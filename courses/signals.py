@@ -0,0 +1,40 @@
+from django.db import router, transaction
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+
+from courses.models import Material
+from courses.ordering import assign_position
+from courses.revisions import record_revision
+from jobs.registry import enqueue
+
+
+@receiver(post_save, sender=Material)
+def update_material_signature(sender, instance, update_fields=None, raw=False, **kwargs):
+    """
+    Ставит в очередь пересчёт сигнатуры для поиска похожих материалов, если содержимое было задано
+    или изменено: для длинного текста расчёт MinHash занимает секунды и не должен задерживать запрос.
+    Нераспакованное содержимое (байты) не менялось с момента загрузки, поэтому такие сохранения пропускаются.
+    """
+    if raw or (update_fields is not None and 'content' not in update_fields):
+        return
+    if isinstance(instance.__dict__.get('content'), str):
+        transaction.on_commit(
+            lambda: enqueue('courses.index_material', {'material_id': instance.pk}),
+            using=router.db_for_write(Material, instance=instance),
+        )
+
+
+@receiver(post_save, sender=Material)
+def record_material_revision(sender, instance, update_fields=None, raw=False, **kwargs):
+    """
+    Записывает версию содержимого, если оно было задано или изменено. Автором считается владелец
+    материала: при изменении через API им становится пользователь, который внёс изменение.
+    """
+    if raw or (update_fields is not None and 'content' not in update_fields):
+        return
+    content = instance.__dict__.get('content')
+    if isinstance(content, str):
+        record_revision(instance, content, author_id=instance.owner_id)
+
+
+pre_save.connect(assign_position, sender=Material, dispatch_uid='material_position')
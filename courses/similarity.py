@@ -0,0 +1,197 @@
+"""
+Поиск похожих материалов по MinHash и LSH.
+
+Содержимое разбивается на шинглы - последовательности из SHINGLE_SIZE слов.
+MinHash-сигнатура из NUM_PERM чисел сохраняет оценку коэффициента Жаккара между множествами шинглов,
+а её полосы по ROWS_PER_BAND чисел индексируются в MaterialBand. Кандидаты в похожие находятся
+по совпадению хеша хотя бы одной полосы через индекс (band, hash), а не перебором всех пар.
+Порог, с которого пара становится кандидатом, примерно (1 / BANDS) ** (1 / ROWS_PER_BAND) ≈ 0.7.
+"""
+import hashlib
+import random
+import re
+import zlib
+from array import array
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Count, Q
+
+from courses.models import Material, MaterialBand, MaterialSignature
+
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+# Коэффициенты хеш-функций фиксированы, чтобы сигнатуры совпадали во всех процессах
+_random = random.Random(20240501)
+PERMUTATIONS = [
+    (_random.randrange(1, MERSENNE_PRIME), _random.randrange(0, MERSENNE_PRIME)) for _ in range(NUM_PERM)
+]
+
+WORD_RE = re.compile(r'\w+')
+
+
+def shingle_hashes(text):
+    """
+    Возвращает множество 32-битных хешей шинглов текста без учёта регистра и пунктуации.
+    """
+    words = WORD_RE.findall(text.lower())
+    if not words:
+        return set()
+    if len(words) < SHINGLE_SIZE:
+        return {zlib.crc32(' '.join(words).encode('utf-8'))}
+    return {
+        zlib.crc32(' '.join(words[i:i + SHINGLE_SIZE]).encode('utf-8'))
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    }
+
+
+def minhash(hashes):
+    """
+    Вычисляет MinHash-сигнатуру множества хешей шинглов.
+    """
+    return array('I', [
+        min((a * value + b) % MERSENNE_PRIME for value in hashes) & MAX_HASH
+        for a, b in PERMUTATIONS
+    ])
+
+
+def band_hashes(signature):
+    """
+    Возвращает знаковые 64-битные хеши полос сигнатуры для индекса LSH.
+    """
+    hashes = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        hashes.append(int.from_bytes(hashlib.blake2b(rows.tobytes(), digest_size=8).digest(), 'big', signed=True))
+    return hashes
+
+
+def load_signature(value):
+    signature = array('I')
+    signature.frombytes(bytes(value))
+    return signature
+
+
+def estimate_similarity(first, second):
+    """
+    Оценивает коэффициент Жаккара двух материалов по доле совпадающих чисел сигнатур.
+    """
+    return sum(1 for a, b in zip(first, second) if a == b) / NUM_PERM
+
+
+def get_threshold(threshold=None):
+    return settings.MATERIAL_SIMILARITY_THRESHOLD if threshold is None else threshold
+
+
+def index_material(material, content=None):
+    """
+    Пересчитывает сигнатуру и полосы материала. Если содержимое не менялось, ничего не делает.
+    Материал без слов удаляется из индекса. Возвращает True, если индекс обновлён.
+    """
+    content = material.content if content is None else content
+    content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+    using = router.db_for_write(MaterialSignature, instance=material)
+    current = MaterialSignature.objects.using(using).filter(material_id=material.pk).values_list(
+        'content_hash', flat=True
+    ).first()
+    if current == content_hash:
+        return False
+
+    hashes = shingle_hashes(content)
+    with transaction.atomic(using=using):
+        MaterialBand.objects.using(using).filter(material_id=material.pk).delete()
+        if not hashes:
+            MaterialSignature.objects.using(using).filter(material_id=material.pk).delete()
+            return True
+        signature = minhash(hashes)
+        MaterialSignature.objects.using(using).update_or_create(
+            material_id=material.pk,
+            defaults={'content_hash': content_hash, 'signature': signature.tobytes()},
+        )
+        MaterialBand.objects.using(using).bulk_create([
+            MaterialBand(material_id=material.pk, band=band, hash=value)
+            for band, value in enumerate(band_hashes(signature))
+        ])
+    return True
+
+
+def _signatures(material_ids):
+    return {
+        material_id: load_signature(value)
+        for material_id, value in MaterialSignature.objects.filter(material_id__in=material_ids).values_list(
+            'material_id', 'signature'
+        )
+    }
+
+
+def find_similar(material, threshold=None):
+    """
+    Возвращает список (id материала, оценка сходства) для материалов той же школы,
+    похожих на данный, по убыванию сходства.
+    """
+    threshold = get_threshold(threshold)
+    bands = list(MaterialBand.objects.filter(material_id=material.pk).values_list('band', 'hash'))
+    if not bands:
+        return []
+    matches = Q()
+    for band, value in bands:
+        matches |= Q(band=band, hash=value)
+    candidates = MaterialBand.objects.filter(matches).exclude(material_id=material.pk).values('material_id')
+    candidates = set(Material.objects.filter(pk__in=candidates, tenant=material.tenant).values_list('pk', flat=True))
+    signatures = _signatures(candidates | {material.pk})
+    own = signatures.pop(material.pk)
+    scored = [(material_id, estimate_similarity(own, signature)) for material_id, signature in signatures.items()]
+    return sorted([item for item in scored if item[1] >= threshold], key=lambda item: (-item[1], item[0]))
+
+
+def find_clusters(threshold=None, tenant=None):
+    """
+    Возвращает группы похожих материалов: списки id по возрастанию, крупные группы первыми.
+    Кандидаты берутся из полос с повторяющимися хешами через GROUP BY по индексу,
+    пары проверяются по сигнатурам и объединяются в группы.
+    """
+    threshold = get_threshold(threshold)
+    alive = Material.objects.all()
+    if tenant is not None:
+        alive = alive.filter(tenant=tenant)
+    shared = (
+        MaterialBand.objects.filter(material__in=alive).values('band', 'hash')
+        .annotate(materials=Count('material')).filter(materials__gt=1)
+    )
+    buckets = {}
+    for band, value, material_id in MaterialBand.objects.filter(
+        material__in=alive, hash__in=shared.values('hash')
+    ).values_list('band', 'hash', 'material_id'):
+        buckets.setdefault((band, value), []).append(material_id)
+
+    pairs = set()
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        members.sort()
+        pairs.update((a, b) for i, a in enumerate(members) for b in members[i + 1:])
+    signatures = _signatures({material_id for pair in pairs for material_id in pair})
+
+    parent = {}
+
+    def find(item):
+        parent.setdefault(item, item)
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    for a, b in pairs:
+        if a in signatures and b in signatures and estimate_similarity(signatures[a], signatures[b]) >= threshold:
+            parent[find(a)] = find(b)
+
+    clusters = {}
+    for item in parent:
+        clusters.setdefault(find(item), []).append(item)
+    return sorted((sorted(members) for members in clusters.values() if len(members) > 1), key=lambda c: (-len(c), c))
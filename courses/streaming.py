@@ -0,0 +1,92 @@
+import hashlib
+import re
+
+from django.http import HttpResponse, StreamingHttpResponse
+
+from courses.fields import iter_decompressed
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range_header(header, size):
+    """
+    Разбирает заголовок Range с одним диапазоном байт.
+    Возвращает (start, end) включительно или None, если отдавать нужно весь ответ.
+    Несколько диапазонов и синтаксически неверный заголовок игнорируются, как допускает RFC 9110.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Суффиксный диапазон: последние N байт
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable
+        return max(size - length, 0), size - 1
+    start = int(first)
+    if start >= size:
+        raise RangeNotSatisfiable
+    end = int(last) if last else size - 1
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def iter_byte_range(chunks, start, end):
+    """
+    Отдаёт из потока порций только байты с start по end включительно.
+    """
+    position = 0
+    for chunk in chunks:
+        chunk_end = position + len(chunk)
+        if chunk_end > start:
+            yield chunk[max(start - position, 0):end + 1 - position]
+        position = chunk_end
+        if position > end:
+            return
+
+
+def stored_content_response(request, stored, size, content_type='text/plain; charset=utf-8'):
+    """
+    Формирует ответ с содержимым из сжатого хранимого значения с поддержкой
+    Range, If-Range и If-None-Match. Текст распаковывается и отдаётся порциями.
+    size - размер распакованного содержимого в байтах, сохранённый вместе с ним,
+    поэтому для заголовков значение не распаковывается целиком.
+    """
+    etag = '"%s"' % hashlib.sha256(stored).hexdigest()[:32]
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponse(status=304)
+        response['ETag'] = etag
+        return response
+
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    if if_range is None or if_range == etag:
+        try:
+            byte_range = parse_range_header(request.headers.get('Range'), size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            response['Accept-Ranges'] = 'bytes'
+            return response
+
+    if byte_range is None:
+        response = StreamingHttpResponse(iter_decompressed(stored), content_type=content_type)
+        response['Content-Length'] = size
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            iter_byte_range(iter_decompressed(stored), start, end), content_type=content_type, status=206
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    return response
@@ -0,0 +1,43 @@
+from django.apps import apps
+
+from jobs.registry import task
+from courses.attachments import collect_garbage
+from courses.models import Material
+from courses.ordering import rebalance
+from courses.purge import purge_deleted_sections as purge
+from courses.similarity import index_material
+
+
+@task(name='courses.purge_deleted_sections', queue='purge')
+def purge_deleted_sections():
+    """
+    Удаляет содержимое разделов, помеченных на удаление, во всех базах школ.
+    """
+    purge()
+
+
+@task(name='courses.rebalance_positions', queue='default')
+def rebalance_positions(model, parent_id):
+    """
+    Расставляет позиции списка материалов раздела или вопросов теста заново с равными промежутками.
+    """
+    rebalance(apps.get_model(model), parent_id)
+
+
+@task(name='courses.index_material', queue='default')
+def index_material_signature(material_id):
+    """
+    Пересчитывает сигнатуру материала для поиска похожих по его текущему содержимому.
+    Удалённый к этому времени материал пропускается.
+    """
+    material = Material.all_objects.with_content().filter(pk=material_id).first()
+    if material is not None:
+        index_material(material)
+
+
+@task(name='courses.collect_attachments', queue='default')
+def collect_attachments():
+    """
+    Удаляет файлы вложений, на которые не ссылается ни одно вложение, и брошенные загрузки.
+    """
+    collect_garbage()
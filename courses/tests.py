@@ -1,6 +1,44 @@
+import datetime
+import gzip
+import io
+import json
+import os
+import tempfile
+import time
+import uuid
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase
 from rest_framework import status
-from courses.models import Section, Material
+from config.parsers import FastJSONParser
+from config.renderers import FastJSONRenderer
+from courses.attachments import BLOB_GRACE_PERIOD, collect_garbage, get_blob_path, get_upload_path
+from courses.cloning import clone_section
+from courses.ordering import POSITION_GAP, move
+from courses.models import (
+    Section, Material, SectionPurge, MaterialProgress, MaterialBand, MaterialRevision, Attachment, AttachmentUpload,
+)
+from courses.progress import progress_buffer
+from courses.purge import purge_section
+from courses.revisions import get_revision_content
+from courses.rendering import local_cache, render_markdown
+from courses.serializers import MaterialSerializer, MaterialValuesSerializer
+from courses.similarity import BANDS, find_similar, find_clusters
+from exams.models import Exam, Question, Answer
+from courses.tasks import rebalance_positions
+from jobs.models import Job
+from jobs.worker import work
 from users.models import User
 
 
@@ -215,3 +253,987 @@ class MaterialTests(APITestCase):
         response = self.client.delete(f'/courses/materials/{self.material.id}/delete/')
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
         self.assertEqual(Material.objects.count(), 1)  # Количество материалов не изменяется
+
+
+class MaterialContentStorageTests(APITestCase):
+
+    def setUp(self):
+        """
+        Настройка тестового окружения: создание пользователя, раздела и материала с большим содержимым.
+        """
+        self.user = User.objects.create(email='testuser@example.com', password='testpass123412')
+        self.section = Section.objects.create(title='Test Section', owner=self.user)
+        self.content = 'Повторяющийся текст материала. ' * 1000
+        self.material = Material.objects.create(section=self.section, owner=self.user, title='Big', content=self.content)
+
+    def test_content_stored_compressed(self):
+        """
+        Проверяет, что содержимое хранится в базе в сжатом виде и восстанавливается без потерь.
+        """
+        stored = Material.objects.values_list('content', flat=True).get(pk=self.material.pk)
+        self.assertLess(len(stored), len(self.content.encode('utf-8')) // 10)
+        self.assertEqual(Material.objects.with_content().get(pk=self.material.pk).content, self.content)
+
+    def test_content_deferred_by_default(self):
+        """
+        Проверяет, что менеджер по умолчанию не загружает содержимое, а загружает его только при обращении.
+        """
+        material = Material.objects.get(pk=self.material.pk)
+        self.assertIn('content', material.get_deferred_fields())
+        with self.assertNumQueries(1):
+            self.assertEqual(material.content, self.content)
+
+
+class MaterialContentRangeTests(APITestCase):
+
+    def setUp(self):
+        """
+        Настройка тестового окружения: создание пользователей, раздела и материала с многобайтовым содержимым.
+        """
+        self.user = User.objects.create(email='testuser@example.com', password='testpass123412')
+        self.other_user = User.objects.create(email='otheruser@example.com', password='otherpass123412')
+        self.client.force_authenticate(user=self.user)
+        self.section = Section.objects.create(title='Test Section', owner=self.user)
+        self.content = ''.join(f'Строка {i}\n' for i in range(20000))
+        self.encoded = self.content.encode('utf-8')
+        self.material = Material.objects.create(section=self.section, owner=self.user, title='Book', content=self.content)
+        self.url = f'/courses/materials/{self.material.id}/content/'
+
+    def test_full_content(self):
+        """
+        Проверяет получение всего содержимого: статус 200 OK, заголовки Accept-Ranges и Content-Length.
+        """
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(int(response['Content-Length']), len(self.encoded))
+        self.assertEqual(b''.join(response.streaming_content), self.encoded)
+
+    def test_partial_content(self):
+        """
+        Проверяет получение диапазонов байт: явного, открытого и суффиксного.
+        Ожидается статус 206 Partial Content и корректный заголовок Content-Range.
+        """
+        size = len(self.encoded)
+        cases = {
+            'bytes=100000-100099': (100000, 100099),
+            'bytes=200000-': (200000, size - 1),
+            'bytes=-500': (size - 500, size - 1),
+        }
+        for header, (start, end) in cases.items():
+            response = self.client.get(self.url, HTTP_RANGE=header)
+            self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+            self.assertEqual(response['Content-Range'], f'bytes {start}-{end}/{size}')
+            self.assertEqual(b''.join(response.streaming_content), self.encoded[start:end + 1])
+
+    def test_range_not_satisfiable(self):
+        """
+        Проверяет, что диапазон за пределами содержимого возвращает статус 416.
+        """
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.encoded)}-')
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.encoded)}')
+
+    def test_if_range_mismatch_returns_full_content(self):
+        """
+        Проверяет, что при устаревшем If-Range возвращается всё содержимое, а не диапазон.
+        """
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_content_size_stored_on_save(self):
+        """
+        Проверяет, что размер содержимого сохраняется вместе с ним, в том числе при save(update_fields),
+        и заголовки ответа формируются без распаковки содержимого.
+        """
+        self.assertEqual(Material.objects.get(pk=self.material.pk).content_size, len(self.encoded))
+        self.material.content = 'Новое содержимое'
+        self.material.save(update_fields=['content'])
+        self.material.refresh_from_db(fields=['content_size'])
+        self.assertEqual(self.material.content_size, len('Новое содержимое'.encode('utf-8')))
+
+        with mock.patch('courses.streaming.iter_decompressed') as decompress:
+            response = self.client.get(self.url, HTTP_RANGE='bytes=1000000-')
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        decompress.assert_not_called()
+
+    def test_content_permission_denied(self):
+        """
+        Проверяет отказ в получении содержимого для пользователя, не имеющего прав.
+        """
+        self.client.force_authenticate(user=self.other_user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class MaterialRenderTests(APITestCase):
+
+    def setUp(self):
+        """
+        Настройка тестового окружения: очистка кешей отрисовки, создание пользователя, раздела и материала.
+        """
+        cache.clear()
+        local_cache.clear()
+        self.user = User.objects.create(email='testuser@example.com', password='testpass123412')
+        self.client.force_authenticate(user=self.user)
+        self.section = Section.objects.create(title='Test Section', owner=self.user)
+        self.content = '# Заголовок\n\nТекст с **выделением** и <script>alert(1)</script>\n\n- [ссылка](javascript:alert(1))'
+        self.material = Material.objects.create(section=self.section, owner=self.user, title='Md', content=self.content)
+
+    def test_retrieve_rendered_html(self):
+        """
+        Проверяет, что content_format=html возвращает очищенный HTML, а по умолчанию - исходный текст.
+        """
+        response = self.client.get(f'/courses/materials/{self.material.id}/', {'content_format': 'html'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        html = response.data['content']
+        self.assertIn('<h1>Заголовок</h1>', html)
+        self.assertIn('<strong>выделением</strong>', html)
+        self.assertIn('&lt;script&gt;', html)
+        self.assertNotIn('javascript:', html.replace('&lt;', ''))
+
+        response = self.client.get(f'/courses/materials/{self.material.id}/')
+        self.assertEqual(response.data['content'], self.content)
+
+    def test_underscores_in_urls_and_identifiers(self):
+        """
+        Проверяет, что подчёркивания и звёздочки внутри адресов ссылок и слов не превращаются в выделение.
+        """
+        html = render_markdown('[**docs**](https://example.com/my_page_name) snake_case_name 2*3*4 _да_')
+        self.assertIn('<a href="https://example.com/my_page_name" rel="nofollow noopener"><strong>docs</strong></a>', html)
+        self.assertIn('snake_case_name 2*3*4 <em>да</em>', html)
+
+    def test_invalid_content_format(self):
+        """
+        Проверяет, что неизвестный формат содержимого возвращает статус 400 Bad Request.
+        """
+        response = self.client.get(f'/courses/materials/{self.material.id}/', {'content_format': 'pdf'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_identical_content_rendered_once(self):
+        """
+        Проверяет, что одинаковое содержимое разных материалов отрисовывается один раз.
+        """
+        copy = Material.objects.create(section=self.section, owner=self.user, title='Copy', content=self.content)
+        with mock.patch('courses.rendering.render_markdown', wraps=render_markdown) as renderer:
+            for material in (self.material, copy):
+                self.client.get(f'/courses/materials/{material.id}/', {'content_format': 'html'})
+            local_cache.clear()
+            self.client.get(f'/courses/materials/{copy.id}/', {'content_format': 'html'})
+        self.assertEqual(renderer.call_count, 1)
+
+
+class SectionSoftDeleteTests(APITestCase):
+
+    def setUp(self):
+        """
+        Настройка тестового окружения: создание раздела с материалами, тестами, вопросами и ответами.
+        """
+        self.user = User.objects.create(email='testuser@example.com', password='testpass123412')
+        self.client.force_authenticate(user=self.user)
+        self.section = Section.objects.create(title='Test Section', owner=self.user)
+        self.other_section = Section.objects.create(title='Other Section', owner=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            for section in (self.section, self.other_section):
+                for i in range(3):
+                    material = Material.objects.create(section=section, owner=self.user, title=f'M{i}', content='Текст')
+                    exam = Exam.objects.create(title=f'E{i}', material=material, owner=self.user)
+                    for j in range(2):
+                        question = Question.objects.create(exam=exam, text=f'Q{j}')
+                        Answer.objects.create(question=question, text='A', is_correct=True)
+        work(burst=True)
+
+    def test_delete_hides_section_tree(self):
+        """
+        Проверяет, что удаление раздела сразу скрывает его содержимое, не удаляя строки.
+        """
+        response = self.client.delete(f'/courses/sections/{self.section.id}/delete/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(Section.objects.count(), 1)
+        self.assertEqual(Material.objects.count(), 3)
+        self.assertEqual(Answer.objects.count(), 6)
+        self.assertEqual(Material.all_objects.count(), 6)
+        self.assertEqual(SectionPurge.objects.get().stage, 'answers')
+
+        response = self.client.get(f'/courses/sections/{self.section.id}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_admin_delete_is_soft(self):
+        """
+        Проверяет, что удаление разделов в админке действием и со страницы раздела только помечает их
+        удалёнными и ставит очистку в очередь, не удаляя содержимое.
+        """
+        admin_user = User.objects.create_superuser(email='admin@example.com', password='adminpass123412')
+        self.client.force_login(admin_user)
+        response = self.client.get(f'/admin/courses/section/{self.section.id}/delete/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/admin/courses/section/{self.section.id}/delete/', {'post': 'yes'})
+            self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+            response = self.client.post('/admin/courses/section/', {
+                'action': 'delete_selected', '_selected_action': [self.other_section.id], 'post': 'yes',
+            })
+            self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+
+        self.assertFalse(Section.objects.exists())
+        self.assertEqual(Section.all_objects.count(), 2)
+        self.assertEqual(Answer.all_objects.count(), 12)
+        self.assertEqual(SectionPurge.objects.count(), 2)
+        self.assertTrue(Job.objects.filter(name='courses.purge_deleted_sections').exists())
+
+    def test_purge_removes_tree_in_batches(self):
+        """
+        Проверяет, что очистка удаляет содержимое раздела порциями и сохраняет прогресс,
+        не затрагивая другие разделы.
+        """
+        self.section.soft_delete()
+        purge = SectionPurge.objects.get()
+
+        self.assertFalse(purge_section(purge, batch_size=2, max_batches=2))
+        purge.refresh_from_db()
+        self.assertEqual((purge.stage, purge.deleted_rows), ('answers', 4))
+
+        self.assertTrue(purge_section(purge, batch_size=2))
+        purge.refresh_from_db()
+        self.assertEqual(purge.stage, 'done')
+        # ответы, вопросы, тесты, полосы, сигнатуры и версии материалов, материалы, раздел
+        self.assertEqual(purge.deleted_rows, 6 + 6 + 3 + 3 * (BANDS + 1) + 3 + 3 + 1)
+        self.assertIsNotNone(purge.finished_at)
+        self.assertFalse(Section.all_objects.filter(pk=self.section.pk).exists())
+        self.assertEqual(Answer.all_objects.count(), 6)
+        self.assertEqual(Material.all_objects.count(), 3)
+
+
+class OpenAPISchemaTests(APITestCase):
+
+    def setUp(self):
+        """
+        Настройка тестового окружения: генерация схемы во временный каталог.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        settings_override = override_settings(OPENAPI_SCHEMA_PATH=os.path.join(self.directory.name, 'openapi.json'))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        call_command('generate_openapi_schema', stdout=io.StringIO())
+
+    def test_schema_served_with_etag(self):
+        """
+        Проверяет отдачу схемы: JSON со всеми путями, ETag и ответ 304 при совпадении If-None-Match.
+        """
+        response = self.client.get('/swagger.json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('/courses/materials/', json.loads(response.content)['paths'])
+
+        response = self.client.get('/swagger.json', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_schema_served_precompressed(self):
+        """
+        Проверяет, что клиенту с поддержкой gzip отдаётся заранее сжатая схема.
+        """
+        response = self.client.get('/swagger.json', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('/exams/', json.loads(gzip.decompress(response.content))['paths'])
+
+    def test_ui_pages(self):
+        """
+        Проверяет, что страницы swagger и redoc ссылаются на файл схемы.
+        """
+        for url in ('/swagger/', '/redoc/'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIn(b'/swagger.json', response.content)
+
+
+@override_settings(PROGRESS_FLUSH_INTERVAL=0)
+class MaterialProgressTests(APITestCase):
+
+    def setUp(self):
+        """
+        Настройка тестового окружения: пустой буфер прогресса, пользователи, публичный и закрытый материалы.
+        """
+        progress_buffer.flush()
+        self.user = User.objects.create(email='testuser@example.com', password='testpass123412')
+        self.other_user = User.objects.create(email='otheruser@example.com', password='otherpass123412')
+        self.client.force_authenticate(user=self.user)
+        self.section = Section.objects.create(title='Test Section', owner=self.other_user)
+        self.public = Material.objects.create(section=self.section, owner=self.other_user, title='Public',
+                                              content='Текст', is_public=True)
+        self.private = Material.objects.create(section=self.section, owner=self.other_user, title='Private',
+                                               content='Текст', is_public=False)
+
+    def test_events_coalesced_into_one_write(self):
+        """
+        Проверяет, что множество событий по материалу записывается одной строкой одним запросом к базе,
+        а пройденный материал не становится снова открытым.
+        """
+        events = [{'material': self.public.id, 'event': 'open'} for _ in range(50)]
+        events.insert(10, {'material': self.public.id, 'event': 'complete'})
+        response = self.client.post('/courses/progress/events/', events, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(MaterialProgress.objects.count(), 0)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(progress_buffer.flush(), 1)
+
+        self.client.post('/courses/progress/events/', [{'material': self.public.id, 'event': 'open'}], format='json')
+        progress_buffer.flush()
+        progress = MaterialProgress.objects.get()
+        self.assertEqual(progress.status, MaterialProgress.STATUS_COMPLETED)
+        self.assertIsNotNone(progress.completed_at)
+        self.assertLess(progress.first_opened_at, progress.last_seen_at)
+
+        response = self.client.get('/courses/progress/')
+        self.assertEqual(response.data[0]['status'], MaterialProgress.STATUS_COMPLETED)
+
+    def test_flush_does_not_downgrade_concurrent_progress(self):
+        """
+        Проверяет, что строка, записанная другим процессом после начала сброса, сливается в базе:
+        статус не понижается, а время первого открытия и прохождения не сдвигается на более позднее.
+        """
+        now = timezone.now()
+        progress_buffer.add(self.user.pk, self.public.pk, 'open', now)
+        MaterialProgress.objects.create(
+            user=self.user, material=self.public, status=MaterialProgress.STATUS_COMPLETED,
+            first_opened_at=now - datetime.timedelta(hours=2), last_seen_at=now - datetime.timedelta(hours=1),
+            completed_at=now - datetime.timedelta(hours=1),
+        )
+        with mock.patch.object(progress_buffer, '_merge_existing') as merge_existing:
+            self.assertEqual(progress_buffer.flush(), 1)
+        merge_existing.assert_not_called()
+
+        progress = MaterialProgress.objects.get()
+        self.assertEqual(progress.status, MaterialProgress.STATUS_COMPLETED)
+        self.assertEqual(progress.first_opened_at, now - datetime.timedelta(hours=2))
+        self.assertEqual(progress.completed_at, now - datetime.timedelta(hours=1))
+        self.assertEqual(progress.last_seen_at, now)
+
+    def test_events_for_unavailable_material_rejected(self):
+        """
+        Проверяет отказ в записи прогресса по недоступному материалу.
+        """
+        response = self.client.post('/courses/progress/events/', [{'material': self.private.id, 'event': 'open'}],
+                                    format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(len(progress_buffer), 0)
+
+
+class SectionDashboardTests(APITestCase):
+
+    def setUp(self):
+        """
+        Настройка тестового окружения: публичный раздел другого пользователя
+        с публичными и закрытыми материалами и тестами.
+        """
+        self.user = User.objects.create(email='testuser@example.com', password='testpass123412')
+        self.author = User.objects.create(email='author@example.com', password='authorpass123412')
+        self.client.force_authenticate(user=self.user)
+        self.section = Section.objects.create(title='Course', owner=self.author, is_public=True)
+
+    def _fill(self, materials):
+        for i in range(materials):
+            material = Material.objects.create(section=self.section, owner=self.author, title=f'M{i}',
+                                               content='Текст', is_public=i % 2 == 0)
+            for j in range(2):
+                exam = Exam.objects.create(title=f'E{j}', material=material, owner=self.author, is_public=j == 0)
+                for k in range(3):
+                    Question.objects.create(exam=exam, text=f'Q{k}')
+
+    def test_dashboard_visibility_and_counts(self):
+        """
+        Проверяет, что пользователь видит только публичные материалы и тесты с правильными количествами.
+        """
+        self._fill(2)
+        response = self.client.get(f'/courses/sections/{self.section.id}/dashboard/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        materials = response.data['materials']
+        self.assertEqual([material['title'] for material in materials], ['M0'])
+        self.assertEqual(materials[0]['exams_count'], 1)
+        self.assertEqual([(exam['title'], exam['questions_count']) for exam in materials[0]['exams']], [('E0', 3)])
+
+        self.client.force_authenticate(user=self.author)
+        response = self.client.get(f'/courses/sections/{self.section.id}/dashboard/')
+        self.assertEqual(len(response.data['materials']), 2)
+        self.assertEqual(response.data['materials'][1]['exams_count'], 2)
+
+    def test_dashboard_constant_queries(self):
+        """
+        Проверяет, что количество запросов не зависит от количества материалов и тестов.
+        """
+        self._fill(1)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(f'/courses/sections/{self.section.id}/dashboard/')
+        self._fill(5)
+        with self.assertNumQueries(len(queries)):
+            self.client.get(f'/courses/sections/{self.section.id}/dashboard/')
+
+    def test_dashboard_private_section_forbidden(self):
+        """
+        Проверяет отказ в доступе к закрытому разделу другого пользователя.
+        """
+        self.section.is_public = False
+        self.section.save()
+        response = self.client.get(f'/courses/sections/{self.section.id}/dashboard/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class FastJSONTests(APITestCase):
+
+    def setUp(self):
+        """
+        Настройка тестового окружения: данные с типами, которые кодирует DRF JSONEncoder.
+        """
+        self.data = {
+            'created': datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+            'naive': datetime.datetime(2024, 5, 1, 12, 30),
+            'day': datetime.date(2024, 5, 1),
+            'time': datetime.time(8, 15, 30, 500),
+            'duration': datetime.timedelta(minutes=90),
+            'price': Decimal('10.50'),
+            'label': gettext_lazy('Описание'),
+            'uid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'text': 'строка\u2028с разделителем',
+            1: [None, True, 1.5],
+        }
+
+    def test_renderer_matches_standard_renderer(self):
+        """
+        Проверяет, что быстрый рендерер выдаёт те же байты, что и стандартный.
+        """
+        self.assertEqual(FastJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+
+    def test_renderer_fallbacks(self):
+        """
+        Проверяет отступы и работу без orjson через стандартный рендерер.
+        """
+        indented = FastJSONRenderer().render(self.data, 'application/json; indent=4')
+        self.assertEqual(indented, JSONRenderer().render(self.data, 'application/json; indent=4'))
+        with mock.patch('config.renderers.orjson', None):
+            self.assertEqual(FastJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_parser(self):
+        """
+        Проверяет разбор JSON и ошибку разбора некорректного тела запроса.
+        """
+        body = JSONRenderer().render({'title': 'Раздел', 'items': [1, 2.5, None]})
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(body)), {'title': 'Раздел', 'items': [1, 2.5, None]})
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"title": NaN}'))
+
+    def test_api_uses_fast_classes(self):
+        """
+        Проверяет, что API принимает и отдаёт JSON через быстрые классы по умолчанию.
+        """
+        user = User.objects.create(email='testuser@example.com', password='testpass123412')
+        self.client.force_authenticate(user=user)
+        response = self.client.post('/courses/sections/create/', {'title': 'Раздел'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIsInstance(response.accepted_renderer, FastJSONRenderer)
+        self.assertEqual(json.loads(response.content)['title'], 'Раздел')
+
+
+class MaterialValuesSerializerTests(APITestCase):
+
+    def setUp(self):
+        """
+        Настройка тестового окружения: материалы со сжатым и несжатым содержимым.
+        """
+        self.user = User.objects.create(email='testuser@example.com', password='testpass123412')
+        self.client.force_authenticate(user=self.user)
+        section = Section.objects.create(title='Section', owner=self.user)
+        for i, content in enumerate(['', 'Короткий текст', 'Повторяющийся абзац. ' * 200]):
+            Material.objects.create(section=section, owner=self.user, title=f'M{i}', content=content)
+
+    def test_output_matches_material_serializer(self):
+        """
+        Проверяет, что список материалов совпадает с выводом MaterialSerializer и строится одним запросом.
+        """
+        materials = Material.objects.with_content().all()
+        expected = JSONRenderer().render(MaterialSerializer(materials, many=True).data)
+        self.assertEqual(JSONRenderer().render(MaterialValuesSerializer(materials).data), expected)
+        with self.assertNumQueries(1):
+            response = self.client.get('/courses/materials/')
+        self.assertEqual(response.content, expected)
+
+
+class MaterialSimilarityTests(APITestCase):
+
+    def setUp(self):
+        """
+        Настройка тестового окружения: исходный материал, его копия с правками и посторонний материал.
+        """
+        self.user = User.objects.create(email='testuser@example.com', password='testpass123412')
+        self.moderator = User.objects.create(email='moderator@example.com', password='moderpass123412')
+        self.moderator.groups.add(Group.objects.get_or_create(name='Moderators')[0])
+        section = Section.objects.create(title='Section', owner=self.user)
+        words = [f'слово{i}' for i in range(300)]
+        edited = words[:150] + ['правка'] + words[151:]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.original = Material.objects.create(section=section, owner=self.user, title='Original',
+                                                    content=' '.join(words))
+            self.copy = Material.objects.create(section=section, owner=self.user, title='Copy', content=' '.join(edited))
+            self.other = Material.objects.create(
+                section=section, owner=self.user, title='Other', content=' '.join(f'другое{i}' for i in range(300))
+            )
+        self.assertFalse(MaterialBand.objects.exists())
+        self.assertEqual(work(burst=True), 3)
+
+    def test_find_similar_materials(self):
+        """
+        Проверяет, что копия с правками находится, а посторонний материал - нет.
+        """
+        self.assertEqual(MaterialBand.objects.filter(material=self.original).count(), BANDS)
+        similar = find_similar(self.original)
+        self.assertEqual([material_id for material_id, _ in similar], [self.copy.id])
+        self.assertGreater(similar[0][1], 0.9)
+
+        self.client.force_authenticate(user=self.moderator)
+        response = self.client.get(f'/courses/materials/{self.original.id}/similar/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([material['title'] for material in response.data], ['Copy'])
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(f'/courses/materials/{self.original.id}/similar/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_clusters_follow_content_changes(self):
+        """
+        Проверяет группы похожих материалов и пересчёт сигнатуры при изменении содержимого.
+        """
+        self.assertEqual(find_clusters(), [[self.original.id, self.copy.id]])
+        material = Material.objects.with_content().get(pk=self.other.id)
+        material.content = Material.objects.with_content().get(pk=self.original.id).content
+        with self.captureOnCommitCallbacks(execute=True):
+            material.save()
+        self.assertEqual(find_clusters(), [[self.original.id, self.copy.id]])
+        self.assertEqual(work(burst=True), 1)
+
+        self.client.force_authenticate(user=self.moderator)
+        response = self.client.get('/courses/materials/similar/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [[material['id'] for material in cluster['materials']] for cluster in response.data],
+            [[self.original.id, self.copy.id, self.other.id]],
+        )
+
+        # Сохранение без изменения содержимого не пересчитывает сигнатуру
+        material = Material.objects.get(pk=self.other.id)
+        material.title = 'Renamed'
+        with self.assertNumQueries(1), self.captureOnCommitCallbacks() as callbacks:
+            material.save()
+        self.assertEqual(callbacks, [])
+
+
+class SectionCloneTests(APITestCase):
+
+    def setUp(self):
+        """
+        Настройка тестового окружения: раздел с материалами, тестами, вопросами и ответами.
+        """
+        self.user = User.objects.create(email='testuser@example.com', password='testpass123412')
+        self.teacher = User.objects.create(email='teacher@example.com', password='teacherpass123412')
+        self.section = Section.objects.create(title='Курс', description='Осень', owner=self.user, is_public=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            self._add_materials(2)
+        work(burst=True)
+        self.client.force_authenticate(user=self.user)
+
+    def _add_materials(self, count):
+        for i in range(count):
+            material = Material.objects.create(
+                section=self.section, owner=self.user, title=f'Материал {i}',
+                content=' '.join(f'слово{i}_{j}' for j in range(20)),
+            )
+            exam = Exam.objects.create(title=f'Тест {i}', material=material, owner=self.user)
+            for k in range(2):
+                question = Question.objects.create(exam=exam, text=f'Вопрос {i}.{k}')
+                Answer.objects.create(question=question, text='Да', is_correct=True)
+                Answer.objects.create(question=question, text='Нет')
+
+    def test_clone_copies_tree(self):
+        """
+        Проверяет, что копия содержит все уровни дерева с новыми id, исходный раздел не меняется,
+        а материалы копии находятся поиском похожих.
+        """
+        response = self.client.post(f'/courses/sections/{self.section.id}/clone/', {'title': 'Курс весна'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        clone = Section.objects.get(pk=response.data['id'])
+        self.assertEqual((clone.title, clone.description, clone.owner), ('Курс весна', 'Осень', self.user))
+
+        def tree(section):
+            return [
+                (material.title, material.content, [
+                    (exam.title, [
+                        (question.text, list(question.answers.order_by('pk').values_list('text', 'is_correct')))
+                        for question in exam.questions.order_by('pk')
+                    ])
+                    for exam in material.exams.order_by('pk')
+                ])
+                for material in section.materials.with_content().order_by('pk')
+            ]
+
+        self.assertEqual(tree(clone), tree(self.section))
+        self.assertEqual(Material.objects.count(), 4)
+        self.assertEqual(Answer.objects.count(), 16)
+        original = self.section.materials.order_by('pk').first()
+        copied = clone.materials.order_by('pk').first()
+        self.assertEqual(find_similar(original), [(copied.id, 1.0)])
+        self.assertEqual(get_revision_content(copied.id, 1), original.content)
+
+    def test_clone_query_count_is_constant(self):
+        """
+        Проверяет, что число запросов при копировании не зависит от размера раздела,
+        а строки выбираются по исходному разделу, а не по списку id.
+        """
+        with CaptureQueriesContext(connection) as small:
+            clone_section(self.section)
+        self._add_materials(5)
+        with CaptureQueriesContext(connection) as large:
+            clone_section(self.section, owner=self.teacher)
+        self.assertEqual(len(small), len(large))
+        selects = [query['sql'] for query in large if query['sql'].startswith('SELECT')]
+        self.assertTrue(selects)
+        self.assertFalse([sql for sql in selects if ' IN (' in sql])
+        clone = Section.objects.latest('pk')
+        self.assertEqual(set(Exam.objects.filter(material__section=clone).values_list('owner', flat=True)), {self.teacher.pk})
+
+    def test_clone_permissions_and_admin_action(self):
+        """
+        Проверяет, что копировать чужой раздел нельзя, а действие админки копирует выбранные разделы.
+        """
+        self.client.force_authenticate(user=self.teacher)
+        response = self.client.post(f'/courses/sections/{self.section.id}/clone/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        admin_user = User.objects.create_superuser(email='admin@example.com', password='adminpass123412')
+        self.client.force_login(admin_user)
+        response = self.client.post('/admin/courses/section/', {
+            'action': 'clone_sections', '_selected_action': [self.section.id],
+        })
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertEqual(list(Section.objects.order_by('pk').values_list('title', 'owner')), [
+            ('Курс', self.user.id), ('Курс (копия)', self.user.id),
+        ])
+
+
+class MaterialOrderingTests(APITestCase):
+
+    def setUp(self):
+        """
+        Настройка тестового окружения: раздел с четырьмя материалами.
+        """
+        self.user = User.objects.create(email='testuser@example.com', password='testpass123412')
+        self.section = Section.objects.create(title='Section', owner=self.user)
+        self.materials = [
+            Material.objects.create(section=self.section, owner=self.user, title=f'M{i}', content='Текст')
+            for i in range(4)
+        ]
+        self.client.force_authenticate(user=self.user)
+
+    def titles(self):
+        return [material['title'] for material in self.client.get('/courses/materials/').data]
+
+    def test_new_materials_appended(self):
+        """
+        Проверяет, что новые материалы добавляются в конец раздела с промежутком между позициями.
+        """
+        self.assertEqual([m.position for m in self.materials], [POSITION_GAP * i for i in range(1, 5)])
+        self.assertEqual(self.titles(), ['M0', 'M1', 'M2', 'M3'])
+
+    def test_move_updates_one_row(self):
+        """
+        Проверяет перемещение после элемента, перед элементом и в начало, причём записывается одна строка.
+        """
+        url = f'/courses/materials/{self.materials[3].id}/move/'
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, {'after': self.materials[0].id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([q['sql'].split()[0] for q in queries].count('UPDATE'), 1)
+        self.assertEqual(self.titles(), ['M0', 'M3', 'M1', 'M2'])
+
+        self.client.post(f'/courses/materials/{self.materials[0].id}/move/', {'before': self.materials[2].id}, format='json')
+        self.assertEqual(self.titles(), ['M3', 'M1', 'M0', 'M2'])
+        self.client.post(f'/courses/materials/{self.materials[2].id}/move/', {'after': None}, format='json')
+        self.assertEqual(self.titles(), ['M2', 'M3', 'M1', 'M0'])
+
+        response = self.client.post(url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        other = Material.objects.create(
+            section=Section.objects.create(title='Other', owner=self.user), owner=self.user, title='X', content='Текст'
+        )
+        response = self.client.post(url, {'after': other.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_exhausted_gap_rebalanced(self):
+        """
+        Проверяет, что при малом промежутке ставится задача перенумерации, а исчерпанный промежуток
+        перенумеровывается сразу без нарушения порядка.
+        """
+        first, second = self.materials[0], self.materials[1]
+        moving = self.materials[2:]
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(20):
+                move(moving[i % 2], after=first.id)
+        self.assertTrue(Job.objects.filter(name='courses.rebalance_positions').exists())
+        self.assertEqual(self.titles()[0], 'M0')
+        self.assertEqual(self.titles()[3], 'M1')
+
+        rebalance_positions(model='courses.material', parent_id=self.section.id)
+        positions = list(self.section.materials.values_list('position', flat=True))
+        self.assertEqual(positions, [POSITION_GAP * i for i in range(1, 5)])
+        self.assertEqual(Material.objects.get(pk=second.pk).position, POSITION_GAP * 4)
+
+
+@override_settings(MATERIAL_REVISION_SNAPSHOT_INTERVAL=3)
+class MaterialRevisionTests(APITestCase):
+
+    def setUp(self):
+        """
+        Настройка тестового окружения: материал, изменённый несколько раз.
+        """
+        self.user = User.objects.create(email='testuser@example.com', password='testpass123412')
+        self.other_user = User.objects.create(email='other@example.com', password='otherpass123412')
+        self.section = Section.objects.create(title='Section', owner=self.user)
+        self.versions = ['\n'.join(f'строка {i}' for i in range(50))]
+        for number in range(1, 7):
+            lines = self.versions[-1].split('\n')
+            lines[number * 5] = f'правка {number}'
+            self.versions.append('\n'.join(lines))
+        self.material = Material.objects.create(
+            section=self.section, owner=self.user, title='Material', content=self.versions[0]
+        )
+        for content in self.versions[1:]:
+            self.material.content = content
+            self.material.save()
+        self.client.force_authenticate(user=self.user)
+
+    def test_snapshots_and_deltas(self):
+        """
+        Проверяет, что снимки хранятся через заданный интервал, разницы меньше снимков,
+        каждая версия восстанавливается точно, а сохранение без изменений версию не создаёт.
+        """
+        revisions = list(MaterialRevision.objects.order_by('number'))
+        self.assertEqual([r.is_snapshot for r in revisions], [True, False, False, True, False, False, True])
+        self.assertLess(len(revisions[1].data), len(revisions[0].data))
+        for number, content in enumerate(self.versions, start=1):
+            self.assertEqual(get_revision_content(self.material.id, number), content)
+
+        self.material.title = 'Другое название'
+        self.material.save()
+        Material.objects.with_content().get(pk=self.material.pk).save()
+        self.assertEqual(MaterialRevision.objects.count(), 7)
+
+    def test_reconstruction_bounded_by_snapshot_interval(self):
+        """
+        Проверяет, что восстановление версии читает не больше интервала снимков строк двумя запросами.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            get_revision_content(self.material.id, 6)
+        self.assertEqual(len(queries), 2)
+        self.assertIn('"number" >= 4', queries[1]['sql'].replace("'", '"'))
+
+    def test_revision_endpoints(self):
+        """
+        Проверяет список версий, содержимое версии, разницу версий и доступ к истории чужого материала.
+        """
+        response = self.client.put(f'/courses/materials/{self.material.id}/update/', {
+            'section': self.section.id, 'title': 'Material', 'content': 'Новый текст',
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(f'/courses/materials/{self.material.id}/revisions/')
+        self.assertEqual([r['number'] for r in response.data], [8, 7, 6, 5, 4, 3, 2, 1])
+        self.assertEqual(response.data[0]['author'], self.user.id)
+
+        response = self.client.get(f'/courses/materials/{self.material.id}/revisions/2/')
+        self.assertEqual((response.data['number'], response.data['content']), (2, self.versions[1]))
+        response = self.client.get(f'/courses/materials/{self.material.id}/revisions/1/diff/2/')
+        self.assertIn('-строка 5\n+правка 1\n', response.data['diff'])
+        response = self.client.get(f'/courses/materials/{self.material.id}/revisions/9/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.force_authenticate(user=self.other_user)
+        response = self.client.get(f'/courses/materials/{self.material.id}/revisions/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class AttachmentTests(APITestCase):
+
+    def setUp(self):
+        """
+        Настройка тестового окружения: материал и временный каталог хранилища вложений.
+        """
+        self.user = User.objects.create(email='testuser@example.com', password='testpass123412')
+        self.other_user = User.objects.create(email='other@example.com', password='otherpass123412')
+        self.section = Section.objects.create(title='Section', owner=self.user)
+        self.material = Material.objects.create(section=self.section, owner=self.user, title='Material', content='x')
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+        storage = override_settings(ATTACHMENT_ROOT=self.root.name, ATTACHMENT_MAX_CHUNK_SIZE=1024)
+        storage.enable()
+        self.addCleanup(storage.disable)
+        self.client.force_authenticate(user=self.user)
+        self.data = os.urandom(2500)
+
+    def start_upload(self, filename='notes.bin', size=None):
+        response = self.client.post(f'/courses/materials/{self.material.id}/attachments/uploads/', {
+            'filename': filename, 'size': len(self.data) if size is None else size,
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data['id']
+
+    def put_chunk(self, upload_id, start, end):
+        return self.client.put(
+            f'/courses/attachments/uploads/{upload_id}/', self.data[start:end + 1],
+            content_type='application/octet-stream', HTTP_CONTENT_RANGE=f'bytes {start}-{end}/{len(self.data)}',
+        )
+
+    def upload(self, filename='notes.bin'):
+        upload_id = self.start_upload(filename)
+        with self.captureOnCommitCallbacks(execute=True):
+            for start in range(0, len(self.data), 1024):
+                response = self.put_chunk(upload_id, start, min(start + 1023, len(self.data) - 1))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data
+
+    def test_resumable_upload(self):
+        """
+        Проверяет продолжение загрузки с полученного смещения, повтор части, отказ для части
+        с пропуском и для слишком большой части, а также доступ к чужой загрузке.
+        """
+        upload_id = self.start_upload('C:\\docs\\notes.bin')
+        response = self.put_chunk(upload_id, 0, 1023)
+        self.assertEqual(response.data['received'], 1024)
+        response = self.put_chunk(upload_id, 2048, 2499)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['received'], 1024)
+        response = self.put_chunk(upload_id, 0, 1500)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.put_chunk(upload_id, 512, 1535).data['received'], 1536)
+
+        self.client.force_authenticate(user=self.other_user)
+        response = self.client.get(f'/courses/attachments/uploads/{upload_id}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.get(f'/courses/attachments/uploads/{upload_id}/').data['received'], 1536)
+
+        self.put_chunk(upload_id, 1536, 2499 - 500)
+        response = self.put_chunk(upload_id, 2000, 2499)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['filename'], 'notes.bin')
+        self.assertFalse(AttachmentUpload.objects.exists())
+        with open(get_blob_path(response.data['sha256']), 'rb') as file:
+            self.assertEqual(file.read(), self.data)
+
+    def test_failed_completion_can_be_retried(self):
+        """
+        Проверяет, что при ошибке создания вложения загрузка и её временный файл сохраняются,
+        и повтор последней части завершает загрузку.
+        """
+        upload_id = self.start_upload()
+        self.put_chunk(upload_id, 0, 1023)
+        self.put_chunk(upload_id, 1024, 2047)
+        with mock.patch.object(Attachment, 'save', side_effect=RuntimeError('db')):
+            with self.assertRaises(RuntimeError):
+                self.put_chunk(upload_id, 2048, 2499)
+        self.assertTrue(AttachmentUpload.objects.filter(pk=upload_id).exists())
+        self.assertTrue(get_upload_path(upload_id).exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.put_chunk(upload_id, 2048, 2499)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(get_upload_path(upload_id).exists())
+        with open(get_blob_path(response.data['sha256']), 'rb') as file:
+            self.assertEqual(file.read(), self.data)
+
+    def test_duplicates_stored_once_and_collected(self):
+        """
+        Проверяет, что одинаковый файл хранится один раз, копия раздела ссылается на тот же файл,
+        а файл удаляется сборкой мусора только после удаления всех вложений.
+        """
+        first, second = self.upload('a.bin'), self.upload('b.bin')
+        self.assertEqual(first['sha256'], second['sha256'])
+        self.assertEqual(sum(len(files) for _, _, files in os.walk(self.root.name)), 1)
+        clone = clone_section(self.section)
+        self.assertEqual(Attachment.objects.filter(material__section=clone, sha256=first['sha256']).count(), 2)
+
+        for attachment in (first, second):
+            response = self.client.delete(f'/courses/attachments/{attachment["id"]}/delete/')
+            self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        path = get_blob_path(first['sha256'])
+        os.utime(path, (0, 0))
+        self.assertEqual(collect_garbage(), (0, 0))
+        Attachment.objects.all().delete()
+        AttachmentUpload.objects.create(material=self.material, owner=self.user, filename='x', size=10)
+        self.assertEqual(collect_garbage(upload_max_age=0), (1, 0))
+        self.assertFalse(path.exists())
+        self.assertFalse(AttachmentUpload.objects.exists())
+
+    def test_garbage_collection_spares_new_and_reused_blobs(self):
+        """
+        Проверяет, что файл, только что добавленный в хранилище или использованный повторно,
+        не удаляется сборкой мусора, даже если временный файл давно не изменялся.
+        """
+        attachment = self.upload()
+        path = get_blob_path(attachment['sha256'])
+        self.assertGreater(path.stat().st_mtime, time.time() - BLOB_GRACE_PERIOD)
+        Attachment.objects.all().delete()
+        os.utime(path, (0, 0))
+
+        upload_id = self.start_upload()
+        for start in range(0, len(self.data), 1024):
+            self.put_chunk(upload_id, start, min(start + 1023, len(self.data) - 1))
+        self.assertGreater(path.stat().st_mtime, time.time() - BLOB_GRACE_PERIOD)
+        Attachment.objects.all().delete()
+        self.assertEqual(collect_garbage()[0], 0)
+        self.assertTrue(path.exists())
+
+    def test_download(self):
+        """
+        Проверяет скачивание целиком и диапазоном, ответ 304 по ETag и отдачу файла веб-сервером.
+        """
+        attachment = self.upload()
+        url = f'/courses/attachments/{attachment["id"]}/download/'
+        response = self.client.get(url)
+        self.assertEqual(b''.join(response.streaming_content), self.data)
+        self.assertEqual(response['ETag'], f'"{attachment["sha256"]}"')
+        self.assertIn("filename*=UTF-8''notes.bin", response['Content-Disposition'])
+
+        response = self.client.get(url, HTTP_RANGE='bytes=100-1199')
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(response['Content-Range'], 'bytes 100-1199/2500')
+        self.assertEqual(b''.join(response.streaming_content), self.data[100:1200])
+        response = self.client.get(url, HTTP_RANGE='bytes=3000-')
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=f'"{attachment["sha256"]}"')
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.settings(ATTACHMENT_SENDFILE='x-accel-redirect'):
+            response = self.client.get(url)
+        sha = attachment['sha256']
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected/attachments/{sha[:2]}/{sha[2:4]}/{sha}')
+        self.assertEqual(response.content, b'')
+
+    def test_permissions(self):
+        """
+        Проверяет, что чужой пользователь не может загружать вложения, а видеть и скачивать
+        их может только для публичного материала и не может удалять.
+        """
+        attachment = self.upload()
+        self.client.force_authenticate(user=self.other_user)
+        response = self.client.post(f'/courses/materials/{self.material.id}/attachments/uploads/', {
+            'filename': 'x', 'size': 1,
+        })
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get(f'/courses/attachments/{attachment["id"]}/download/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        Material.objects.filter(pk=self.material.pk).update(is_public=True)
+        response = self.client.get(f'/courses/materials/{self.material.id}/attachments/')
+        self.assertEqual([a['id'] for a in response.data], [attachment['id']])
+        response = self.client.get(f'/courses/attachments/{attachment["id"]}/download/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.delete(f'/courses/attachments/{attachment["id"]}/delete/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,167 @@
+import time
+
+from django.core.cache import cache as default_cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+
+def get_token_user_id(request):
+    """
+    Достаёт id пользователя из JWT-токена без обращения к базе данных.
+    Подпись и срок действия токена проверяются, сам пользователь не загружается.
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    if header is None:
+        return None
+    raw_token = authentication.get_raw_token(header)
+    if raw_token is None:
+        return None
+    try:
+        token = authentication.get_validated_token(raw_token)
+    except (InvalidToken, TokenError):
+        return None
+    return token.get(jwt_settings.USER_ID_CLAIM)
+
+
+class SlidingWindowRateThrottle(BaseThrottle):
+    """
+    Ограничение частоты запросов по скользящему окну.
+
+    Для каждого ключа в кеше хранится только начало текущего окна и два счётчика
+    (текущее и предыдущее окно), поэтому память на ключ не зависит от лимита.
+    Частота берётся из DEFAULT_THROTTLE_RATES по ключу '<throttle_scope>.<kind>',
+    где throttle_scope задаётся у представления. Если частота не настроена,
+    ограничение не применяется.
+    """
+    cache = default_cache
+    cache_format = 'throttle_%(scope)s_%(ident)s'
+    kind = None
+    timer = time.time
+
+    def __init__(self):
+        self.scope = None
+        self.rate = None
+        self.num_requests = None
+        self.duration = None
+        self.wait_seconds = None
+
+    def parse_rate(self, rate):
+        num, period = rate.split('/')
+        duration = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+        return int(num), duration
+
+    def get_ident_key(self, request, view):
+        """
+        Возвращает идентификатор клиента для ключа кеша или None, если ограничение не применяется.
+        """
+        raise NotImplementedError('.get_ident_key() must be overridden')
+
+    def get_cache_key(self, request, view):
+        ident = self.get_ident_key(request, view)
+        if ident is None:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+    def allow_request(self, request, view):
+        throttle_scope = getattr(view, 'throttle_scope', None)
+        if not throttle_scope:
+            return True
+
+        self.scope = f'{throttle_scope}.{self.kind}'
+        self.rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        if self.rate is None:
+            return True
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+
+        now = self.timer()
+        window_start = now - now % self.duration
+        started, current, previous = self.cache.get(key, (window_start, 0, 0))
+
+        # Сдвигаем окна: счётчик текущего окна становится предыдущим
+        if started != window_start:
+            previous = current if window_start - started == self.duration else 0
+            current = 0
+
+        elapsed = now - window_start
+        weight = (self.duration - elapsed) / self.duration
+        estimated = previous * weight + current
+
+        if estimated + 1 > self.num_requests:
+            self.wait_seconds = self._get_wait(previous, current, elapsed)
+            return False
+
+        self.cache.set(key, (window_start, current + 1, previous), self.duration * 2)
+        return True
+
+    def _get_wait(self, previous, current, elapsed):
+        remaining = self.duration - elapsed
+        if current + 1 > self.num_requests or not previous:
+            # Текущее окно исчерпано само по себе, ждём начала следующего
+            return remaining
+        # Ждём, пока вес предыдущего окна не уменьшится достаточно
+        needed = (previous + current + 1 - self.num_requests) / previous * self.duration - elapsed
+        return min(remaining, max(needed, 0))
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class IPRateThrottle(SlidingWindowRateThrottle):
+    """
+    Ограничение по IP-адресу клиента.
+    """
+    kind = 'ip'
+
+    def get_ident_key(self, request, view):
+        return self.get_ident(request)
+
+
+class UserRateThrottle(SlidingWindowRateThrottle):
+    """
+    Ограничение по пользователю из JWT-токена, для анонимных запросов - по IP-адресу.
+    """
+    kind = 'user'
+
+    def get_ident_key(self, request, view):
+        user_id = get_token_user_id(request)
+        if user_id is None:
+            return f'ip_{self.get_ident(request)}'
+        return f'user_{user_id}'
+
+
+class ExamRateThrottle(UserRateThrottle):
+    """
+    Ограничение для пары пользователь - экзамен из URL представления.
+    """
+    kind = 'exam'
+
+    def get_ident_key(self, request, view):
+        exam_id = view.kwargs.get('pk')
+        if exam_id is None:
+            return None
+        return f'{super().get_ident_key(request, view)}_exam_{exam_id}'
+
+
+class ThrottleFirstMixin:
+    """
+    Проверяет ограничения частоты до аутентификации, чтобы отклонённые запросы
+    не доходили до базы данных и хеширования паролей.
+    """
+    _throttles_checked = False
+
+    def perform_authentication(self, request):
+        self.check_throttles(request)
+        self._throttles_checked = True
+        super().perform_authentication(request)
+
+    def check_throttles(self, request):
+        if not self._throttles_checked:
+            super().check_throttles(request)
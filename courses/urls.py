@@ -3,24 +3,59 @@ from .views import (
     SectionCreateAPIView,
     SectionListAPIView,
     SectionRetrieveAPIView,
+    SectionDashboardAPIView,
     SectionUpdateAPIView,
     SectionDestroyAPIView,
+    SectionCloneAPIView,
     MaterialCreateAPIView,
     MaterialListAPIView,
     MaterialRetrieveAPIView,
+    MaterialContentAPIView,
+    MaterialSimilarAPIView,
+    MaterialClusterListAPIView,
     MaterialUpdateAPIView,
-    MaterialDestroyAPIView
+    MaterialDestroyAPIView,
+    MaterialMoveAPIView,
+    MaterialRevisionListAPIView,
+    MaterialRevisionDetailAPIView,
+    MaterialRevisionDiffAPIView,
+    MaterialAttachmentListAPIView,
+    AttachmentUploadCreateAPIView,
+    AttachmentUploadAPIView,
+    AttachmentDownloadAPIView,
+    AttachmentDestroyAPIView,
+    ProgressEventCreateAPIView,
+    MaterialProgressListAPIView,
 )
 
 urlpatterns = [
     path('sections/', SectionListAPIView.as_view(), name='section_list'),
     path('sections/create/', SectionCreateAPIView.as_view(), name='section_create'),
     path('sections/<int:pk>/', SectionRetrieveAPIView.as_view(), name='section_detail'),
+    path('sections/<int:pk>/dashboard/', SectionDashboardAPIView.as_view(), name='section_dashboard'),
     path('sections/<int:pk>/update/', SectionUpdateAPIView.as_view(), name='section_update'),
     path('sections/<int:pk>/delete/', SectionDestroyAPIView.as_view(), name='section_delete'),
+    path('sections/<int:pk>/clone/', SectionCloneAPIView.as_view(), name='section_clone'),
     path('materials/', MaterialListAPIView.as_view(), name='material_list'),
     path('materials/create/', MaterialCreateAPIView.as_view(), name='material_create'),
     path('materials/<int:pk>/', MaterialRetrieveAPIView.as_view(), name='material_detail'),
+    path('materials/<int:pk>/content/', MaterialContentAPIView.as_view(), name='material_content'),
+    path('materials/<int:pk>/similar/', MaterialSimilarAPIView.as_view(), name='material_similar'),
+    path('materials/similar/', MaterialClusterListAPIView.as_view(), name='material_clusters'),
     path('materials/<int:pk>/update/', MaterialUpdateAPIView.as_view(), name='material_update'),
+    path('materials/<int:pk>/move/', MaterialMoveAPIView.as_view(), name='material_move'),
+    path('materials/<int:pk>/revisions/', MaterialRevisionListAPIView.as_view(), name='material_revisions'),
+    path('materials/<int:pk>/revisions/<int:number>/', MaterialRevisionDetailAPIView.as_view(),
+         name='material_revision'),
+    path('materials/<int:pk>/revisions/<int:number>/diff/<int:other>/', MaterialRevisionDiffAPIView.as_view(),
+         name='material_revision_diff'),
     path('materials/<int:pk>/delete/', MaterialDestroyAPIView.as_view(), name='material_delete'),
+    path('materials/<int:pk>/attachments/', MaterialAttachmentListAPIView.as_view(), name='material_attachments'),
+    path('materials/<int:pk>/attachments/uploads/', AttachmentUploadCreateAPIView.as_view(),
+         name='attachment_upload_create'),
+    path('attachments/uploads/<uuid:pk>/', AttachmentUploadAPIView.as_view(), name='attachment_upload'),
+    path('attachments/<int:pk>/download/', AttachmentDownloadAPIView.as_view(), name='attachment_download'),
+    path('attachments/<int:pk>/delete/', AttachmentDestroyAPIView.as_view(), name='attachment_delete'),
+    path('progress/', MaterialProgressListAPIView.as_view(), name='progress_list'),
+    path('progress/events/', ProgressEventCreateAPIView.as_view(), name='progress_events'),
 ]
\ No newline at end of file
@@ -1,11 +1,37 @@
-from rest_framework import generics, permissions
-from rest_framework.exceptions import PermissionDenied
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from activity.log import log_event
+from activity.mixins import LogUpdateMixin
 from exams.models import Exam
-from .models import Section, Material
-from .serializers import SectionSerializer, MaterialSerializer
-from django.db.models import Q
-from courses.permissions import IsModerator, IsModeratorReadOnly, IsOwner
+from .models import Section, Material, MaterialProgress, Attachment, AttachmentUpload
+from .serializers import (
+    SectionSerializer, MaterialSerializer, CONTENT_FORMATS, ProgressEventSerializer, MaterialProgressSerializer,
+    SectionDashboardSerializer, MaterialValuesSerializer, SectionCloneSerializer, MoveSerializer,
+    MaterialRevisionSerializer, AttachmentSerializer, AttachmentUploadSerializer,
+)
+from django.db.models import Q, Prefetch, Count
+from courses.attachments import (
+    UploadError, UploadOffsetMismatch, attachment_response, complete_upload, parse_content_range, write_chunk,
+)
+from courses.cloning import clone_section
+from courses.ordering import MoveMixin
+from courses.permissions import IsModerator, IsModeratorReadOnly, IsOwner, IsPublicReadOnly
+from courses.streaming import stored_content_response
+from courses.fastread import FastListMixin
+from courses.ownership import get_object_owner_id
+from courses.progress import progress_buffer
+from courses.revisions import get_revision_content, diff_revisions
+from courses.similarity import find_similar, find_clusters
+from courses.tasks import purge_deleted_sections
+from tenants.context import get_user_tenant
+from tenants.filters import public_q
+from webhooks.mixins import OutboxUpdateMixin
 
 
 class SectionCreateAPIView(generics.CreateAPIView):
@@ -31,9 +57,10 @@ class SectionListAPIView(generics.ListAPIView):
     def get_queryset(self):
         user = self.request.user
         if user.is_authenticated:
-            return Section.objects.filter(Q(owner=user) | Q(is_public=True))
+            queryset = Section.objects.filter(Q(owner=user) | public_q(user))
         else:
-            return Section.objects.filter(is_public=True)
+            queryset = Section.objects.filter(public_q(user))
+        return queryset.prefetch_related(Prefetch('materials', queryset=Material.objects.with_content()))
 
 
 class SectionRetrieveAPIView(generics.RetrieveAPIView):
@@ -42,11 +69,39 @@ class SectionRetrieveAPIView(generics.RetrieveAPIView):
     Доступно только владельцу или модераторам.
     """
     serializer_class = SectionSerializer
-    queryset = Section.objects.all()
+    queryset = Section.objects.prefetch_related(Prefetch('materials', queryset=Material.objects.with_content()))
     permission_classes = [permissions.IsAuthenticated, IsOwner | IsModerator]
 
 
-class SectionUpdateAPIView(generics.UpdateAPIView):
+class SectionDashboardAPIView(generics.RetrieveAPIView):
+    """
+    API-представление для страницы курса: раздел, его материалы с количеством тестов
+    и тесты с количеством вопросов, видимые текущему пользователю.
+    Выполняется фиксированным числом запросов независимо от размера курса.
+    Доступно владельцу, модераторам и всем пользователям для публичных разделов.
+    """
+    serializer_class = SectionDashboardSerializer
+    permission_classes = [permissions.IsAuthenticated, IsOwner | IsModerator | IsPublicReadOnly]
+
+    def get_queryset(self):
+        # При генерации схемы OpenAPI представление создаётся без запроса
+        if self.request is None:
+            return Section.objects.none()
+        user = self.request.user
+        exams = (
+            Exam.objects.filter(Q(material__owner=user) | public_q(user))
+            .annotate(questions_count=Count('questions'))
+            .order_by('pk')
+        )
+        materials = (
+            Material.objects.filter(Q(owner=user) | public_q(user))
+            .annotate(exams_count=Count('exams', filter=Q(owner=user) | public_q(user, 'exams__')))
+            .prefetch_related(Prefetch('exams', queryset=exams, to_attr='visible_exams'))
+        )
+        return Section.objects.prefetch_related(Prefetch('materials', queryset=materials, to_attr='visible_materials'))
+
+
+class SectionUpdateAPIView(LogUpdateMixin, OutboxUpdateMixin, generics.UpdateAPIView):
     """
     API-представление для обновления информации о разделе.
     Обновление доступно только владельцу или модераторам.
@@ -57,9 +112,8 @@ class SectionUpdateAPIView(generics.UpdateAPIView):
 
     def perform_update(self, serializer):
         user = self.request.user
-        section_id = self.kwargs['pk']
-        section = Section.objects.get(pk=section_id)
-        if section.owner == user or user.groups.filter(name='Moderators').exists():
+        section = serializer.instance
+        if get_object_owner_id(self.request, section) == user.pk or user.groups.filter(name='Moderators').exists():
             serializer.save()
         else:
             raise PermissionDenied("У вас нет разрешения редактировать этот раздел.")
@@ -69,11 +123,37 @@ class SectionDestroyAPIView(generics.DestroyAPIView):
     """
     API-представление для удаления раздела.
     Удаление доступно только владельцу или модераторам.
+    Раздел помечается удалённым, а его содержимое удаляется позже фоновой задачей очистки.
     """
     serializer_class = SectionSerializer
     queryset = Section.objects.all()
     permission_classes = [permissions.IsAuthenticated, IsOwner | IsModerator]
 
+    def perform_destroy(self, instance):
+        instance.soft_delete()
+        transaction.on_commit(purge_deleted_sections.enqueue, using=instance._state.db)
+
+
+class SectionCloneAPIView(generics.GenericAPIView):
+    """
+    API-представление для копирования раздела со всеми материалами, тестами, вопросами и ответами.
+    Копировать может владелец или модератор, владельцем копии становится текущий пользователь.
+    """
+    serializer_class = SectionCloneSerializer
+    queryset = Section.objects.all()
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        user = request.user
+        section = self.get_object()
+        if get_object_owner_id(request, section) != user.pk and not user.groups.filter(name='Moderators').exists():
+            raise PermissionDenied("У вас нет разрешения копировать этот раздел.")
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        clone = clone_section(section, owner=user, title=serializer.validated_data.get('title'))
+        log_event('section.clone', user, clone, source=section.pk)
+        return Response(self.get_serializer(clone).data, status=status.HTTP_201_CREATED)
+
 
 class MaterialCreateAPIView(generics.CreateAPIView):
     """
@@ -85,54 +165,202 @@ class MaterialCreateAPIView(generics.CreateAPIView):
 
     def perform_create(self, serializer):
         section = serializer.validated_data['section']
-        if section.owner != self.request.user:
+        if get_object_owner_id(self.request, section) != self.request.user.pk:
             raise PermissionDenied("Вы не являетесь владельцем этого раздела.")
         serializer.save(owner=self.request.user)
 
 
-class MaterialListAPIView(generics.ListAPIView):
+class MaterialListAPIView(FastListMixin, generics.ListAPIView):
     """
     API-представление для получения списка материалов.
     Возвращает материалы, принадлежащие аутентифицированному пользователю, или публичные материалы.
     """
     serializer_class = MaterialSerializer
+    values_serializer_class = MaterialValuesSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         user = self.request.user
         if user.is_authenticated:
-            return Material.objects.filter(Q(owner=user) | Q(is_public=True))
+            return Material.objects.with_content().filter(Q(owner=user) | public_q(user))
         else:
-            return Material.objects.filter(is_public=True)
+            return Material.objects.with_content().filter(public_q(user))
 
 
 class MaterialRetrieveAPIView(generics.RetrieveAPIView):
     """
     API-представление для получения информации о конкретном материале.
     Доступно только владельцу или модераторам.
+    Параметр content_format=html возвращает содержимое, отрисованное в HTML.
     """
     serializer_class = MaterialSerializer
-    queryset = Material.objects.all()
+    queryset = Material.objects.with_content()
+    permission_classes = [permissions.IsAuthenticated, IsOwner | IsModerator]
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        # При генерации схемы OpenAPI представление создаётся без запроса
+        query_params = self.request.query_params if self.request else {}
+        content_format = query_params.get('content_format', 'markdown')
+        if content_format not in CONTENT_FORMATS:
+            raise ValidationError({'content_format': f'Допустимые значения: {", ".join(CONTENT_FORMATS)}.'})
+        context['content_format'] = content_format
+        return context
+
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        log_event('material.view', request.user, object_type='material', object_id=kwargs['pk'])
+        return response
+
+
+class MaterialContentAPIView(APIView):
+    """
+    API-представление для получения содержимого материала в виде текста.
+    Поддерживает запросы диапазонов (Range), чтобы прерванную загрузку можно было продолжить.
+    Доступно только владельцу или модераторам.
+    """
     permission_classes = [permissions.IsAuthenticated, IsOwner | IsModerator]
 
+    def get(self, request, pk):
+        material = get_object_or_404(Material.objects.with_content(), pk=pk)
+        self.check_object_permissions(request, material)
+        stored = Material._meta.get_field('content').get_stored_value(material)
+        return stored_content_response(request, stored, material.content_size)
+
+
+def get_threshold_param(request):
+    value = request.query_params.get('threshold')
+    if value is None:
+        return None
+    try:
+        threshold = float(value)
+    except ValueError:
+        threshold = -1
+    if not 0 <= threshold <= 1:
+        raise ValidationError({'threshold': 'Ожидается число от 0 до 1.'})
+    return threshold
+
+
+def describe_materials(material_ids):
+    return {
+        material['id']: material
+        for material in Material.objects.filter(pk__in=material_ids).values('id', 'title', 'section', 'owner')
+    }
 
-class MaterialUpdateAPIView(generics.UpdateAPIView):
+
+class MaterialSimilarAPIView(APIView):
+    """
+    API-представление для модераторов: материалы, похожие на данный, по убыванию сходства.
+    Порог сходства задаётся параметром threshold (от 0 до 1).
+    """
+    permission_classes = [permissions.IsAuthenticated, IsModerator]
+
+    def get(self, request, pk):
+        material = get_object_or_404(Material, pk=pk)
+        similar = find_similar(material, get_threshold_param(request))
+        materials = describe_materials([material_id for material_id, _ in similar])
+        return Response([
+            {**materials[material_id], 'similarity': similarity}
+            for material_id, similarity in similar if material_id in materials
+        ])
+
+
+class MaterialClusterListAPIView(APIView):
+    """
+    API-представление для модераторов: группы похожих материалов школы модератора.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsModerator]
+
+    def get(self, request):
+        clusters = find_clusters(get_threshold_param(request), tenant=get_user_tenant(request.user))
+        materials = describe_materials([material_id for cluster in clusters for material_id in cluster])
+        return Response([
+            {'materials': [materials[material_id] for material_id in cluster if material_id in materials]}
+            for cluster in clusters
+        ])
+
+
+class MaterialUpdateAPIView(LogUpdateMixin, OutboxUpdateMixin, generics.UpdateAPIView):
     """
     API-представление для обновления информации о материале.
     Обновление доступно только владельцу или модераторам.
     """
     serializer_class = MaterialSerializer
-    queryset = Material.objects.all()
+    queryset = Material.objects.with_content()
     permission_classes = [permissions.IsAuthenticated, IsOwner | IsModerator]
 
     def perform_update(self, serializer):
         user = self.request.user
         section = serializer.validated_data['section']
-        if section.owner != user or user.groups.filter(name='Moderators').exists():
+        if get_object_owner_id(self.request, section) != user.pk or user.groups.filter(name='Moderators').exists():
             raise PermissionDenied("У вас нет разрешения редактировать этот материал.")
         serializer.save(owner=self.request.user)
 
 
+class MaterialRevisionMixin:
+    """
+    Доступ к истории материала: владельцу или модераторам, как и к самому материалу.
+    """
+    queryset = Material.objects.all()
+    permission_classes = [permissions.IsAuthenticated, IsOwner | IsModerator]
+
+    def get_revision_content(self, material, number):
+        content = get_revision_content(material.pk, number)
+        if content is None:
+            raise NotFound(f'Версия {number} не найдена.')
+        return content
+
+
+class MaterialRevisionListAPIView(MaterialRevisionMixin, generics.GenericAPIView):
+    """
+    API-представление для получения списка версий материала, начиная с последней.
+    """
+    serializer_class = MaterialRevisionSerializer
+
+    def get(self, request, *args, **kwargs):
+        material = self.get_object()
+        revisions = material.revisions.order_by('-number').defer('data')
+        return Response(self.get_serializer(revisions, many=True).data)
+
+
+class MaterialRevisionDetailAPIView(MaterialRevisionMixin, generics.GenericAPIView):
+    """
+    API-представление для получения содержимого версии материала.
+    """
+    serializer_class = MaterialRevisionSerializer
+
+    def get(self, request, pk, number):
+        material = self.get_object()
+        content = self.get_revision_content(material, number)
+        revision = material.revisions.defer('data').get(number=number)
+        return Response({**self.get_serializer(revision).data, 'content': content})
+
+
+class MaterialRevisionDiffAPIView(APIView):
+    """
+    API-представление для получения разницы двух версий материала в формате unified diff.
+    """
+    permission_classes = MaterialRevisionMixin.permission_classes
+
+    def get(self, request, pk, number, other):
+        material = get_object_or_404(Material, pk=pk)
+        self.check_object_permissions(request, material)
+        diff = diff_revisions(material.pk, number, other)
+        if diff is None:
+            raise NotFound('Версия не найдена.')
+        return Response({'from': number, 'to': other, 'diff': diff})
+
+
+class MaterialMoveAPIView(MoveMixin, generics.GenericAPIView):
+    """
+    API-представление для перемещения материала внутри раздела.
+    Записывается только позиция перемещаемого материала.
+    """
+    serializer_class = MoveSerializer
+    queryset = Material.objects.all()
+    permission_classes = [permissions.IsAuthenticated]
+
+
 class MaterialDestroyAPIView(generics.DestroyAPIView):
     """
     API-представление для удаления материала.
@@ -141,3 +369,137 @@ class MaterialDestroyAPIView(generics.DestroyAPIView):
     serializer_class = MaterialSerializer
     queryset = Material.objects.all()
     permission_classes = [permissions.IsAuthenticated, IsOwner | IsModerator]
+
+
+class MaterialAttachmentListAPIView(generics.GenericAPIView):
+    """
+    API-представление для получения списка вложений материала.
+    Доступно владельцу, модераторам и пользователям школы, если материал публичный.
+    """
+    serializer_class = AttachmentSerializer
+    queryset = Material.objects.all()
+    permission_classes = [permissions.IsAuthenticated, IsOwner | IsModerator | IsPublicReadOnly]
+
+    def get(self, request, *args, **kwargs):
+        material = self.get_object()
+        return Response(self.get_serializer(material.attachments.order_by('pk'), many=True).data)
+
+
+class AttachmentUploadCreateAPIView(generics.GenericAPIView):
+    """
+    API-представление для начала загрузки вложения материала по частям.
+    Загружать может владелец материала или модератор.
+    """
+    serializer_class = AttachmentUploadSerializer
+    queryset = Material.objects.all()
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        user = request.user
+        material = self.get_object()
+        if get_object_owner_id(request, material) != user.pk and not user.groups.filter(name='Moderators').exists():
+            raise PermissionDenied("У вас нет разрешения добавлять вложения к этому материалу.")
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(material=material, owner=user)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class AttachmentUploadAPIView(generics.GenericAPIView):
+    """
+    API-представление для загрузки частей вложения. GET возвращает состояние загрузки,
+    PUT с заголовком Content-Range: bytes начало-конец/размер записывает часть из тела запроса.
+    Если часть начинается дальше полученного, ответ - 409 с received, с которого нужно продолжить.
+    После последней части возвращается созданное вложение (201).
+    """
+    serializer_class = AttachmentUploadSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        # При генерации схемы OpenAPI представление создаётся без запроса
+        if self.request is None:
+            return AttachmentUpload.objects.none()
+        return AttachmentUpload.objects.filter(owner=self.request.user)
+
+    def get(self, request, *args, **kwargs):
+        return Response(self.get_serializer(self.get_object()).data)
+
+    def put(self, request, *args, **kwargs):
+        upload = self.get_object()
+        try:
+            start, end, total = parse_content_range(request.headers.get('Content-Range'))
+            write_chunk(upload, request.stream, start, end, total)
+        except UploadOffsetMismatch as exc:
+            return Response({'detail': str(exc), 'received': exc.received}, status=status.HTTP_409_CONFLICT)
+        except UploadError as exc:
+            raise ValidationError({'detail': str(exc)})
+        if upload.received < upload.size:
+            return Response(self.get_serializer(upload).data)
+        attachment = complete_upload(upload)
+        if attachment is None:
+            return Response({'detail': 'Загрузка уже завершена.'}, status=status.HTTP_409_CONFLICT)
+        log_event('attachment.create', request.user, attachment)
+        return Response(AttachmentSerializer(attachment).data, status=status.HTTP_201_CREATED)
+
+
+class AttachmentDownloadAPIView(APIView):
+    """
+    API-представление для скачивания вложения с теми же правами, что и список вложений материала.
+    Поддерживает Range и If-None-Match, файл может отдавать веб-сервер (ATTACHMENT_SENDFILE).
+    """
+    permission_classes = MaterialAttachmentListAPIView.permission_classes
+
+    def get(self, request, pk):
+        attachment = get_object_or_404(Attachment.objects.select_related('material'), pk=pk)
+        self.check_object_permissions(request, attachment.material)
+        return attachment_response(request, attachment)
+
+
+class AttachmentDestroyAPIView(generics.DestroyAPIView):
+    """
+    API-представление для удаления вложения. Удаление доступно владельцу материала или модераторам.
+    Файл удаляется из хранилища командой collect_attachments, когда на него не остаётся ссылок.
+    """
+    serializer_class = AttachmentSerializer
+    queryset = Attachment.objects.all()
+    permission_classes = [permissions.IsAuthenticated, IsOwner | IsModerator]
+
+
+class ProgressEventCreateAPIView(APIView):
+    """
+    API-представление для приёма событий прогресса (открытие и прохождение материала).
+    События попадают в буфер и записываются в базу пачками, поэтому ответ - 202 Accepted.
+    Принимаются события только по материалам, доступным пользователю.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = ProgressEventSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        events = serializer.validated_data
+
+        material_ids = {event['material'] for event in events}
+        allowed = set(
+            Material.objects.filter(pk__in=material_ids)
+            .filter(Q(owner=request.user) | public_q(request.user))
+            .values_list('pk', flat=True)
+        )
+        if material_ids - allowed:
+            raise PermissionDenied("Нет доступа к материалам: " + ', '.join(map(str, sorted(material_ids - allowed))))
+
+        now = timezone.now()
+        for event in events:
+            progress_buffer.add(request.user.pk, event['material'], event['event'], event.get('occurred_at', now))
+        return Response({'accepted': len(events)}, status=status.HTTP_202_ACCEPTED)
+
+
+class MaterialProgressListAPIView(generics.ListAPIView):
+    """
+    API-представление для получения прогресса пользователя по материалам.
+    Последние события могут появиться с задержкой до PROGRESS_FLUSH_INTERVAL секунд.
+    """
+    serializer_class = MaterialProgressSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return MaterialProgress.objects.filter(user=self.request.user).order_by('material_id')
@@ -1,24 +1,31 @@
 from django.contrib import admin
 
+from courses.admin import LargeTableAdmin
 from exams.models import Exam, Question, Answer
 
 
 @admin.register(Exam)
-class ExamAdmin(admin.ModelAdmin):
+class ExamAdmin(LargeTableAdmin):
     list_display = ('id', 'title', 'owner', 'description')
-    list_filter = ('owner',)
-    search_fields = ('owner', 'title')
+    list_filter = ('is_public',)
+    list_select_related = ('owner',)
+    search_fields = ('=id', '^title', '=owner__email')
+    autocomplete_fields = ('owner', 'material')
 
 
 @admin.register(Question)
-class QuestionAdmin(admin.ModelAdmin):
+class QuestionAdmin(LargeTableAdmin):
     list_display = ('id', 'exam', 'text')
-    list_filter = ('exam', 'text')
-    search_fields = ('exam', 'text')
+    list_filter = ('is_multiple_choice',)
+    list_select_related = ('exam',)
+    search_fields = ('=id', '=exam__id', '^exam__title')
+    autocomplete_fields = ('exam',)
 
 
 @admin.register(Answer)
-class AnswerAdmin(admin.ModelAdmin):
+class AnswerAdmin(LargeTableAdmin):
     list_display = ('id', 'question', 'text')
-    list_filter = ('question',)
-    search_fields = ('question', 'text')
\ No newline at end of file
+    list_filter = ('is_correct',)
+    list_select_related = ('question__exam',)
+    search_fields = ('=id', '=question__id')
+    autocomplete_fields = ('question',)
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+LOCAL_CACHE_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Состояние прохождений тестов хранится в кеше, поэтому кеш должен быть общим для всех процессов.
+    """
+    if settings.CACHES['default']['BACKEND'] in LOCAL_CACHE_BACKENDS:
+        return [Warning(
+            'Кеш по умолчанию не общий для процессов: автосохранения прохождений тестов будут теряться.',
+            hint='Задайте REDIS_URL.',
+            id='exams.W001',
+        )]
+    return []
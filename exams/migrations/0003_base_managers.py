@@ -0,0 +1,47 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:06
+
+import django.db.models.manager
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0002_exam_is_public'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='answer',
+            options={'base_manager_name': 'all_objects', 'verbose_name': 'ответ', 'verbose_name_plural': 'ответы'},
+        ),
+        migrations.AlterModelOptions(
+            name='exam',
+            options={'base_manager_name': 'all_objects', 'verbose_name': 'тест', 'verbose_name_plural': 'тесты'},
+        ),
+        migrations.AlterModelOptions(
+            name='question',
+            options={'base_manager_name': 'all_objects', 'verbose_name': 'вопрос', 'verbose_name_plural': 'вопросы'},
+        ),
+        migrations.AlterModelManagers(
+            name='answer',
+            managers=[
+                ('objects', django.db.models.manager.Manager()),
+                ('all_objects', django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.AlterModelManagers(
+            name='exam',
+            managers=[
+                ('objects', django.db.models.manager.Manager()),
+                ('all_objects', django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.AlterModelManagers(
+            name='question',
+            managers=[
+                ('objects', django.db.models.manager.Manager()),
+                ('all_objects', django.db.models.manager.Manager()),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0003_base_managers'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='exam',
+            name='title',
+            field=models.CharField(db_index=True, max_length=200, verbose_name='название теста'),
+        ),
+    ]
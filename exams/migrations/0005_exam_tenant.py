@@ -0,0 +1,27 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:25
+
+import django.db.models.deletion
+import tenants.context
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0004_index_exam_title'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exam',
+            name='tenant',
+            field=models.SlugField(blank=True, default=tenants.context.get_default_tenant, verbose_name='школа'),
+        ),
+        migrations.AlterField(
+            model_name='exam',
+            name='owner',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='exams', to=settings.AUTH_USER_MODEL, verbose_name='Владелец'),
+        ),
+    ]
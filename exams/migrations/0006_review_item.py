@@ -0,0 +1,44 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:28
+
+import django.db.models.deletion
+import django.db.models.manager
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0005_exam_tenant'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('easiness', models.FloatField(default=2.5, verbose_name='коэффициент лёгкости')),
+                ('interval', models.PositiveIntegerField(default=0, verbose_name='интервал, дней')),
+                ('repetitions', models.PositiveIntegerField(default=0, verbose_name='успешных повторений подряд')),
+                ('due_at', models.DateTimeField(verbose_name='следующее повторение')),
+                ('last_reviewed_at', models.DateTimeField(blank=True, null=True, verbose_name='последнее повторение')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='review_items', to='exams.question', verbose_name='вопрос')),
+                ('user', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='review_items', to=settings.AUTH_USER_MODEL, verbose_name='пользователь')),
+            ],
+            options={
+                'verbose_name': 'повторение вопроса',
+                'verbose_name_plural': 'повторение вопросов',
+                'base_manager_name': 'all_objects',
+                'indexes': [models.Index(fields=['user', 'due_at'], name='review_item_due_idx')],
+            },
+            managers=[
+                ('objects', django.db.models.manager.Manager()),
+                ('all_objects', django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='reviewitem',
+            constraint=models.UniqueConstraint(fields=('user', 'question'), name='unique_review_item'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:40
+
+import django.db.models.deletion
+import django.db.models.manager
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0006_review_item'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exam',
+            name='time_limit',
+            field=models.PositiveIntegerField(default=30, verbose_name='время на прохождение, минут'),
+        ),
+        migrations.CreateModel(
+            name='ExamSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('answers', models.JSONField(blank=True, default=dict, help_text='{id вопроса: id ответа или список id ответов}', verbose_name='ответы')),
+                ('sequence', models.PositiveIntegerField(default=0, verbose_name='номер последнего автосохранения')),
+                ('started_at', models.DateTimeField(verbose_name='начало')),
+                ('deadline', models.DateTimeField(verbose_name='срок завершения')),
+                ('saved_at', models.DateTimeField(blank=True, null=True, verbose_name='ответы записаны')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='завершено')),
+                ('score', models.FloatField(blank=True, null=True, verbose_name='оценка, %')),
+                ('correct_answers', models.PositiveIntegerField(blank=True, null=True, verbose_name='правильных ответов')),
+                ('total_questions', models.PositiveIntegerField(blank=True, null=True, verbose_name='всего вопросов')),
+                ('exam', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sessions', to='exams.exam', verbose_name='тест')),
+                ('user', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='exam_sessions', to=settings.AUTH_USER_MODEL, verbose_name='пользователь')),
+            ],
+            options={
+                'verbose_name': 'прохождение теста',
+                'verbose_name_plural': 'прохождения тестов',
+                'base_manager_name': 'all_objects',
+                'indexes': [models.Index(fields=['finished_at', 'deadline'], name='exam_session_deadline_idx')],
+            },
+            managers=[
+                ('objects', django.db.models.manager.Manager()),
+                ('all_objects', django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='examsession',
+            constraint=models.UniqueConstraint(condition=models.Q(('finished_at__isnull', True)), fields=('user', 'exam'), name='unique_active_exam_session'),
+        ),
+    ]
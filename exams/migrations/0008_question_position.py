@@ -0,0 +1,37 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:44
+
+from django.db import migrations, models
+from django.db.models import F
+
+# Шаг позиций из courses.ordering.POSITION_GAP
+POSITION_GAP = 1 << 16
+
+
+def number_positions(apps, schema_editor):
+    # Существующие строки сохраняют порядок по первичному ключу
+    Question = apps.get_model('exams', 'Question')
+    Question._base_manager.using(schema_editor.connection.alias).update(position=F('id') * POSITION_GAP)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0007_exam_session'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='question',
+            options={'base_manager_name': 'all_objects', 'ordering': ['exam', 'position', 'id'], 'verbose_name': 'вопрос', 'verbose_name_plural': 'вопросы'},
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='position',
+            field=models.BigIntegerField(default=0, verbose_name='позиция в тесте'),
+        ),
+        migrations.RunPython(number_positions, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['exam', 'position', 'id'], name='question_position_idx'),
+        ),
+    ]
@@ -1,17 +1,45 @@
 from django.db import models
 from django.contrib.auth import get_user_model
-from courses.models import Material
+from courses.models import Material, AliveSectionManager
+from tenants.context import get_default_tenant
 
 User = get_user_model()
 NULLABLE = {'blank': True, 'null': True}
 
 
+class AliveExamManager(AliveSectionManager):
+    section_lookup = 'material__section'
+
+
+class AliveQuestionManager(AliveSectionManager):
+    section_lookup = 'exam__material__section'
+
+
+class AliveAnswerManager(AliveSectionManager):
+    section_lookup = 'question__exam__material__section'
+
+
+class AliveReviewItemManager(AliveSectionManager):
+    section_lookup = 'question__exam__material__section'
+
+
+class AliveExamSessionManager(AliveSectionManager):
+    section_lookup = 'exam__material__section'
+
+
 class Exam(models.Model):
-    title = models.CharField(max_length=200, verbose_name='название теста')
+    title = models.CharField(max_length=200, db_index=True, verbose_name='название теста')
     description = models.TextField(verbose_name='Описание теста', **NULLABLE)
     material = models.ForeignKey(Material, on_delete=models.CASCADE, related_name='exams', verbose_name='Материал')
-    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='exams', verbose_name='Владелец')
+    owner = models.ForeignKey(
+        User, on_delete=models.CASCADE, db_constraint=False, related_name='exams', verbose_name='Владелец'
+    )
+    tenant = models.SlugField(max_length=50, blank=True, default=get_default_tenant, verbose_name='школа')
     is_public = models.BooleanField(default=False, verbose_name='признак публичности')
+    time_limit = models.PositiveIntegerField(default=30, verbose_name='время на прохождение, минут')
+
+    objects = AliveExamManager()
+    all_objects = models.Manager()
 
     def __str__(self):
         return self.title
@@ -19,12 +47,20 @@ class Exam(models.Model):
     class Meta:
         verbose_name = 'тест'
         verbose_name_plural = 'тесты'
+        base_manager_name = 'all_objects'
 
 
 class Question(models.Model):
     exam = models.ForeignKey(Exam, on_delete=models.CASCADE, related_name='questions', verbose_name='Экзамен')
     text = models.TextField(verbose_name='Текст вопроса')
     is_multiple_choice = models.BooleanField(default=False, verbose_name='Множественный выбор')
+    # Позиции идут с промежутками, см. courses.ordering
+    position = models.BigIntegerField(default=0, verbose_name='позиция в тесте')
+
+    objects = AliveQuestionManager()
+    all_objects = models.Manager()
+
+    position_parent = 'exam'
 
     def __str__(self):
         return f'Вопрос {self.id} для {self.exam.title}'
@@ -32,6 +68,11 @@ class Question(models.Model):
     class Meta:
         verbose_name = 'вопрос'
         verbose_name_plural = 'вопросы'
+        base_manager_name = 'all_objects'
+        ordering = ['exam', 'position', 'id']
+        indexes = [
+            models.Index(fields=['exam', 'position', 'id'], name='question_position_idx'),
+        ]
 
 
 class Answer(models.Model):
@@ -39,9 +80,88 @@ class Answer(models.Model):
     text = models.CharField(max_length=500, verbose_name='Текст ответа')
     is_correct = models.BooleanField(default=False, verbose_name='Правильный ответ')
 
+    objects = AliveAnswerManager()
+    all_objects = models.Manager()
+
     def __str__(self):
         return f'Ответ {self.id} для {self.question.text}'
 
     class Meta:
         verbose_name = 'ответ'
         verbose_name_plural = 'ответы'
+        base_manager_name = 'all_objects'
+
+
+class ReviewItem(models.Model):
+    """
+    Расписание повторения вопроса пользователем по алгоритму SM-2.
+    Расчёт расписания - в exams.review.
+    """
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, db_constraint=False, related_name='review_items', verbose_name='пользователь'
+    )
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='review_items', verbose_name='вопрос')
+    easiness = models.FloatField(default=2.5, verbose_name='коэффициент лёгкости')
+    interval = models.PositiveIntegerField(default=0, verbose_name='интервал, дней')
+    repetitions = models.PositiveIntegerField(default=0, verbose_name='успешных повторений подряд')
+    due_at = models.DateTimeField(verbose_name='следующее повторение')
+    last_reviewed_at = models.DateTimeField(verbose_name='последнее повторение', **NULLABLE)
+
+    objects = AliveReviewItemManager()
+    all_objects = models.Manager()
+
+    def __str__(self):
+        return f'{self.user} - вопрос {self.question_id}: {self.due_at:%Y-%m-%d}'
+
+    class Meta:
+        verbose_name = 'повторение вопроса'
+        verbose_name_plural = 'повторение вопросов'
+        base_manager_name = 'all_objects'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'question'], name='unique_review_item'),
+        ]
+        indexes = [
+            # Очередь пользователя читается одним проходом по диапазону индекса
+            models.Index(fields=['user', 'due_at'], name='review_item_due_idx'),
+        ]
+
+
+class ExamSession(models.Model):
+    """
+    Прохождение теста пользователем с ограничением времени.
+    Автосохранения копятся в кеше и записываются в answers не чаще EXAM_SESSION_FLUSH_INTERVAL,
+    оценка выставляется по записанным ответам. Логика - в exams.sessions.
+    """
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, db_constraint=False, related_name='exam_sessions', verbose_name='пользователь'
+    )
+    exam = models.ForeignKey(Exam, on_delete=models.CASCADE, related_name='sessions', verbose_name='тест')
+    answers = models.JSONField(default=dict, blank=True, verbose_name='ответы',
+                               help_text='{id вопроса: id ответа или список id ответов}')
+    sequence = models.PositiveIntegerField(default=0, verbose_name='номер последнего автосохранения')
+    started_at = models.DateTimeField(verbose_name='начало')
+    deadline = models.DateTimeField(verbose_name='срок завершения')
+    saved_at = models.DateTimeField(verbose_name='ответы записаны', **NULLABLE)
+    finished_at = models.DateTimeField(verbose_name='завершено', **NULLABLE)
+    score = models.FloatField(verbose_name='оценка, %', **NULLABLE)
+    correct_answers = models.PositiveIntegerField(verbose_name='правильных ответов', **NULLABLE)
+    total_questions = models.PositiveIntegerField(verbose_name='всего вопросов', **NULLABLE)
+
+    objects = AliveExamSessionManager()
+    all_objects = models.Manager()
+
+    def __str__(self):
+        return f'{self.user} - {self.exam}: {self.started_at:%Y-%m-%d %H:%M}'
+
+    class Meta:
+        verbose_name = 'прохождение теста'
+        verbose_name_plural = 'прохождения тестов'
+        base_manager_name = 'all_objects'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'exam'], condition=models.Q(finished_at__isnull=True), name='unique_active_exam_session'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['finished_at', 'deadline'], name='exam_session_deadline_idx'),
+        ]
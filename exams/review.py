@@ -0,0 +1,112 @@
+"""
+Интервальное повторение вопросов по алгоритму SM-2.
+
+Оценка ответа (quality) - от 0 до 5: 5 - ответ без затруднений, 3 - правильный ответ с трудом,
+меньше 3 - ошибка. Расписание пачки вопросов читается одним запросом, рассчитывается в памяти
+и записывается одним bulk_create(update_conflicts=True).
+"""
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.utils import timezone
+
+from exams.models import ReviewItem
+
+MIN_EASINESS = 1.3
+DEFAULT_EASINESS = 2.5
+PASSING_QUALITY = 3
+
+# Оценки для результатов экзамена: ошибка возвращает вопрос в начало расписания
+EXAM_CORRECT_QUALITY = 4
+EXAM_WRONG_QUALITY = 1
+
+
+@dataclass
+class Schedule:
+    easiness: float = DEFAULT_EASINESS
+    interval: int = 0
+    repetitions: int = 0
+
+    def review(self, quality):
+        """
+        Пересчитывает расписание после ответа с оценкой quality.
+        """
+        if quality >= PASSING_QUALITY:
+            if self.repetitions == 0:
+                self.interval = 1
+            elif self.repetitions == 1:
+                self.interval = 6
+            else:
+                self.interval = round(self.interval * self.easiness)
+            self.repetitions += 1
+        else:
+            self.repetitions = 0
+            self.interval = 1
+        penalty = 5 - quality
+        self.easiness = max(MIN_EASINESS, self.easiness + 0.1 - penalty * (0.08 + penalty * 0.02))
+
+
+def schedule_reviews(user_id, grades, now=None, add_new=True, using=None):
+    """
+    Обновляет расписание пользователя по оценкам {id вопроса: оценка}.
+    Вопросы, которых ещё нет в расписании, добавляются, только если add_new и ответ ошибочный:
+    они становятся доступны для повторения сразу. Возвращает количество записанных строк.
+    """
+    if not grades:
+        return 0
+    now = now or timezone.now()
+    items_manager = ReviewItem.objects.db_manager(using)
+    existing = {
+        question_id: Schedule(easiness, interval, repetitions)
+        for question_id, easiness, interval, repetitions in items_manager.filter(
+            user_id=user_id, question_id__in=grades
+        ).values_list('question_id', 'easiness', 'interval', 'repetitions')
+    }
+
+    items = []
+    for question_id, quality in grades.items():
+        schedule = existing.get(question_id)
+        if schedule is None:
+            if not add_new or quality >= PASSING_QUALITY:
+                continue
+            schedule, due_at = Schedule(), now
+        else:
+            schedule.review(quality)
+            due_at = now + timedelta(days=schedule.interval)
+        items.append(ReviewItem(
+            user_id=user_id,
+            question_id=question_id,
+            easiness=schedule.easiness,
+            interval=schedule.interval,
+            repetitions=schedule.repetitions,
+            due_at=due_at,
+            last_reviewed_at=now,
+        ))
+
+    items_manager.bulk_create(
+        items,
+        update_conflicts=True,
+        unique_fields=['user', 'question'],
+        update_fields=['easiness', 'interval', 'repetitions', 'due_at', 'last_reviewed_at'],
+    )
+    return len(items)
+
+
+def schedule_exam_results(user_id, results, now=None, using=None):
+    """
+    Учитывает результаты экзамена {id вопроса: ответ верный}: ошибочные вопросы попадают в расписание,
+    уже запланированные вопросы пересчитываются.
+    """
+    grades = {
+        question_id: EXAM_CORRECT_QUALITY if correct else EXAM_WRONG_QUALITY
+        for question_id, correct in results.items()
+    }
+    return schedule_reviews(user_id, grades, now, using=using)
+
+
+def get_due_items(user_id, now=None):
+    """
+    Возвращает вопросы, повторение которых наступило, начиная с самых просроченных.
+    Выборка идёт по индексу (user, due_at), поэтому первые N строк читаются одним проходом по диапазону.
+    """
+    return ReviewItem.objects.filter(user_id=user_id, due_at__lte=now or timezone.now()).order_by('due_at')
@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Exam, Question, Answer
+from courses.fastread import ValuesSerializer
+from .models import Exam, Question, Answer, ReviewItem, ExamSession
 
 
 class AnswerSerializer(serializers.ModelSerializer):
@@ -8,6 +9,14 @@ class AnswerSerializer(serializers.ModelSerializer):
         fields = ['id', 'question', 'text', 'is_correct']
 
 
+class AnswerValuesSerializer(ValuesSerializer):
+    """
+    Быстрый вариант AnswerSerializer для списков.
+    """
+    model = Answer
+    fields = ['id', 'question', 'text', 'is_correct']
+
+
 class QuestionSerializer(serializers.ModelSerializer):
     answers = AnswerSerializer(many=True)
 
@@ -16,14 +25,78 @@ class QuestionSerializer(serializers.ModelSerializer):
         fields = ['id', 'text', 'is_multiple_choice', 'answers']
 
 
+class QuestionValuesSerializer(ValuesSerializer):
+    """
+    Быстрый вариант QuestionSerializer для списков. Ответы загружаются одним запросом на все вопросы.
+    """
+    model = Question
+    fields = ['id', 'text', 'is_multiple_choice', 'answers']
+    related = {'answers': AnswerValuesSerializer}
+
+
 class ExamSerializer(serializers.ModelSerializer):
     questions = QuestionSerializer(many=True, read_only=True)
 
     class Meta:
         model = Exam
-        fields = ['id', 'title', 'description', 'material', 'questions', 'is_public']
+        fields = ['id', 'title', 'description', 'material', 'questions', 'is_public', 'time_limit']
         read_only_fields = ['owner']
 
     def update(self, instance, validated_data):
         validated_data['material'] = instance.material
         return super().update(instance, validated_data)
+
+
+class ReviewAnswerSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Answer
+        fields = ['id', 'text']
+
+
+class ReviewQuestionSerializer(serializers.ModelSerializer):
+    answers = ReviewAnswerSerializer(many=True)
+
+    class Meta:
+        model = Question
+        fields = ['id', 'text', 'is_multiple_choice', 'answers']
+
+
+class ReviewItemSerializer(serializers.ModelSerializer):
+    """
+    Вопрос из очереди повторения. Правильные ответы не раскрываются.
+    """
+    question = ReviewQuestionSerializer()
+
+    class Meta:
+        model = ReviewItem
+        fields = ['question', 'due_at', 'interval', 'repetitions']
+
+
+class ReviewGradeSerializer(serializers.Serializer):
+    question = serializers.IntegerField()
+    quality = serializers.IntegerField(min_value=0, max_value=5)
+
+
+class ExamSessionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ExamSession
+        fields = ['id', 'exam', 'started_at', 'deadline', 'answers', 'sequence', 'finished_at',
+                  'score', 'correct_answers', 'total_questions']
+        read_only_fields = fields
+
+
+class ExamAutosaveSerializer(serializers.Serializer):
+    """
+    Автосохранение: {"answers": {"id вопроса": id ответа или список id}, "sequence": номер}.
+    """
+    answers = serializers.DictField()
+    sequence = serializers.IntegerField(min_value=1, required=False)
+
+    def validate_answers(self, value):
+        for question_id, answer in value.items():
+            if not question_id.isdigit():
+                raise serializers.ValidationError('Ключи должны быть id вопросов.')
+            answer_ids = answer if isinstance(answer, list) else [answer]
+            if not all(isinstance(answer_id, int) and not isinstance(answer_id, bool) for answer_id in answer_ids):
+                raise serializers.ValidationError('Ответ должен быть id ответа или списком id.')
+        return value
@@ -0,0 +1,274 @@
+"""
+Прохождение теста с ограничением времени и автосохранением.
+
+Автосохранения приходят каждые несколько секунд, поэтому состояние прохождения хранится в кеше:
+ответы, ответы, ещё не записанные в базу, номер последнего автосохранения и время последней записи.
+В базу ответы записываются не чаще раза в EXAM_SESSION_FLUSH_INTERVAL секунд и при завершении.
+Если состояние вытеснено из кеша, оно восстанавливается из базы - теряются только ответы с последней записи.
+
+Кеш должен быть общим для всех процессов (Redis, см. CACHES): автосохранения приходят в разные
+веб-процессы, а завершает просроченное прохождение процесс run_workers. Изменение состояния
+выполняется под блокировкой в кеше (cache.add), а при записи в базу несохранённые ответы
+объединяются с записанными под select_for_update, поэтому запись одного процесса
+не затирает ответы, записанные другим.
+
+Срок завершения проверяется на сервере: автосохранения позже deadline + EXAM_SESSION_GRACE
+отклоняются, а незавершённые просроченные прохождения завершает фоновая задача.
+Оценка всегда выставляется по ответам, записанным в базу.
+"""
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, router, transaction
+from django.utils import timezone
+
+from exams.models import Answer, ExamSession
+from exams.review import schedule_exam_results
+
+
+class SessionError(Exception):
+    pass
+
+
+class SessionNotFound(SessionError):
+    pass
+
+
+class SessionFinished(SessionError):
+    pass
+
+
+class SessionExpired(SessionError):
+    pass
+
+
+class SessionBusy(SessionError):
+    pass
+
+
+# Время жизни блокировки состояния (на случай падения процесса) и сколько ждать её освобождения, в секундах
+STATE_LOCK_TIMEOUT = 5
+STATE_LOCK_WAIT = 2
+
+
+def get_database(using=None):
+    return using or router.db_for_write(ExamSession)
+
+
+def get_cache_key(session_id, using):
+    return f'exam-session:v2:{using}:{session_id}'
+
+
+@contextmanager
+def state_lock(session_id, using):
+    """
+    Блокирует изменение состояния прохождения в кеше для всех процессов.
+    """
+    key = get_cache_key(session_id, using) + ':lock'
+    token = uuid.uuid4().hex
+    give_up_at = time.monotonic() + STATE_LOCK_WAIT
+    while not cache.add(key, token, STATE_LOCK_TIMEOUT):
+        if time.monotonic() >= give_up_at:
+            raise SessionBusy('Прохождение теста сохраняется другим запросом, повторите попытку.')
+        time.sleep(0.01)
+    try:
+        yield
+    finally:
+        if cache.get(key) == token:
+            cache.delete(key)
+
+
+def get_grace():
+    return timedelta(seconds=settings.EXAM_SESSION_GRACE)
+
+
+def _state_from_session(session):
+    return {
+        'user_id': session.user_id,
+        'exam_id': session.exam_id,
+        'deadline': session.deadline,
+        'answers': dict(session.answers),
+        'pending': {},
+        'sequence': session.sequence,
+        'flushed_at': session.saved_at or session.started_at,
+        'finished': session.finished_at is not None,
+    }
+
+
+def _store(session_id, using, state, replace=True):
+    # Состояние нужно только до конца срока: после него автосохранения не принимаются
+    timeout = (state['deadline'] + get_grace() - timezone.now()).total_seconds() + settings.EXAM_SESSION_FLUSH_INTERVAL
+    store = cache.set if replace else cache.add
+    store(get_cache_key(session_id, using), state, max(int(timeout), 1))
+
+
+def load_state(session_id, using=None):
+    """
+    Возвращает состояние прохождения из кеша, а если его там нет - из базы. Возвращает None,
+    если прохождения нет. Состояние из базы кладётся в кеш, только если его туда не записал
+    другой запрос, поэтому чтение без блокировки не затирает автосохранения.
+    """
+    using = get_database(using)
+    state = cache.get(get_cache_key(session_id, using))
+    if state is None:
+        session = ExamSession.objects.using(using).filter(pk=session_id).first()
+        if session is None:
+            return None
+        state = _state_from_session(session)
+        if not state['finished']:
+            _store(session_id, using, state, replace=False)
+    return state
+
+
+def flush_state(session_id, state, using=None, now=None):
+    """
+    Записывает несохранённые ответы состояния в базу, если прохождение ещё не завершено.
+    Ответы объединяются с уже записанными по вопросам под блокировкой строки,
+    а состояние получает ответы, записанные другими процессами.
+    """
+    using = get_database(using)
+    now = now or timezone.now()
+    with transaction.atomic(using=using):
+        session = ExamSession.objects.using(using).select_for_update().filter(
+            pk=session_id, finished_at__isnull=True
+        ).only('answers', 'sequence').first()
+        if session is not None:
+            answers = {**session.answers, **state['pending']}
+            sequence = max(session.sequence, state['sequence'])
+            ExamSession.objects.using(using).filter(pk=session_id).update(
+                answers=answers, sequence=sequence, saved_at=now
+            )
+            state['answers'], state['sequence'] = answers, sequence
+    state['pending'] = {}
+    state['flushed_at'] = now
+
+
+def start_session(user, exam, now=None):
+    """
+    Начинает прохождение теста или возвращает уже начатое. Просроченное незавершённое
+    прохождение сначала завершается с оценкой по записанным ответам.
+    Возвращает пару (прохождение, создано ли оно).
+    """
+    now = now or timezone.now()
+    using = router.db_for_write(ExamSession, instance=exam)
+    session = ExamSession.objects.using(using).filter(user=user, exam=exam, finished_at__isnull=True).first()
+    if session is not None:
+        if now <= session.deadline + get_grace():
+            return session, False
+        finish_session(session.pk, using=using, now=now)
+    try:
+        with transaction.atomic(using=using):
+            session = ExamSession.objects.using(using).create(
+                user=user, exam=exam, started_at=now, deadline=now + timedelta(minutes=exam.time_limit)
+            )
+    except IntegrityError:
+        # Прохождение одновременно начато другим запросом
+        return ExamSession.objects.using(using).get(user=user, exam=exam, finished_at__isnull=True), False
+    _store(session.pk, using, _state_from_session(session))
+    return session, True
+
+
+def autosave(session_id, user_id, answers, sequence=None, using=None, now=None):
+    """
+    Добавляет ответы {id вопроса: ответ} к состоянию прохождения пользователя. Автосохранение
+    с номером sequence не больше уже принятого пропускается: запросы могут прийти не по порядку.
+    Ответы записываются в базу, если с прошлой записи прошло EXAM_SESSION_FLUSH_INTERVAL секунд.
+    Возвращает состояние.
+    """
+    using = get_database(using)
+    now = now or timezone.now()
+    with state_lock(session_id, using):
+        state = load_state(session_id, using)
+        if state is None or state['user_id'] != user_id:
+            raise SessionNotFound('Прохождение теста не найдено.')
+        if state['finished']:
+            raise SessionFinished('Прохождение теста уже завершено.')
+        if now > state['deadline'] + get_grace():
+            raise SessionExpired('Время на прохождение теста истекло.')
+        if sequence is not None and sequence <= state['sequence']:
+            return state
+
+        answers = {str(question_id): answer for question_id, answer in answers.items()}
+        state['answers'].update(answers)
+        state['pending'].update(answers)
+        state['sequence'] = state['sequence'] + 1 if sequence is None else sequence
+        if (now - state['flushed_at']).total_seconds() >= settings.EXAM_SESSION_FLUSH_INTERVAL:
+            flush_state(session_id, state, using, now)
+        _store(session_id, using, state)
+    return state
+
+
+def grade_answers(exam, answers):
+    """
+    Проверяет ответы {id вопроса (строкой): id ответа или список id}. Для вопроса с одним ответом
+    сравнивается с первым правильным ответом, со списком - со всеми правильными ответами.
+    Возвращает ({id вопроса: ответ верный}, количество верных, количество вопросов).
+    """
+    correct = defaultdict(list)
+    for question_id, answer_id in Answer.objects.using(exam._state.db).filter(
+        question__exam=exam, is_correct=True
+    ).order_by('pk').values_list('question_id', 'pk'):
+        correct[question_id].append(answer_id)
+
+    results = {}
+    for question_id in exam.questions.order_by('pk').values_list('pk', flat=True):
+        given = answers.get(str(question_id))
+        expected = correct.get(question_id)
+        if isinstance(given, list):
+            results[question_id] = bool(expected) and sorted(given) == sorted(expected)
+        else:
+            results[question_id] = bool(expected) and given == expected[0]
+    return results, sum(results.values()), len(results)
+
+
+def finish_session(session_id, user_id=None, using=None, now=None):
+    """
+    Завершает прохождение: записывает в базу несохранённые ответы и выставляет оценку по ответам из базы.
+    В кеше только ответы, принятые до срока, поэтому они записываются и после него.
+    Повторный вызов возвращает уже завершённое прохождение.
+    """
+    using = get_database(using)
+    now = now or timezone.now()
+    key = get_cache_key(session_id, using)
+    with state_lock(session_id, using), transaction.atomic(using=using):
+        sessions = ExamSession.objects.using(using).select_for_update().select_related('exam')
+        if user_id is not None:
+            sessions = sessions.filter(user_id=user_id)
+        session = sessions.filter(pk=session_id).first()
+        if session is None:
+            raise SessionNotFound('Прохождение теста не найдено.')
+        if session.finished_at is not None:
+            return session
+        state = cache.get(key)
+        if state is not None and state['pending']:
+            flush_state(session_id, state, using, now)
+            session.refresh_from_db(fields=['answers', 'sequence', 'saved_at'])
+
+        results, correct_answers, total_questions = grade_answers(session.exam, session.answers)
+        session.finished_at = min(now, session.deadline)
+        session.correct_answers = correct_answers
+        session.total_questions = total_questions
+        session.score = correct_answers / total_questions * 100 if total_questions else 0
+        session.save(update_fields=['finished_at', 'correct_answers', 'total_questions', 'score'])
+        cache.delete(key)
+    schedule_exam_results(session.user_id, results, now, using=using)
+    return session
+
+
+def finish_expired_sessions(using=None, now=None):
+    """
+    Завершает прохождения, срок которых истёк. Возвращает количество завершённых прохождений.
+    """
+    using = get_database(using)
+    now = now or timezone.now()
+    expired = ExamSession.objects.using(using).filter(finished_at__isnull=True, deadline__lt=now - get_grace())
+    finished = 0
+    for session_id in expired.values_list('pk', flat=True):
+        finish_session(session_id, using=using, now=now)
+        finished += 1
+    return finished
@@ -0,0 +1,6 @@
+from django.db.models.signals import pre_save
+
+from courses.ordering import assign_position
+from exams.models import Question
+
+pre_save.connect(assign_position, sender=Question, dispatch_uid='question_position')
@@ -0,0 +1,24 @@
+from jobs.registry import task
+from tenants.context import get_tenant_databases
+from exams.sessions import finish_expired_sessions as finish_expired, finish_session, get_grace
+
+
+@task(name='exams.finish_expired_sessions', queue='exams')
+def finish_expired_sessions():
+    """
+    Завершает просроченные прохождения тестов во всех базах школ.
+    """
+    for using in get_tenant_databases():
+        finish_expired(using)
+
+
+@task(name='exams.finish_session', queue='exams')
+def finish_expired_session(session_id):
+    """
+    Завершает прохождение теста после срока, если пользователь не завершил его сам.
+    """
+    finish_session(session_id)
+
+
+def schedule_session_finish(session):
+    return finish_expired_session.enqueue({'session_id': session.pk}, run_at=session.deadline + get_grace())
@@ -1,8 +1,22 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 from courses.models import Material, Section
-from exams.models import Exam
+from courses.ownership import get_owner_id, get_object_owner_id
+from exams.models import Exam, Question, Answer, ReviewItem, ExamSession
+from exams.review import Schedule, schedule_reviews
+from exams.sessions import autosave, finish_session, load_state, state_lock
+from jobs.models import Job
+from jobs.worker import work
+from exams.serializers import QuestionSerializer, AnswerSerializer, QuestionValuesSerializer, AnswerValuesSerializer
 from users.models import User
 
 
@@ -147,3 +161,455 @@ class ExamAPITestCase(TestCase):
         response = self.client.delete(f'/exams/{self.exam.id}/delete/')
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
         self.assertEqual(Exam.objects.count(), 1)
+
+
+class SubmitExamThrottleTestCase(TestCase):
+    def setUp(self):
+        """
+        Настройка тестового окружения для проверки ограничения частоты отправки экзамена:
+        - Очистка кеша со счётчиками.
+        - Создание пользователя, материала, экзамена и вопроса с правильным ответом.
+        - Аутентификация по JWT-токену.
+        """
+        cache.clear()
+        # Фиксируем время, чтобы тест не попадал на границу окна
+        patcher = mock.patch('courses.throttling.SlidingWindowRateThrottle.timer', return_value=1000.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create(email='testuser@example.com', password='testpass123412')
+        self.section = Section.objects.create(title='Test Section', owner=self.user)
+        self.material = Material.objects.create(
+            section=self.section, owner=self.user, title='Test Material', content='Содержимое', is_public=True
+        )
+        self.exam = Exam.objects.create(title='Exam', material=self.material, owner=self.user, is_public=True)
+        self.question = Question.objects.create(exam=self.exam, text='Вопрос')
+        self.answer = Answer.objects.create(question=self.question, text='Ответ', is_correct=True)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        self.url = f'/exams/exams/{self.exam.id}/submit/'
+        self.data = {'answers': {str(self.question.id): self.answer.id}}
+
+    def test_submit_throttled_per_exam(self):
+        """
+        Проверяет, что после исчерпания лимита на экзамен запрос отклоняется со статусом 429
+        без единого запроса к базе данных.
+        """
+        for _ in range(5):
+            response = self.client.post(self.url, self.data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            response = self.client.post(self.url, self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+
+    def test_submit_limit_is_per_exam(self):
+        """
+        Проверяет, что лимит одного экзамена не влияет на отправку другого.
+        """
+        other_exam = Exam.objects.create(title='Other', material=self.material, owner=self.user, is_public=True)
+        question = Question.objects.create(exam=other_exam, text='Вопрос')
+        for _ in range(6):
+            self.client.post(self.url, self.data, format='json')
+
+        response = self.client.post(f'/exams/exams/{other_exam.id}/submit/', {'answers': {str(question.id): 0}}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class OwnershipResolverTestCase(TestCase):
+    def setUp(self):
+        """
+        Настройка тестового окружения: создание цепочки раздел - материал - экзамен - вопрос - ответ.
+        """
+        self.user = User.objects.create(email='testuser@example.com', password='testpass123412')
+        self.other_user = User.objects.create(email='otheruser@example.com', password='otherpass123412')
+        self.section = Section.objects.create(title='Test Section', owner=self.user)
+        self.material = Material.objects.create(section=self.section, owner=self.user, title='Material', content='Текст')
+        self.exam = Exam.objects.create(title='Exam', material=self.material, owner=self.user)
+        self.question = Question.objects.create(exam=self.exam, text='Вопрос')
+        self.answer = Answer.objects.create(question=self.question, text='Ответ', is_correct=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_owner_resolved_in_one_query(self):
+        """
+        Проверяет, что владелец ответа определяется одним запросом и запоминается в рамках запроса.
+        """
+        request = mock.Mock(spec=[])
+        with self.assertNumQueries(1):
+            self.assertEqual(get_object_owner_id(request, self.answer), self.user.id)
+            self.assertEqual(get_owner_id(request, Answer, self.answer.id), self.user.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_object_owner_id(request, self.exam), self.user.id)
+
+    def test_question_detail_for_owner(self):
+        """
+        Проверяет, что владелец материала получает вопрос, а другой пользователь - статус 403 Forbidden.
+        """
+        response = self.client.get(f'/exams/questions/{self.question.id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.client.force_authenticate(user=self.other_user)
+        response = self.client.get(f'/exams/questions/{self.question.id}/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_create_answer_permission_denied(self):
+        """
+        Проверяет отказ в создании ответа к чужому вопросу.
+        """
+        self.client.force_authenticate(user=self.other_user)
+        data = {'question': self.question.id, 'text': 'Чужой ответ', 'is_correct': False}
+        response = self.client.post('/exams/answers/create/', data)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(Answer.objects.count(), 1)
+
+
+class AdminChangelistTestCase(TestCase):
+    def setUp(self):
+        """
+        Настройка тестового окружения: создание суперпользователя и тестов с вопросами и ответами.
+        """
+        self.admin = User.objects.create_superuser(email='admin@example.com', password='adminpass123412')
+        self.client.force_login(self.admin)
+        self.section = Section.objects.create(title='Test Section', owner=self.admin)
+        self.material = Material.objects.create(section=self.section, owner=self.admin, title='Material', content='Текст')
+
+    def _create_answers(self, count):
+        for i in range(count):
+            exam = Exam.objects.create(title=f'Exam {i}', material=self.material, owner=self.admin)
+            question = Question.objects.create(exam=exam, text=f'Вопрос {i}')
+            Answer.objects.create(question=question, text='Ответ')
+
+    def test_changelists_query_count_does_not_grow(self):
+        """
+        Проверяет, что количество запросов на страницах списков не зависит от количества строк.
+        """
+        urls = ['/admin/exams/exam/', '/admin/exams/question/', '/admin/exams/answer/', '/admin/courses/material/']
+        self._create_answers(2)
+        counts = {}
+        for url in urls:
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+            counts[url] = len(queries)
+
+        self._create_answers(10)
+        for url in urls:
+            with self.assertNumQueries(counts[url]):
+                self.client.get(url)
+
+    def test_changelist_search(self):
+        """
+        Проверяет поиск по префиксу названия и по id в списках тестов.
+        """
+        self._create_answers(3)
+        response = self.client.get('/admin/exams/exam/', {'q': 'Exam 1'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.context['cl'].result_list), 1)
+        exam = Exam.objects.get(title='Exam 2')
+        response = self.client.get('/admin/exams/exam/', {'q': str(exam.id)})
+        self.assertEqual(list(response.context['cl'].result_list), [exam])
+
+    def test_changelist_search_uses_case_sensitive_lookups(self):
+        """
+        Проверяет, что поиск использует регистрозависимые startswith и exact, которые обслуживаются индексами.
+        """
+        self._create_answers(1)
+        response = self.client.get('/admin/exams/exam/', {'q': 'Exam'})
+        nodes = [response.context['cl'].queryset.query.where]
+        lookups = set()
+        while nodes:
+            node = nodes.pop()
+            nodes.extend(getattr(node, 'children', []))
+            if hasattr(node, 'lookup_name'):
+                lookups.add(node.lookup_name)
+        self.assertTrue({'startswith', 'exact'} <= lookups)
+        self.assertFalse({'istartswith', 'iexact'} & lookups)
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+
+class ValuesSerializerTestCase(TestCase):
+    def setUp(self):
+        """
+        Настройка тестового окружения: публичный тест другого пользователя и собственный закрытый тест.
+        """
+        self.user = User.objects.create(email='testuser@example.com', password='testpass123412')
+        self.other_user = User.objects.create(email='otheruser@example.com', password='otherpass123412')
+        section = Section.objects.create(title='Test Section', owner=self.other_user)
+        own_material = Material.objects.create(section=section, owner=self.user, title='Own', content='Текст')
+        other_material = Material.objects.create(section=section, owner=self.other_user, title='Other', content='Текст')
+        Exam.objects.create(title='Hidden', material=other_material, owner=self.other_user)
+        for exam in (
+            Exam.objects.create(title='Own', material=own_material, owner=self.user),
+            Exam.objects.create(title='Public', material=other_material, owner=self.other_user, is_public=True),
+        ):
+            for i in range(3):
+                question = Question.objects.create(exam=exam, text=f'Вопрос {i}', is_multiple_choice=i == 1)
+                for j in range(i):
+                    Answer.objects.create(question=question, text=f'Ответ {j}', is_correct=j == 0)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_output_matches_model_serializers(self):
+        """
+        Проверяет, что быстрые сериализаторы дают тот же JSON, что и сериализаторы моделей.
+        """
+        questions = Question.objects.all()
+        self.assertEqual(
+            JSONRenderer().render(QuestionValuesSerializer(questions).data),
+            JSONRenderer().render(QuestionSerializer(questions, many=True).data),
+        )
+        answers = Answer.objects.all()
+        self.assertEqual(
+            JSONRenderer().render(AnswerValuesSerializer(answers).data),
+            JSONRenderer().render(AnswerSerializer(answers, many=True).data),
+        )
+
+    def test_nested_rows_use_subquery(self):
+        """
+        Проверяет, что ответы вопросов выбираются подзапросом, а не списком id всех вопросов,
+        поэтому число параметров запроса не растёт с длиной списка.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            data = QuestionValuesSerializer(Question.objects.all()).data
+        self.assertEqual(len(data), 6)
+        self.assertEqual(len(queries), 2)
+        self.assertIn('IN (SELECT', queries[1]['sql'])
+
+    def test_list_endpoints(self):
+        """
+        Проверяет видимость в списках и постоянное число запросов для вопросов с ответами.
+        """
+        with self.assertNumQueries(2):
+            response = self.client.get('/exams/questions/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 6)
+        self.assertEqual([len(question['answers']) for question in response.data[:3]], [0, 1, 2])
+
+        response = self.client.get('/exams/answers/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 6)
+
+
+class ReviewQueueTestCase(TestCase):
+    def setUp(self):
+        """
+        Настройка тестового окружения: экзамен из трёх вопросов с одним правильным ответом в каждом.
+        """
+        self.user = User.objects.create(email='testuser@example.com', password='testpass123412')
+        section = Section.objects.create(title='Test Section', owner=self.user)
+        material = Material.objects.create(section=section, owner=self.user, title='Material', content='Текст')
+        self.exam = Exam.objects.create(title='Exam', material=material, owner=self.user)
+        self.questions = [Question.objects.create(exam=self.exam, text=f'Вопрос {i}') for i in range(3)]
+        self.correct = [Answer.objects.create(question=question, text='Да', is_correct=True) for question in self.questions]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_sm2_intervals(self):
+        """
+        Проверяет интервалы и коэффициент лёгкости по алгоритму SM-2.
+        """
+        schedule = Schedule()
+        intervals = []
+        for quality in (5, 5, 5, 2):
+            schedule.review(quality)
+            intervals.append(schedule.interval)
+        self.assertEqual(intervals, [1, 6, 16, 1])
+        self.assertEqual(schedule.repetitions, 0)
+        self.assertAlmostEqual(schedule.easiness, 2.48)
+
+    def test_wrong_answers_queued_and_reviewed(self):
+        """
+        Проверяет, что ошибочные ответы экзамена попадают в очередь, а оценка переносит повторение.
+        """
+        answers = {str(self.questions[0].id): self.correct[0].id, str(self.questions[1].id): 0}
+        response = self.client.post(f'/exams/exams/{self.exam.id}/submit/', {'answers': answers}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get('/exams/review/next/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['question']['id'] for item in response.data], [self.questions[1].id, self.questions[2].id])
+        self.assertEqual(response.data[0]['question']['answers'], [{'id': self.correct[1].id, 'text': 'Да'}])
+        self.assertEqual(len(self.client.get('/exams/review/next/?limit=1').data), 1)
+
+        response = self.client.post('/exams/review/', [{'question': self.questions[1].id, 'quality': 5}], format='json')
+        self.assertEqual(response.data, {'updated': 1})
+        item = ReviewItem.objects.get(question=self.questions[1])
+        self.assertEqual((item.repetitions, item.interval), (1, 1))
+        self.assertEqual([item['question']['id'] for item in self.client.get('/exams/review/next/').data], [self.questions[2].id])
+
+        response = self.client.post('/exams/review/', [{'question': self.questions[0].id, 'quality': 7}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_schedule_query_count(self):
+        """
+        Проверяет, что расписание пачки вопросов пересчитывается двумя запросами независимо от размера пачки.
+        """
+        questions = Question.objects.bulk_create([Question(exam=self.exam, text=f'Q{i}') for i in range(50)])
+        with self.assertNumQueries(2):
+            schedule_reviews(self.user.pk, {question.id: 1 for question in questions})
+        with self.assertNumQueries(2):
+            self.assertEqual(schedule_reviews(self.user.pk, {question.id: 4 for question in questions}), 50)
+        self.assertEqual(set(ReviewItem.objects.values_list('repetitions', flat=True)), {1})
+
+
+@override_settings(EXAM_SESSION_FLUSH_INTERVAL=30, EXAM_SESSION_GRACE=10)
+class ExamSessionTestCase(TestCase):
+    def setUp(self):
+        """
+        Настройка тестового окружения: публичный тест из двух вопросов с ограничением времени 10 минут.
+        """
+        cache.clear()
+        self.user = User.objects.create(email='testuser@example.com', password='testpass123412')
+        section = Section.objects.create(title='Test Section', owner=self.user)
+        material = Material.objects.create(section=section, owner=self.user, title='Material', content='Текст')
+        self.exam = Exam.objects.create(title='Exam', material=material, owner=self.user, time_limit=10, is_public=True)
+        self.questions = [Question.objects.create(exam=self.exam, text=f'Вопрос {i}') for i in range(2)]
+        self.correct = [Answer.objects.create(question=question, text='Да', is_correct=True) for question in self.questions]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _start(self):
+        response = self.client.post(f'/exams/{self.exam.id}/sessions/')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return ExamSession.objects.get(pk=response.data['id'])
+
+    def test_start_is_idempotent_and_schedules_finish(self):
+        """
+        Проверяет срок завершения, повторный старт того же прохождения и задачу завершения после срока.
+        """
+        session = self._start()
+        self.assertEqual(session.deadline - session.started_at, timedelta(minutes=10))
+        self.assertEqual(self.client.post(f'/exams/{self.exam.id}/sessions/').data['id'], session.id)
+        job = Job.objects.get()
+        self.assertEqual((job.name, job.kwargs), ('exams.finish_session', {'session_id': session.id}))
+        self.assertEqual(job.run_at, session.deadline + timedelta(seconds=10))
+
+        self.client.force_authenticate(user=User.objects.create(email='other@example.com'))
+        response = self.client.post(f'/exams/sessions/{session.id}/finish/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.post(f'/exams/sessions/{session.id}/autosave/', {'answers': {}}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_autosave_kept_in_cache_and_flushed_debounced(self):
+        """
+        Проверяет, что автосохранение не обращается к базе до истечения интервала записи,
+        запросы не по порядку пропускаются, а после интервала ответы записываются в базу.
+        """
+        session = self._start()
+        url = f'/exams/sessions/{session.id}/autosave/'
+        first = {str(self.questions[0].id): self.correct[0].id}
+        with self.assertNumQueries(0):
+            response = self.client.post(url, {'answers': first, 'sequence': 2}, format='json')
+        self.assertEqual(response.data['sequence'], 2)
+        self.client.post(url, {'answers': {str(self.questions[0].id): 0}, 'sequence': 1}, format='json')
+        session.refresh_from_db()
+        self.assertEqual(session.answers, {})
+        self.assertEqual(self.client.get(f'/exams/sessions/{session.id}/').data['answers'], first)
+
+        second = {str(self.questions[1].id): [self.correct[1].id]}
+        autosave(session.id, self.user.pk, second, now=session.started_at + timedelta(seconds=31))
+        session.refresh_from_db()
+        self.assertEqual(session.answers, {**first, **second})
+        self.assertEqual(session.sequence, 3)
+
+        response = self.client.post(url, {'answers': {'x': 1}}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_finish_grades_persisted_answers(self):
+        """
+        Проверяет, что завершение записывает ответы из кеша, ставит оценку, планирует повторение ошибок
+        и что после завершения автосохранения отклоняются.
+        """
+        session = self._start()
+        answers = {str(self.questions[0].id): self.correct[0].id, str(self.questions[1].id): 0}
+        self.client.post(f'/exams/sessions/{session.id}/autosave/', {'answers': answers}, format='json')
+
+        response = self.client.post(f'/exams/sessions/{session.id}/finish/')
+        self.assertEqual(response.data, {'score': 50.0, 'correct_answers': 1, 'total_questions': 2})
+        session.refresh_from_db()
+        self.assertEqual(session.answers, answers)
+        self.assertIsNotNone(session.finished_at)
+        self.assertEqual(list(ReviewItem.objects.values_list('question', flat=True)), [self.questions[1].id])
+
+        self.assertEqual(self.client.post(f'/exams/sessions/{session.id}/finish/').data['score'], 50.0)
+        response = self.client.post(f'/exams/sessions/{session.id}/autosave/', {'answers': answers}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertNotEqual(self._start().id, session.id)
+
+    def test_deadline_enforced(self):
+        """
+        Проверяет, что после срока автосохранение отклоняется, а фоновая задача завершает прохождение
+        с ответами, принятыми до срока.
+        """
+        session = self._start()
+        answers = {str(self.questions[0].id): self.correct[0].id}
+        self.client.post(f'/exams/sessions/{session.id}/autosave/', {'answers': answers}, format='json')
+
+        later = session.deadline + timedelta(seconds=11)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            response = self.client.post(f'/exams/sessions/{session.id}/autosave/', {'answers': {}}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+            self.assertEqual(work(burst=True), 1)
+
+        session.refresh_from_db()
+        self.assertEqual((session.score, session.finished_at), (50.0, session.deadline))
+        self.assertEqual(session.answers, answers)
+
+
+    def test_flush_merges_answers_of_other_processes(self):
+        """
+        Проверяет, что запись ответов из кеша одного процесса объединяется с ответами,
+        записанными другим процессом, а не затирает их.
+        """
+        session = self._start()
+        first, second = (str(question.id) for question in self.questions)
+        autosave(session.id, self.user.pk, {first: self.correct[0].id})
+        # Другой процесс со своим кешем уже записал ответ на второй вопрос
+        ExamSession.objects.filter(pk=session.id).update(answers={second: self.correct[1].id}, sequence=5)
+
+        session = finish_session(session.id)
+        self.assertEqual(session.answers, {first: self.correct[0].id, second: self.correct[1].id})
+        self.assertEqual((session.sequence, session.score), (5, 100.0))
+
+    def test_concurrent_autosave_waits_for_lock(self):
+        """
+        Проверяет, что пока состояние изменяется другим запросом, автосохранение не выполняется
+        и возвращает 409, а после освобождения блокировки принимается.
+        """
+        session = self._start()
+        url = f'/exams/sessions/{session.id}/autosave/'
+        answers = {str(self.questions[0].id): self.correct[0].id}
+        with mock.patch('exams.sessions.STATE_LOCK_WAIT', 0), state_lock(session.id, 'default'):
+            response = self.client.post(url, {'answers': answers}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        response = self.client.post(url, {'answers': answers}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(load_state(session.id)['pending'], answers)
+
+class QuestionOrderingTestCase(TestCase):
+    def setUp(self):
+        """
+        Настройка тестового окружения: тест из трёх вопросов.
+        """
+        self.user = User.objects.create(email='testuser@example.com', password='testpass123412')
+        section = Section.objects.create(title='Test Section', owner=self.user)
+        material = Material.objects.create(section=section, owner=self.user, title='Material', content='Текст')
+        self.exam = Exam.objects.create(title='Exam', material=material, owner=self.user)
+        self.questions = [Question.objects.create(exam=self.exam, text=f'Вопрос {i}') for i in range(3)]
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_move_question(self):
+        """
+        Проверяет, что перемещённый вопрос выводится на новом месте в тесте и в списке вопросов,
+        а чужой вопрос переместить нельзя.
+        """
+        response = self.client.post(f'/exams/questions/{self.questions[2].id}/move/', {'before': self.questions[0].id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = ['Вопрос 2', 'Вопрос 0', 'Вопрос 1']
+        self.assertEqual([q['text'] for q in self.client.get(f'/exams/{self.exam.id}/').data['questions']], expected)
+        self.assertEqual([q['text'] for q in self.client.get('/exams/questions/').data], expected)
+
+        self.client.force_authenticate(user=User.objects.create(email='other@example.com'))
+        response = self.client.post(f'/exams/questions/{self.questions[0].id}/move/', {'after': None}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -3,7 +3,8 @@ from .views import (
     ExamCreateAPIView, ExamListAPIView, ExamDetailAPIView,
     ExamUpdateAPIView, ExamDeleteAPIView, QuestionCreateAPIView, QuestionListAPIView, QuestionDetailAPIView,
     QuestionUpdateAPIView, QuestionDeleteAPIView, AnswerCreateAPIView, AnswerListAPIView, AnswerDetailAPIView,
-    AnswerUpdateAPIView, AnswerDeleteAPIView, SubmitExamAPIView
+    AnswerUpdateAPIView, AnswerDeleteAPIView, SubmitExamAPIView, ReviewQueueAPIView, ReviewSubmitAPIView,
+    QuestionMoveAPIView, ExamSessionStartAPIView, ExamSessionDetailAPIView, ExamSessionAutosaveAPIView, ExamSessionFinishAPIView,
 )
 
 urlpatterns = [
@@ -18,6 +19,7 @@ urlpatterns = [
     path('questions/<int:pk>/', QuestionDetailAPIView.as_view(), name='question-detail'),
     path('questions/<int:pk>/update/', QuestionUpdateAPIView.as_view(), name='question-update'),
     path('questions/<int:pk>/delete/', QuestionDeleteAPIView.as_view(), name='question-delete'),
+    path('questions/<int:pk>/move/', QuestionMoveAPIView.as_view(), name='question-move'),
 
     path('answers/create/', AnswerCreateAPIView.as_view(), name='answer-create'),
     path('answers/', AnswerListAPIView.as_view(), name='answer-list'),
@@ -26,4 +28,11 @@ urlpatterns = [
     path('answers/<int:pk>/delete/', AnswerDeleteAPIView.as_view(), name='answer-delete'),
 
     path('exams/<int:pk>/submit/', SubmitExamAPIView.as_view(), name='exam-submit'),
+    path('<int:pk>/sessions/', ExamSessionStartAPIView.as_view(), name='exam-session-start'),
+    path('sessions/<int:pk>/', ExamSessionDetailAPIView.as_view(), name='exam-session-detail'),
+    path('sessions/<int:pk>/autosave/', ExamSessionAutosaveAPIView.as_view(), name='exam-session-autosave'),
+    path('sessions/<int:pk>/finish/', ExamSessionFinishAPIView.as_view(), name='exam-session-finish'),
+
+    path('review/next/', ReviewQueueAPIView.as_view(), name='review-next'),
+    path('review/', ReviewSubmitAPIView.as_view(), name='review-submit'),
 ]
\ No newline at end of file
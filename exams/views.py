@@ -1,12 +1,30 @@
-from django.db.models import Q
+from django.db.models import Q, Prefetch
+from django.shortcuts import get_object_or_404
 from rest_framework import generics, permissions, status
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError, NotFound
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import Exam, Question, Answer
-from .serializers import ExamSerializer, QuestionSerializer, AnswerSerializer
+from .models import Exam, Question, Answer, ReviewItem, ExamSession
+from .review import schedule_exam_results, schedule_reviews, get_due_items
+from .serializers import (
+    ExamSerializer, QuestionSerializer, AnswerSerializer, QuestionValuesSerializer, AnswerValuesSerializer,
+    ReviewItemSerializer, ReviewGradeSerializer, ExamSessionSerializer, ExamAutosaveSerializer,
+)
+from .sessions import (
+    SessionError, SessionNotFound, start_session, load_state, autosave, finish_session, grade_answers,
+)
+from .tasks import schedule_session_finish
+from activity.log import log_event
+from activity.mixins import LogUpdateMixin
+from courses.fastread import FastListMixin
+from courses.ordering import MoveMixin
+from courses.ownership import get_owner_id, get_object_owner_id
 from courses.permissions import IsOwner, IsModerator
+from courses.serializers import MoveSerializer
+from courses.throttling import ThrottleFirstMixin, UserRateThrottle, ExamRateThrottle
+from tenants.filters import public_q
+from webhooks.mixins import OutboxUpdateMixin
 
 
 class ExamCreateAPIView(generics.CreateAPIView):
@@ -19,7 +37,7 @@ class ExamCreateAPIView(generics.CreateAPIView):
 
     def perform_create(self, serializer):
         material = serializer.validated_data['material']
-        if material.owner != self.request.user:
+        if get_object_owner_id(self.request, material) != self.request.user.pk:
             raise PermissionDenied("Вы не являетесь владельцем этого материала.")
         serializer.save(owner=self.request.user)
 
@@ -35,9 +53,9 @@ class ExamListAPIView(generics.ListAPIView):
     def get_queryset(self):
         user = self.request.user
         if user.is_authenticated:
-            return Exam.objects.filter(Q(material__owner=user) | Q(is_public=True))
+            return Exam.objects.filter(Q(material__owner=user) | public_q(user))
         else:
-            return Exam.objects.filter(is_public=True)
+            return Exam.objects.filter(public_q(user))
 
 
 class ExamDetailAPIView(generics.RetrieveAPIView):
@@ -49,8 +67,13 @@ class ExamDetailAPIView(generics.RetrieveAPIView):
     queryset = Exam.objects.all()
     permission_classes = [permissions.IsAuthenticated, IsOwner | IsModerator]
 
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        log_event('exam.start', request.user, object_type='exam', object_id=kwargs['pk'])
+        return response
 
-class ExamUpdateAPIView(generics.UpdateAPIView):
+
+class ExamUpdateAPIView(LogUpdateMixin, OutboxUpdateMixin, generics.UpdateAPIView):
     """
     API для обновления экзамена.
     Обновлять экзамен могут только владелец или модераторы.
@@ -61,9 +84,8 @@ class ExamUpdateAPIView(generics.UpdateAPIView):
 
     def perform_update(self, serializer):
         user = self.request.user
-        exam_id = self.kwargs['pk']
-        exam = Exam.objects.get(pk=exam_id)
-        if exam.owner == user or user.groups.filter(name='Moderators').exists():
+        exam = serializer.instance
+        if get_object_owner_id(self.request, exam) == user.pk or user.groups.filter(name='Moderators').exists():
             serializer.save()
         else:
             raise PermissionDenied("У вас нет разрешения редактировать этот раздел.")
@@ -89,25 +111,26 @@ class QuestionCreateAPIView(generics.CreateAPIView):
 
     def perform_create(self, serializer):
         exam = serializer.validated_data['exam']
-        if exam.material.owner != self.request.user:
+        if get_owner_id(self.request, 'courses.Material', exam.material_id) != self.request.user.pk:
             raise PermissionDenied("Вы не являетесь владельцем этого материала.")
         serializer.save()
 
 
-class QuestionListAPIView(generics.ListAPIView):
+class QuestionListAPIView(FastListMixin, generics.ListAPIView):
     """
     API для получения списка вопросов.
     Возвращает вопросы, принадлежащие аутентифицированному пользователю, или публичные вопросы.
     """
     serializer_class = QuestionSerializer
+    values_serializer_class = QuestionValuesSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         user = self.request.user
         if user.is_authenticated:
-            return Question.objects.filter(Q(exam__material__owner=user) | Q(exam__is_public=True))
+            return Question.objects.filter(Q(exam__material__owner=user) | public_q(user, 'exam__'))
         else:
-            return Question.objects.filter(exam__is_public=True)
+            return Question.objects.filter(public_q(user, 'exam__'))
 
 
 class QuestionDetailAPIView(generics.RetrieveAPIView):
@@ -120,7 +143,7 @@ class QuestionDetailAPIView(generics.RetrieveAPIView):
     permission_classes = [permissions.IsAuthenticated, IsOwner | IsModerator]
 
 
-class QuestionUpdateAPIView(generics.UpdateAPIView):
+class QuestionUpdateAPIView(LogUpdateMixin, generics.UpdateAPIView):
     """
     API для обновления вопроса.
     Обновлять вопрос могут только владелец или модераторы.
@@ -131,13 +154,23 @@ class QuestionUpdateAPIView(generics.UpdateAPIView):
 
     def perform_update(self, serializer):
         user = self.request.user
-        question = self.get_object()
-        if question.exam.material.owner == user or user.groups.filter(name='Moderators').exists():
+        question = serializer.instance
+        if get_object_owner_id(self.request, question) == user.pk or user.groups.filter(name='Moderators').exists():
             serializer.save()
         else:
             raise PermissionDenied("У вас нет разрешения редактировать этот вопрос.")
 
 
+class QuestionMoveAPIView(MoveMixin, generics.GenericAPIView):
+    """
+    API для перемещения вопроса внутри теста.
+    Записывается только позиция перемещаемого вопроса.
+    """
+    serializer_class = MoveSerializer
+    queryset = Question.objects.all()
+    permission_classes = [permissions.IsAuthenticated]
+
+
 class QuestionDeleteAPIView(generics.DestroyAPIView):
     """
     API для удаления вопроса.
@@ -158,25 +191,28 @@ class AnswerCreateAPIView(generics.CreateAPIView):
 
     def perform_create(self, serializer):
         question = serializer.validated_data['question']
-        if question.exam.material.owner != self.request.user:
+        if get_object_owner_id(self.request, question) != self.request.user.pk:
             raise PermissionDenied("Вы не являетесь владельцем этого материала.")
         serializer.save()
 
 
-class AnswerListAPIView(generics.ListAPIView):
+class AnswerListAPIView(FastListMixin, generics.ListAPIView):
     """
     API для получения списка ответов.
     Возвращает ответы, принадлежащие аутентифицированному пользователю, или публичные ответы.
     """
     serializer_class = AnswerSerializer
+    values_serializer_class = AnswerValuesSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         user = self.request.user
         if user.is_authenticated:
-            return Answer.objects.filter(Q(question__exam__material__owner=user) | Q(question__exam__is_public=True))
+            return Answer.objects.filter(
+                Q(question__exam__material__owner=user) | public_q(user, 'question__exam__')
+            )
         else:
-            return Answer.objects.filter(question__exam__is_public=True)
+            return Answer.objects.filter(public_q(user, 'question__exam__'))
 
 
 class AnswerDetailAPIView(generics.RetrieveAPIView):
@@ -189,7 +225,7 @@ class AnswerDetailAPIView(generics.RetrieveAPIView):
     permission_classes = [permissions.IsAuthenticated, IsOwner | IsModerator]
 
 
-class AnswerUpdateAPIView(generics.UpdateAPIView):
+class AnswerUpdateAPIView(LogUpdateMixin, generics.UpdateAPIView):
     """
     API для обновления ответа.
     Обновлять ответ могут только владелец или модераторы.
@@ -200,8 +236,8 @@ class AnswerUpdateAPIView(generics.UpdateAPIView):
 
     def perform_update(self, serializer):
         user = self.request.user
-        answer = self.get_object()
-        if answer.question.exam.material.owner == user or user.groups.filter(name='Moderators').exists():
+        answer = serializer.instance
+        if get_object_owner_id(self.request, answer) == user.pk or user.groups.filter(name='Moderators').exists():
             serializer.save()
         else:
             raise PermissionDenied("У вас нет разрешения редактировать этот ответ.")
@@ -217,27 +253,137 @@ class AnswerDeleteAPIView(generics.DestroyAPIView):
     permission_classes = [permissions.IsAuthenticated, IsOwner | IsModerator]
 
 
-class SubmitExamAPIView(APIView):
+class SubmitExamAPIView(ThrottleFirstMixin, APIView):
     """
     API для отправки экзамена.
     Аутентифицированные пользователи могут отправить свои ответы и получить оценку.
+    Частота отправок ограничена для пользователя и для пары пользователь - экзамен.
     """
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [UserRateThrottle, ExamRateThrottle]
+    throttle_scope = 'submit'
 
     def post(self, request, pk):
         user = request.user
         exam = Exam.objects.get(pk=pk)
         user_answers = request.data.get('answers')
 
-        # Логика проверки ответов
-        correct_answers = 0
-        total_questions = exam.questions.count()
-
-        for question in exam.questions.all():
-            correct_answer = question.answers.filter(is_correct=True).first()
-            user_answer = user_answers.get(str(question.id))
-            if correct_answer and user_answer == correct_answer.id:
-                correct_answers += 1
-
+        results, correct_answers, total_questions = grade_answers(exam, user_answers)
         score = (correct_answers / total_questions) * 100
+        schedule_exam_results(user.pk, results)
+        log_event('exam.submit', user, exam, score=score)
         return Response({'score': score, 'correct_answers': correct_answers, 'total_questions': total_questions}, status=status.HTTP_200_OK)
+
+
+class ExamSessionStartAPIView(APIView):
+    """
+    API для начала прохождения теста с ограничением времени.
+    Если прохождение уже начато и не завершено, возвращает его с автосохранёнными ответами.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk):
+        user = request.user
+        exam = get_object_or_404(Exam.objects.filter(public_q(user) | Q(owner=user)), pk=pk)
+        session, created = start_session(user, exam)
+        if created:
+            schedule_session_finish(session)
+        data = ExamSessionSerializer(session).data
+        state = load_state(session.pk)
+        data.update(answers=state['answers'], sequence=state['sequence'])
+        log_event('exam.start', user, exam, session=session.pk)
+        return Response(data, status=status.HTTP_201_CREATED)
+
+
+class ExamSessionDetailAPIView(APIView):
+    """
+    API для получения прохождения теста с последними автосохранёнными ответами.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        session = get_object_or_404(ExamSession, pk=pk, user=request.user)
+        data = ExamSessionSerializer(session).data
+        if session.finished_at is None:
+            state = load_state(session.pk)
+            data.update(answers=state['answers'], sequence=state['sequence'])
+        return Response(data)
+
+
+class ExamSessionAutosaveAPIView(APIView):
+    """
+    API для автосохранения ответов во время прохождения теста.
+    Ответы хранятся в кеше и периодически записываются в базу. После срока автосохранение отклоняется.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk):
+        serializer = ExamAutosaveSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            state = autosave(pk, request.user.pk, serializer.validated_data['answers'],
+                             serializer.validated_data.get('sequence'))
+        except SessionNotFound as exc:
+            raise NotFound(str(exc))
+        except SessionError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_409_CONFLICT)
+        return Response({'sequence': state['sequence'], 'deadline': state['deadline']}, status=status.HTTP_200_OK)
+
+
+class ExamSessionFinishAPIView(APIView):
+    """
+    API для завершения прохождения теста. Оценка выставляется по ответам, записанным в базу.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk):
+        user = request.user
+        try:
+            session = finish_session(pk, user_id=user.pk)
+        except SessionNotFound as exc:
+            raise NotFound(str(exc))
+        except SessionError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_409_CONFLICT)
+        log_event('exam.submit', user, object_type='exam', object_id=session.exam_id, score=session.score)
+        return Response({
+            'score': session.score,
+            'correct_answers': session.correct_answers,
+            'total_questions': session.total_questions,
+        }, status=status.HTTP_200_OK)
+
+
+class ReviewQueueAPIView(generics.ListAPIView):
+    """
+    API для получения вопросов, повторение которых наступило, начиная с самых просроченных.
+    Количество задаётся параметром limit (по умолчанию 20, не больше 100).
+    """
+    serializer_class = ReviewItemSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    default_limit = 20
+    max_limit = 100
+
+    def get_queryset(self):
+        # При генерации схемы OpenAPI представление создаётся без запроса
+        if self.request is None:
+            return ReviewItem.objects.none()
+        try:
+            limit = min(int(self.request.query_params.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
+            raise ValidationError({'limit': 'Ожидается целое число.'})
+        answers = Prefetch('question__answers', queryset=Answer.objects.only('id', 'text', 'question_id'))
+        return get_due_items(self.request.user.pk).select_related('question').prefetch_related(answers)[:max(limit, 0)]
+
+
+class ReviewSubmitAPIView(APIView):
+    """
+    API для отправки оценок повторения: список {"question": id, "quality": 0-5}.
+    Расписание пересчитывается для всей пачки сразу. Вопросы не из расписания пользователя пропускаются.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = ReviewGradeSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        grades = {grade['question']: grade['quality'] for grade in serializer.validated_data}
+        updated = schedule_reviews(request.user.pk, grades, add_new=False)
+        return Response({'updated': updated}, status=status.HTTP_200_OK)
@@ -0,0 +1,17 @@
+from django.contrib import admin
+
+from courses.admin import LargeTableAdmin
+from .models import Job, RecurringJob
+
+
+@admin.register(Job)
+class JobAdmin(LargeTableAdmin):
+    list_display = ('id', 'name', 'queue', 'priority', 'status', 'attempts', 'run_at')
+    list_filter = ('status', 'queue')
+    search_fields = ('=id', '^name')
+    readonly_fields = ('created_at', 'locked_by', 'locked_at', 'finished_at')
+
+
+@admin.register(RecurringJob)
+class RecurringJobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'next_run_at')
@@ -0,0 +1,61 @@
+import multiprocessing
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from jobs.scheduler import enqueue_recurring
+from jobs.worker import work
+
+
+def worker_main(queues, stop):
+    # Процесс завершает текущую задачу и выходит по SIGTERM, Ctrl+C обрабатывает родительский процесс
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *args: stop.set())
+    import django
+    django.setup()
+    work(queues, stop=stop)
+
+
+class Command(BaseCommand):
+    help = 'Запускает пул процессов, выполняющих фоновые задачи, и ставит в очередь периодические задачи'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=settings.JOB_WORKER_PROCESSES,
+                            help='Количество процессов-обработчиков')
+        parser.add_argument('--queues', default='', help='Очереди через запятую, по умолчанию все')
+        parser.add_argument('--burst', action='store_true',
+                            help='Выполнить готовые задачи в текущем процессе и завершиться')
+
+    def handle(self, *args, **options):
+        queues = [queue for queue in options['queues'].split(',') if queue]
+        if options['burst']:
+            processed = work(queues, burst=True)
+            self.stdout.write(f'Выполнено задач: {processed}')
+            return
+
+        # Соединения с базой не должны переходить в дочерние процессы
+        connections.close_all()
+        stop = multiprocessing.Event()
+        processes = [
+            multiprocessing.Process(target=worker_main, args=(queues, stop), daemon=True)
+            for _ in range(options['processes'])
+        ]
+        for process in processes:
+            process.start()
+        self.stdout.write(f'Запущено обработчиков: {len(processes)}')
+
+        signal.signal(signal.SIGTERM, lambda *args: stop.set())
+        try:
+            # Пока обработчики работают, родительский процесс ставит в очередь периодические задачи
+            while not stop.is_set() and any(process.is_alive() for process in processes):
+                close_old_connections()
+                enqueue_recurring()
+                stop.wait(settings.JOB_POLL_INTERVAL)
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            stop.set()
+            for process in processes:
+                process.join()
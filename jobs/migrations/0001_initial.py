@@ -0,0 +1,40 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:37
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='задача')),
+                ('kwargs', models.JSONField(blank=True, default=dict, verbose_name='аргументы')),
+                ('queue', models.CharField(default='default', max_length=50, verbose_name='очередь')),
+                ('priority', models.SmallIntegerField(default=0, help_text='Больше - раньше', verbose_name='приоритет')),
+                ('tenant', models.SlugField(blank=True, verbose_name='школа')),
+                ('status', models.CharField(choices=[('queued', 'в очереди'), ('running', 'выполняется'), ('done', 'выполнена'), ('failed', 'завершилась ошибкой')], default='queued', max_length=20, verbose_name='статус')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='попыток')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=3, verbose_name='максимум попыток')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='запустить не раньше')),
+                ('locked_by', models.CharField(blank=True, max_length=100, verbose_name='обработчик')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='взята в работу')),
+                ('last_error', models.TextField(blank=True, verbose_name='последняя ошибка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='создана')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='завершена')),
+            ],
+            options={
+                'verbose_name': 'фоновая задача',
+                'verbose_name_plural': 'фоновые задачи',
+                'indexes': [models.Index(fields=['status', 'queue', 'priority', 'run_at'], name='job_claim_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-19 19:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobQueue',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='очередь')),
+            ],
+            options={
+                'verbose_name': 'очередь задач',
+                'verbose_name_plural': 'очереди задач',
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.14 on 2026-10-19 19:24
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_jobqueue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecurringJob',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False, verbose_name='задача')),
+                ('next_run_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='следующий запуск')),
+            ],
+            options={
+                'verbose_name': 'периодическая задача',
+                'verbose_name_plural': 'периодические задачи',
+            },
+        ),
+    ]
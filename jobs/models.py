@@ -0,0 +1,76 @@
+from django.db import models
+from django.utils import timezone
+
+NULLABLE = {'blank': True, 'null': True}
+
+
+class Job(models.Model):
+    """
+    Фоновая задача. Хранится в базе по умолчанию, выполняется командой run_workers.
+    """
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'в очереди'),
+        (STATUS_RUNNING, 'выполняется'),
+        (STATUS_DONE, 'выполнена'),
+        (STATUS_FAILED, 'завершилась ошибкой'),
+    ]
+
+    name = models.CharField(max_length=100, verbose_name='задача')
+    kwargs = models.JSONField(default=dict, blank=True, verbose_name='аргументы')
+    queue = models.CharField(max_length=50, default='default', verbose_name='очередь')
+    priority = models.SmallIntegerField(default=0, verbose_name='приоритет', help_text='Больше - раньше')
+    tenant = models.SlugField(max_length=50, blank=True, verbose_name='школа')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED, verbose_name='статус')
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='попыток')
+    max_attempts = models.PositiveSmallIntegerField(default=3, verbose_name='максимум попыток')
+    run_at = models.DateTimeField(default=timezone.now, verbose_name='запустить не раньше')
+    locked_by = models.CharField(max_length=100, blank=True, verbose_name='обработчик')
+    locked_at = models.DateTimeField(verbose_name='взята в работу', **NULLABLE)
+    last_error = models.TextField(blank=True, verbose_name='последняя ошибка')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='создана')
+    finished_at = models.DateTimeField(verbose_name='завершена', **NULLABLE)
+
+    def __str__(self):
+        return f'{self.name} ({self.get_status_display()})'
+
+    class Meta:
+        verbose_name = 'фоновая задача'
+        verbose_name_plural = 'фоновые задачи'
+        indexes = [
+            models.Index(fields=['status', 'queue', 'priority', 'run_at'], name='job_claim_idx'),
+        ]
+
+
+class JobQueue(models.Model):
+    """
+    Строка очереди с ограничением числа одновременных задач. Блокируется при захвате задачи
+    из очереди, чтобы проверка ограничения и захват выполнялись атомарно.
+    """
+    name = models.CharField(max_length=50, primary_key=True, verbose_name='очередь')
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        verbose_name = 'очередь задач'
+        verbose_name_plural = 'очереди задач'
+
+
+class RecurringJob(models.Model):
+    """
+    Время следующего запуска периодической задачи из JOB_SCHEDULE. Задачу ставит в очередь
+    тот процесс run_workers, чей условный UPDATE сдвинул время, поэтому запуск не дублируется.
+    """
+    name = models.CharField(max_length=100, primary_key=True, verbose_name='задача')
+    next_run_at = models.DateTimeField(default=timezone.now, verbose_name='следующий запуск')
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        verbose_name = 'периодическая задача'
+        verbose_name_plural = 'периодические задачи'
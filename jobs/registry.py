@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from jobs.models import Job
+from tenants.context import get_current_tenant
+
+_tasks = {}
+
+
+class Task:
+    """
+    Функция, которую можно поставить в очередь. Аргументы задачи передаются по имени
+    и должны сериализоваться в JSON.
+    """
+    def __init__(self, func, name, queue, priority, max_attempts):
+        self.func = func
+        self.name = name
+        self.queue = queue
+        self.priority = priority
+        self.max_attempts = max_attempts
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, kwargs=None, queue=None, priority=None, run_at=None, delay=None, tenant=None):
+        """
+        Ставит задачу в очередь. Время запуска задаётся через run_at или задержку delay в секундах.
+        По умолчанию задача выполняется в текущей школе.
+        """
+        if run_at is None:
+            run_at = timezone.now() + timedelta(seconds=delay or 0)
+        if tenant is None:
+            tenant = get_current_tenant() or ''
+        return Job.objects.create(
+            name=self.name,
+            kwargs=kwargs or {},
+            queue=queue or self.queue,
+            priority=self.priority if priority is None else priority,
+            max_attempts=self.max_attempts,
+            run_at=run_at,
+            tenant=tenant,
+        )
+
+
+def task(name=None, queue='default', priority=0, max_attempts=None):
+    """
+    Декоратор для регистрации фоновой задачи. Имя по умолчанию - '<модуль>.<функция>'.
+    """
+    def decorator(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        _tasks[task_name] = Task(
+            func, task_name, queue, priority, max_attempts or settings.JOB_DEFAULT_MAX_ATTEMPTS
+        )
+        return _tasks[task_name]
+    return decorator
+
+
+def get_task(name):
+    try:
+        return _tasks[name]
+    except KeyError:
+        raise LookupError(f'Задача {name} не зарегистрирована')
+
+
+def enqueue(name, kwargs=None, **options):
+    """
+    Ставит в очередь зарегистрированную задачу по имени.
+    """
+    return get_task(name).enqueue(kwargs, **options)
@@ -0,0 +1,37 @@
+"""
+Постановка периодических задач в очередь по расписанию JOB_SCHEDULE.
+
+Расписание проверяет родительский процесс run_workers. Время следующего запуска хранится
+в RecurringJob и сдвигается условным UPDATE ... WHERE next_run_at <= now: задачу ставит в очередь
+только тот процесс, чей UPDATE изменил строку, поэтому несколько run_workers не дублируют запуски.
+Если предыдущий запуск ещё ждёт в очереди, новый не ставится.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from jobs.models import Job, RecurringJob
+from jobs.registry import get_task
+
+
+def enqueue_recurring(now=None):
+    """
+    Ставит в очередь периодические задачи, время запуска которых наступило.
+    Задачи выполняются без школы: они сами обходят базы всех школ. Возвращает имена поставленных задач.
+    """
+    now = now or timezone.now()
+    enqueued = []
+    for name, interval in settings.JOB_SCHEDULE.items():
+        task = get_task(name)
+        RecurringJob.objects.get_or_create(name=name, defaults={'next_run_at': now})
+        with transaction.atomic():
+            due = RecurringJob.objects.filter(name=name, next_run_at__lte=now).update(
+                next_run_at=now + timedelta(seconds=interval)
+            )
+            if not due or Job.objects.filter(name=name, status=Job.STATUS_QUEUED).exists():
+                continue
+            task.enqueue(tenant='')
+        enqueued.append(name)
+    return enqueued
@@ -0,0 +1,183 @@
+"""
+Выполнение фоновых задач из таблицы Job.
+
+Обработчик забирает задачу с наибольшим приоритетом среди тех, время запуска которых наступило.
+Если база поддерживает SELECT ... FOR UPDATE SKIP LOCKED, строка блокируется, и параллельные
+обработчики пропускают её, не дожидаясь блокировки. Иначе (SQLite) задача захватывается условным
+UPDATE ... WHERE status = 'queued': задачу получает тот обработчик, чей UPDATE изменил строку.
+
+Ограничение числа одновременно выполняемых задач очереди (JOB_QUEUE_CONCURRENCY) проверяется
+в той же транзакции, что и захват: с SKIP LOCKED - под блокировкой строки очереди JobQueue,
+без него - условием в самом UPDATE (SQLite выполняет записи по одной). Задачи, которые выполняются дольше
+JOB_LOCK_TIMEOUT (например, обработчик завершился аварийно), возвращаются в очередь.
+"""
+import logging
+import os
+import socket
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Count, F, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import LessThan
+from django.utils import timezone
+
+from jobs.models import Job, JobQueue
+from jobs.registry import get_task
+from tenants.context import use_tenant
+
+logger = logging.getLogger(__name__)
+
+# Сколько кандидатов перебирать при захвате без SKIP LOCKED
+CLAIM_CANDIDATES = 10
+
+
+def get_worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}'
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=settings.JOB_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def get_full_queues():
+    """
+    Возвращает очереди, в которых уже выполняется максимально допустимое число задач.
+    """
+    limits = settings.JOB_QUEUE_CONCURRENCY
+    if not limits:
+        return []
+    running = (
+        Job.objects.filter(status=Job.STATUS_RUNNING, queue__in=list(limits))
+        .values('queue').annotate(running=Count('pk')).values_list('queue', 'running')
+    )
+    return [queue for queue, count in running if count >= limits[queue]]
+
+
+def _ready_jobs(queues, now, exclude=()):
+    jobs = Job.objects.filter(status=Job.STATUS_QUEUED, run_at__lte=now)
+    if queues:
+        jobs = jobs.filter(queue__in=queues)
+    if exclude:
+        jobs = jobs.exclude(queue__in=exclude)
+    return jobs.order_by('-priority', 'run_at', 'pk')
+
+
+def _running_count(queue):
+    return Job.objects.filter(status=Job.STATUS_RUNNING, queue=queue)
+
+
+def _lock_queue_slot(queue, limit):
+    """
+    Блокирует строку очереди до конца транзакции и проверяет, что в очереди есть свободное место.
+    Параллельный захват из той же очереди ждёт блокировку и видит уже захваченную задачу.
+    """
+    JobQueue.objects.select_for_update().get_or_create(name=queue)
+    return _running_count(queue).count() < limit
+
+
+def claim_job(worker_id, queues=None, now=None):
+    """
+    Захватывает следующую готовую задачу из очередей queues (все очереди, если не указаны).
+    Возвращает задачу в статусе 'выполняется' или None.
+    """
+    now = now or timezone.now()
+    claimed = {'status': Job.STATUS_RUNNING, 'locked_by': worker_id, 'locked_at': now}
+    limits = settings.JOB_QUEUE_CONCURRENCY or {}
+    # Заранее отбрасываем заполненные очереди, окончательная проверка - при захвате
+    full = set(get_full_queues())
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            while True:
+                job = _ready_jobs(queues, now, full).select_for_update(skip_locked=True).first()
+                if job is None:
+                    return None
+                if job.queue not in limits or _lock_queue_slot(job.queue, limits[job.queue]):
+                    break
+                full.add(job.queue)
+            for field, value in claimed.items():
+                setattr(job, field, value)
+            job.attempts += 1
+            job.save(update_fields=[*claimed, 'attempts'])
+            return job
+
+    for pk, queue, attempts in _ready_jobs(queues, now, full).values_list('pk', 'queue', 'attempts')[:CLAIM_CANDIDATES]:
+        candidate = Job.objects.filter(pk=pk, status=Job.STATUS_QUEUED)
+        if queue in limits:
+            running = _running_count(queue).values('queue').annotate(count=Count('pk')).values('count')
+            candidate = candidate.filter(LessThan(Coalesce(Subquery(running), 0), limits[queue]))
+        if candidate.update(attempts=attempts + 1, **claimed):
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def _finish(job, worker_id, **fields):
+    # Задача, возвращённая в очередь по таймауту, могла уже достаться другому обработчику
+    return Job.objects.filter(pk=job.pk, status=Job.STATUS_RUNNING, locked_by=worker_id).update(**fields)
+
+
+def run_job(job, worker_id):
+    """
+    Выполняет захваченную задачу в школе, для которой она поставлена. После ошибки задача
+    возвращается в очередь с экспоненциальной задержкой, пока не исчерпаны попытки.
+    Возвращает True, если задача выполнена.
+    """
+    try:
+        with use_tenant(job.tenant):
+            get_task(job.name)(**job.kwargs)
+    except Exception as exc:
+        logger.exception('Ошибка фоновой задачи %s (%s)', job.pk, job.name)
+        now = timezone.now()
+        error = f'{type(exc).__name__}: {exc}'
+        if job.attempts < job.max_attempts:
+            _finish(job, worker_id, status=Job.STATUS_QUEUED, run_at=now + retry_delay(job.attempts),
+                    locked_by='', locked_at=None, last_error=error)
+        else:
+            _finish(job, worker_id, status=Job.STATUS_FAILED, finished_at=now, last_error=error)
+        return False
+    _finish(job, worker_id, status=Job.STATUS_DONE, finished_at=timezone.now(), last_error='')
+    return True
+
+
+def requeue_stale_jobs(now=None):
+    """
+    Возвращает в очередь задачи, которые выполняются дольше JOB_LOCK_TIMEOUT, или завершает их ошибкой,
+    если попытки исчерпаны. Возвращает количество обработанных задач.
+    """
+    now = now or timezone.now()
+    stale = Job.objects.filter(
+        status=Job.STATUS_RUNNING, locked_at__lt=now - timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+    )
+    error = 'Превышено время выполнения'
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.STATUS_FAILED, finished_at=now, last_error=error
+    )
+    requeued = stale.update(status=Job.STATUS_QUEUED, run_at=now, locked_by='', locked_at=None, last_error=error)
+    return failed + requeued
+
+
+def work(queues=None, burst=False, stop=None, worker_id=None):
+    """
+    Выполняет задачи, пока не установлен stop. В режиме burst завершается, когда готовых задач нет.
+    Возвращает количество выполненных задач.
+    """
+    worker_id = worker_id or get_worker_id()
+    stop = stop or threading.Event()
+    processed = 0
+    while not stop.is_set():
+        if not connection.in_atomic_block:
+            # Как после запроса: закрывает соединения, которые оборвались или пережили CONN_MAX_AGE
+            close_old_connections()
+        job = claim_job(worker_id, queues)
+        if job is None:
+            requeue_stale_jobs()
+            if burst:
+                break
+            stop.wait(settings.JOB_POLL_INTERVAL)
+            continue
+        run_job(job, worker_id)
+        processed += 1
+    return processed
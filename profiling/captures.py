@@ -0,0 +1,110 @@
+"""
+Хранение профилей медленных запросов на диске.
+
+Каждый профиль - пара файлов в PROFILING_ROOT: <id>.json с описанием запроса, SQL-запросами
+и самыми затратными функциями и <id>.prof с полной статистикой cProfile (открывается pstats или snakeviz).
+id начинается с времени в наносекундах, поэтому порядок имён совпадает с порядком записи,
+а после записи удаляются самые старые профили сверх PROFILING_MAX_CAPTURES.
+"""
+import json
+import os
+import pstats
+import re
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+
+CAPTURE_ID_RE = re.compile(r'^\d{20}-[0-9a-f]{8}$')
+
+
+def get_root():
+    return Path(settings.PROFILING_ROOT)
+
+
+def get_capture_path(capture_id, suffix):
+    """
+    Возвращает путь к файлу профиля или None, если id имеет неверный формат.
+    """
+    if not CAPTURE_ID_RE.match(capture_id):
+        return None
+    return get_root() / f'{capture_id}{suffix}'
+
+
+def summarize_stats(profile, limit):
+    """
+    Возвращает limit самых затратных функций профиля по суммарному времени с вложенными вызовами.
+    """
+    stats = pstats.Stats(profile).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {
+            'function': f'{filename}:{line}({name})',
+            'calls': calls,
+            'total_ms': round(total * 1000, 3),
+            'cumulative_ms': round(cumulative * 1000, 3),
+        }
+        for (filename, line, name), (_, calls, total, cumulative, _) in rows
+    ]
+
+
+def _write_atomic(path, write):
+    tmp = path.with_name(f'.{path.name}.tmp')
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def save_capture(info, queries, profile):
+    """
+    Записывает профиль запроса и удаляет самые старые профили сверх ограничения. Возвращает id профиля.
+    Описание записывается последним, поэтому в списке появляются только полностью записанные профили.
+    """
+    root = get_root()
+    root.mkdir(parents=True, exist_ok=True)
+    capture_id = f'{time.time_ns():020d}-{uuid.uuid4().hex[:8]}'
+    data = {
+        'id': capture_id,
+        **info,
+        'queries': queries,
+        'functions': summarize_stats(profile, settings.PROFILING_TOP_FUNCTIONS),
+    }
+    _write_atomic(root / f'{capture_id}.prof', lambda path: profile.dump_stats(path))
+    _write_atomic(root / f'{capture_id}.json', lambda path: path.write_text(json.dumps(data, ensure_ascii=False)))
+    trim_captures()
+    return capture_id
+
+
+def trim_captures(limit=None):
+    """
+    Удаляет самые старые профили, оставляя не больше limit (PROFILING_MAX_CAPTURES).
+    """
+    limit = settings.PROFILING_MAX_CAPTURES if limit is None else limit
+    paths = sorted(get_root().glob('*.json'))
+    for path in paths[:max(len(paths) - limit, 0)]:
+        path.unlink(missing_ok=True)
+        path.with_suffix('.prof').unlink(missing_ok=True)
+
+
+def list_captures():
+    """
+    Возвращает описания профилей без SQL-запросов и функций, начиная с последнего.
+    """
+    captures = []
+    for path in sorted(get_root().glob('*.json'), reverse=True):
+        try:
+            data = json.loads(path.read_text())
+        except FileNotFoundError:
+            # Профиль удалён при ограничении числа профилей другим процессом
+            continue
+        data['queries'] = len(data['queries'])
+        del data['functions']
+        captures.append(data)
+    return captures
+
+
+def load_capture(capture_id):
+    path = get_capture_path(capture_id, '.json')
+    if path is None or not path.exists():
+        return None
+    return json.loads(path.read_text())
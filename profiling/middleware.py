@@ -0,0 +1,85 @@
+import cProfile
+import random
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from profiling.captures import save_capture
+
+# cProfile в Python 3.12+ не допускает двух активных профилировщиков в процессе,
+# поэтому одновременно профилируется не больше одного запроса
+_profiling_lock = threading.Lock()
+
+
+class QueryLog:
+    """
+    Записывает SQL-запросы всех баз данных без параметров, чтобы в профиль не попадали данные пользователей.
+    """
+    def __init__(self, limit):
+        self.limit = limit
+        self.queries = []
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.total += 1
+            if len(self.queries) < self.limit:
+                self.queries.append({
+                    'database': context['connection'].alias,
+                    'sql': sql,
+                    'duration_ms': round((time.perf_counter() - start) * 1000, 3),
+                })
+
+
+class ProfilingMiddleware:
+    """
+    Профилирует долю запросов PROFILING_SAMPLE_RATE через cProfile и сохраняет профиль
+    вместе с SQL-запросами, только если запрос выполнялся дольше PROFILING_SLOW_THRESHOLD секунд.
+    Остальные запросы не замедляются ничем, кроме одного вызова random().
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rate = settings.PROFILING_SAMPLE_RATE
+        if rate <= 0 or random.random() >= rate or not _profiling_lock.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            return self._profile(request)
+        finally:
+            _profiling_lock.release()
+
+    def _profile(self, request):
+        query_log = QueryLog(settings.PROFILING_MAX_QUERIES)
+        profile = cProfile.Profile()
+        started_at = timezone.now()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(query_log))
+            profile.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profile.disable()
+        duration = time.perf_counter() - start
+        if duration >= settings.PROFILING_SLOW_THRESHOLD:
+            match = request.resolver_match
+            save_capture({
+                'started_at': started_at.isoformat(),
+                'method': request.method,
+                'path': request.path,
+                'view': match.view_name if match else None,
+                'status': response.status_code,
+                'duration_ms': round(duration * 1000, 3),
+                'user_id': getattr(getattr(request, 'user', None), 'pk', None),
+                'queries_total': query_log.total,
+            }, query_log.queries, profile)
+        return response
@@ -0,0 +1,84 @@
+import marshal
+import os
+import tempfile
+
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from courses.models import Section
+from profiling.captures import list_captures
+from users.models import User
+
+
+class ProfilingTests(APITestCase):
+
+    def setUp(self):
+        """
+        Настройка тестового окружения: пользователь, сотрудник и временный каталог профилей.
+        """
+        self.user = User.objects.create(email='user@example.com', password='testpass123412')
+        self.staff = User.objects.create(email='staff@example.com', password='staffpass123412', is_staff=True)
+        Section.objects.create(title='Section', owner=self.user)
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+        profiling = override_settings(
+            PROFILING_ROOT=self.root.name, PROFILING_SAMPLE_RATE=1, PROFILING_SLOW_THRESHOLD=0,
+            PROFILING_MAX_CAPTURES=2,
+        )
+        profiling.enable()
+        self.addCleanup(profiling.disable)
+
+    def request_sections(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get('/courses/sections/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_capture_and_ring(self):
+        """
+        Проверяет, что профиль медленного запроса содержит описание запроса и SQL-запросы,
+        а хранятся только последние PROFILING_MAX_CAPTURES профилей.
+        """
+        self.request_sections()
+        capture = list_captures()[0]
+        self.assertEqual((capture['method'], capture['path']), ('GET', '/courses/sections/'))
+        self.assertEqual((capture['view'], capture['status'], capture['user_id']), ('section_list', 200, self.user.pk))
+        self.assertGreater(capture['queries'], 0)
+
+        self.request_sections()
+        self.request_sections()
+        captures = list_captures()
+        self.assertEqual(len(captures), 2)
+        self.assertLess(capture['id'], captures[1]['id'])
+        self.assertEqual(len(os.listdir(self.root.name)), 4)
+
+    def test_sampling_and_threshold(self):
+        """
+        Проверяет, что быстрые и не попавшие в выборку запросы не сохраняются.
+        """
+        with self.settings(PROFILING_SLOW_THRESHOLD=60):
+            self.request_sections()
+        with self.settings(PROFILING_SAMPLE_RATE=0):
+            self.request_sections()
+        self.assertEqual(list_captures(), [])
+
+    def test_endpoints(self):
+        """
+        Проверяет список, профиль и скачивание статистики для персонала и отказ остальным.
+        """
+        self.request_sections()
+        with self.settings(PROFILING_SAMPLE_RATE=0):
+            response = self.client.get('/profiling/captures/')
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+            self.client.force_authenticate(user=self.staff)
+            capture_id = self.client.get('/profiling/captures/').data[0]['id']
+            response = self.client.get(f'/profiling/captures/{capture_id}/')
+            self.assertIn('FROM "courses_section"', ' '.join(query['sql'] for query in response.data['queries']))
+            self.assertTrue(any('views.py' in row['function'] for row in response.data['functions']))
+
+            response = self.client.get(f'/profiling/captures/{capture_id}/download/')
+            self.assertIn(f'{capture_id}.prof', response['Content-Disposition'])
+            self.assertIsInstance(marshal.loads(b''.join(response.streaming_content)), dict)
+            response = self.client.get('/profiling/captures/..%2F..%2Fsettings/download/')
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
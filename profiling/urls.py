@@ -0,0 +1,9 @@
+from django.urls import path
+
+from profiling.views import CaptureListAPIView, CaptureDetailAPIView, CaptureDownloadAPIView
+
+urlpatterns = [
+    path('captures/', CaptureListAPIView.as_view(), name='profiling_captures'),
+    path('captures/<str:capture_id>/', CaptureDetailAPIView.as_view(), name='profiling_capture'),
+    path('captures/<str:capture_id>/download/', CaptureDownloadAPIView.as_view(), name='profiling_capture_download'),
+]
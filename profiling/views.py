@@ -0,0 +1,43 @@
+from django.http import FileResponse
+from rest_framework import permissions
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from profiling.captures import get_capture_path, list_captures, load_capture
+
+
+class CaptureListAPIView(APIView):
+    """
+    API для получения списка профилей медленных запросов, начиная с последнего. Доступно только персоналу.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(list_captures())
+
+
+class CaptureDetailAPIView(APIView):
+    """
+    API для получения профиля запроса: SQL-запросы и самые затратные функции. Доступно только персоналу.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, capture_id):
+        capture = load_capture(capture_id)
+        if capture is None:
+            raise NotFound('Профиль не найден.')
+        return Response(capture)
+
+
+class CaptureDownloadAPIView(APIView):
+    """
+    API для скачивания полной статистики cProfile запроса (pstats). Доступно только персоналу.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, capture_id):
+        path = get_capture_path(capture_id, '.prof')
+        if path is None or not path.exists():
+            raise NotFound('Профиль не найден.')
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=path.name, content_type='application/octet-stream')
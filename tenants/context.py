@@ -0,0 +1,85 @@
+"""
+Текущая школа (арендатор) и выбор базы данных для её строк.
+
+Школа определяется по пользователю текущего запроса или задаётся явно через use_tenant
+в командах, фоновых задачах и тестах. Школа по умолчанию - пустая строка.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+DEFAULT_TENANT = ''
+
+_current_request = ContextVar('tenant_request', default=None)
+_current_tenant = ContextVar('tenant', default=None)
+
+
+def get_user_tenant(user):
+    return getattr(user, 'tenant', DEFAULT_TENANT)
+
+
+def get_current_tenant():
+    """
+    Возвращает школу, заданную через use_tenant, иначе школу пользователя текущего запроса.
+    Вне запроса и для анонимного пользователя возвращает None.
+    """
+    tenant = _current_tenant.get()
+    if tenant is not None:
+        return tenant
+    request = _current_request.get()
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return get_user_tenant(user)
+    return None
+
+
+def get_default_tenant():
+    """
+    Значение поля tenant по умолчанию для новых разделов, материалов и тестов.
+    """
+    tenant = get_current_tenant()
+    return DEFAULT_TENANT if tenant is None else tenant
+
+
+def get_tenant_database(tenant):
+    """
+    Возвращает псевдоним базы данных, в которой хранятся строки школы.
+    """
+    if not tenant:
+        return DEFAULT_DB_ALIAS
+    return settings.TENANT_DATABASES.get(tenant, DEFAULT_DB_ALIAS)
+
+
+def get_tenant_databases():
+    """
+    Возвращает псевдонимы всех баз со строками школ, начиная с базы по умолчанию.
+    """
+    aliases = [DEFAULT_DB_ALIAS]
+    for alias in settings.TENANT_DATABASES.values():
+        if alias not in aliases:
+            aliases.append(alias)
+    return aliases
+
+
+@contextmanager
+def use_tenant(tenant):
+    """
+    Делает школу текущей внутри блока. Запросы к разделам, материалам и тестам
+    без явного using() направляются в базу этой школы.
+    """
+    token = _current_tenant.set(tenant)
+    try:
+        yield
+    finally:
+        _current_tenant.reset(token)
+
+
+@contextmanager
+def bind_request(request):
+    token = _current_request.set(request)
+    try:
+        yield
+    finally:
+        _current_request.reset(token)
@@ -0,0 +1,11 @@
+from django.db.models import Q
+
+from tenants.context import get_user_tenant
+
+
+def public_q(user, prefix=''):
+    """
+    Условие для публичных объектов школы пользователя.
+    prefix - путь до объекта с полями is_public и tenant, например 'exam__'.
+    """
+    return Q(**{f'{prefix}is_public': True, f'{prefix}tenant': get_user_tenant(user)})
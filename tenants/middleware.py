@@ -0,0 +1,15 @@
+from tenants.context import bind_request
+
+
+class TenantMiddleware:
+    """
+    Запоминает текущий запрос, чтобы маршрутизатор баз данных определял школу по его пользователю.
+    Пользователь берётся в момент обращения к базе, поэтому учитывается и аутентификация DRF
+    по JWT, которая выполняется уже в представлении.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with bind_request(request):
+            return self.get_response(request)
@@ -0,0 +1,40 @@
+from django.db import DEFAULT_DB_ALIAS
+
+from tenants.context import get_current_tenant, get_tenant_database
+
+# Приложения, строки которых хранятся в базе своей школы
+PARTITIONED_APPS = {'courses', 'exams', 'webhooks'}
+
+
+def is_partitioned(model):
+    return model._meta.app_label in PARTITIONED_APPS
+
+
+class TenantRouter:
+    """
+    Размещает разделы, материалы, тесты, всё, что от них зависит, и исходящие события в базе школы,
+    а пользователей и остальные модели - в базе по умолчанию.
+
+    База выбирается по объекту из подсказки (по базе, из которой он загружен, или по его школе),
+    иначе по текущей школе из tenants.context. Схема создаётся во всех базах одинаково.
+    """
+    def _db_for_model(self, model, **hints):
+        if not is_partitioned(model):
+            return DEFAULT_DB_ALIAS
+        instance = hints.get('instance')
+        if instance is not None:
+            if is_partitioned(type(instance)) and instance._state.db:
+                return instance._state.db
+            tenant = getattr(instance, 'tenant', None)
+            if tenant is not None:
+                return get_tenant_database(tenant)
+        return get_tenant_database(get_current_tenant())
+
+    db_for_read = _db_for_model
+    db_for_write = _db_for_model
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Ссылки на пользователей хранятся без ограничения внешнего ключа и допустимы из любой базы
+        if not is_partitioned(type(obj1)) or not is_partitioned(type(obj2)):
+            return True
+        return obj1._state.db == obj2._state.db
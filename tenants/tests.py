@@ -0,0 +1,109 @@
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from courses.models import Section, Material, MaterialProgress, SectionPurge
+from courses.progress import progress_buffer
+from courses.purge import purge_deleted_sections
+from exams.models import Exam, Question
+from tenants.context import use_tenant, get_tenant_databases
+from users.models import User
+
+
+@override_settings(
+    TENANT_DATABASES={'school-a': 'tenant_a', 'school-b': 'tenant_b'},
+    PROGRESS_FLUSH_INTERVAL=0,
+)
+class TenantRoutingTestCase(TestCase):
+    databases = {'default', 'tenant_a', 'tenant_b'}
+
+    def setUp(self):
+        """
+        Настройка тестового окружения: пользователи двух школ с отдельными базами
+        и двух школ, которые хранятся в базе по умолчанию.
+        """
+        self.user_a = User.objects.create(email='a@example.com', password='testpass123412', tenant='school-a')
+        self.user_b = User.objects.create(email='b@example.com', password='testpass123412', tenant='school-b')
+        self.user_c = User.objects.create(email='c@example.com', password='testpass123412', tenant='school-c')
+        self.user_default = User.objects.create(email='default@example.com', password='testpass123412')
+        self.client = APIClient()
+
+    def _create_section(self, user, title, is_public=True):
+        with use_tenant(user.tenant):
+            return Section.objects.create(title=title, owner=user, is_public=is_public)
+
+    def test_rows_placed_in_tenant_database(self):
+        """
+        Проверяет, что раздел, материал и тест создаются в базе школы, а владелец читается из базы по умолчанию.
+        """
+        section = self._create_section(self.user_a, 'Раздел A')
+        with use_tenant('school-a'):
+            material = Material.objects.create(section=section, owner=self.user_a, title='Материал', content='Текст')
+            exam = Exam.objects.create(title='Тест', material=material, owner=self.user_a)
+            Question.objects.create(exam=exam, text='Вопрос')
+
+        self.assertEqual((section.tenant, material.tenant, exam.tenant), ('school-a', 'school-a', 'school-a'))
+        self.assertEqual(Section.objects.using('tenant_a').count(), 1)
+        self.assertEqual(Question.objects.using('tenant_a').count(), 1)
+        self.assertFalse(Section.objects.using('default').exists())
+        self.assertFalse(Section.objects.using('tenant_b').exists())
+
+        section = Section.objects.using('tenant_a').get()
+        self.assertEqual(section.owner, self.user_a)
+        self.assertEqual(list(section.materials.values_list('title', flat=True)), ['Материал'])
+        self.assertEqual(get_tenant_databases(), ['default', 'tenant_a', 'tenant_b'])
+
+    def test_api_uses_database_of_user_tenant(self):
+        """
+        Проверяет, что API создаёт и читает разделы в базе школы пользователя.
+        """
+        self.client.force_authenticate(user=self.user_a)
+        response = self.client.post('/courses/sections/create/', {'title': 'Раздел A', 'is_public': True})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Section.objects.using('tenant_a').get().tenant, 'school-a')
+        self._create_section(self.user_b, 'Раздел B')
+
+        response = self.client.get('/courses/sections/')
+        self.assertEqual([section['title'] for section in response.data], ['Раздел A'])
+
+        self.client.force_authenticate(user=self.user_b)
+        response = self.client.get('/courses/sections/')
+        self.assertEqual([section['title'] for section in response.data], ['Раздел B'])
+
+    def test_public_visibility_scoped_to_tenant(self):
+        """
+        Проверяет, что публичные объекты другой школы не видны, даже если школы хранятся в одной базе.
+        """
+        section = self._create_section(self.user_c, 'Раздел C')
+        with use_tenant('school-c'):
+            Material.objects.create(section=section, owner=self.user_c, title='Материал C', content='Текст', is_public=True)
+
+        self.client.force_authenticate(user=self.user_default)
+        self.assertEqual(self.client.get('/courses/sections/').data, [])
+        self.assertEqual(self.client.get('/courses/materials/').data, [])
+        response = self.client.get(f'/courses/sections/{section.id}/dashboard/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=User.objects.create(email='c2@example.com', tenant='school-c'))
+        self.assertEqual(len(self.client.get('/courses/materials/').data), 1)
+
+    def test_progress_and_purge_use_tenant_database(self):
+        """
+        Проверяет, что буфер прогресса и очистка разделов работают с базой школы.
+        """
+        section = self._create_section(self.user_a, 'Раздел A', is_public=False)
+        with use_tenant('school-a'):
+            material = Material.objects.create(section=section, owner=self.user_a, title='Материал', content='Текст')
+        self.client.force_authenticate(user=self.user_a)
+
+        response = self.client.post('/courses/progress/events/', [{'material': material.id, 'event': 'open'}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(progress_buffer.flush(), 1)
+        self.assertEqual(MaterialProgress.objects.using('tenant_a').count(), 1)
+
+        response = self.client.delete(f'/courses/sections/{section.id}/delete/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(SectionPurge.objects.using('tenant_a').count(), 1)
+        self.assertEqual(purge_deleted_sections(), 1)
+        self.assertFalse(Material.all_objects.using('tenant_a').exists())
+        self.assertFalse(Section.all_objects.using('tenant_a').exists())
@@ -0,0 +1,15 @@
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from users.revocation import revocation_list
+
+
+class RevocableJWTAuthentication(JWTAuthentication):
+    """
+    Аутентификация по JWT с проверкой отзыва токена по снимку в памяти (users.revocation).
+    """
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if revocation_list.is_revoked(token):
+            raise InvalidToken('Токен отозван.')
+        return token
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from users.revocation import prune_revocations
+
+
+class Command(BaseCommand):
+    help = 'Удаляет записи об отзыве токенов с истёкшим сроком действия'
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Удалено записей: {prune_revocations()}')
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_alter_user_managers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='tenant',
+            field=models.SlugField(blank=True, default='', verbose_name='школа'),
+        ),
+    ]
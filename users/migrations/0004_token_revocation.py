@@ -0,0 +1,40 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_user_tenant'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserTokenCutoff',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='token_cutoff', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='пользователь')),
+                ('not_before', models.DateTimeField(db_index=True, verbose_name='токены действительны с')),
+            ],
+            options={
+                'verbose_name': 'отзыв токенов пользователя',
+                'verbose_name_plural': 'отзывы токенов пользователей',
+            },
+        ),
+        migrations.CreateModel(
+            name='RevokedToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('jti', models.CharField(max_length=255, unique=True, verbose_name='идентификатор токена')),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='истекает')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='отозван')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revoked_tokens', to=settings.AUTH_USER_MODEL, verbose_name='пользователь')),
+            ],
+            options={
+                'verbose_name': 'отозванный токен',
+                'verbose_name_plural': 'отозванные токены',
+            },
+        ),
+    ]
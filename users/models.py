@@ -34,6 +34,7 @@ class User(AbstractUser):
 
     username = None
     email = models.EmailField(verbose_name='email', unique=True)
+    tenant = models.SlugField(max_length=50, blank=True, default='', verbose_name='школа')
     objects = UserManager()
 
     class Meta:
@@ -41,4 +42,32 @@ class User(AbstractUser):
         verbose_name_plural = 'пользователи'
 
     USERNAME_FIELD = 'email'
-    REQUIRED_FIELDS = []
\ No newline at end of file
+    REQUIRED_FIELDS = []
+
+class RevokedToken(models.Model):
+    """
+    Отозванный JWT-токен. Хранится до истечения срока действия токена,
+    проверка при запросах идёт по фильтру Блума в users.revocation.
+    """
+    jti = models.CharField(max_length=255, unique=True, verbose_name='идентификатор токена')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='revoked_tokens', verbose_name='пользователь')
+    expires_at = models.DateTimeField(db_index=True, verbose_name='истекает')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='отозван')
+
+    class Meta:
+        verbose_name = 'отозванный токен'
+        verbose_name_plural = 'отозванные токены'
+
+
+class UserTokenCutoff(models.Model):
+    """
+    Отзыв всех токенов пользователя: токены, выданные раньше not_before, недействительны.
+    """
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name='token_cutoff', verbose_name='пользователь'
+    )
+    not_before = models.DateTimeField(db_index=True, verbose_name='токены действительны с')
+
+    class Meta:
+        verbose_name = 'отзыв токенов пользователя'
+        verbose_name_plural = 'отзывы токенов пользователей'
@@ -0,0 +1,155 @@
+"""
+Отзыв JWT-токенов без обращения к базе данных при каждом запросе.
+
+Отозвать можно отдельный токен (по jti) или все токены пользователя, выданные до момента отзыва.
+В памяти процесса хранятся фильтр Блума по jti отозванных токенов и словарь
+{id пользователя: время отзыва}, которые раз в TOKEN_REVOCATION_SYNC_INTERVAL секунд
+перестраиваются по базе данных. Проверка токена - несколько хешей и поиск в словаре.
+Только при срабатывании фильтра (токен отозван или ложное срабатывание с вероятностью
+TOKEN_REVOCATION_BLOOM_ERROR_RATE) наличие jti проверяется запросом к базе.
+Отзыв в текущем процессе действует сразу, в остальных - после следующей синхронизации.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from users.models import RevokedToken, UserTokenCutoff
+
+
+class BloomFilter:
+    """
+    Фильтр Блума по строкам. Размер и число хешей рассчитываются по ожидаемому числу элементов
+    и допустимой вероятности ложного срабатывания, позиции получаются двойным хешированием одного blake2b.
+    """
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+def get_max_token_lifetime():
+    return max(jwt_settings.ACCESS_TOKEN_LIFETIME, jwt_settings.REFRESH_TOKEN_LIFETIME)
+
+
+class RevocationList:
+    """
+    Снимок отзывов токенов в памяти процесса. Снимок заменяется целиком одним присваиванием,
+    поэтому проверки в других потоках во время синхронизации видят старый или новый снимок.
+    """
+    timer = time.monotonic
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._cutoffs = {}
+        self._next_sync = 0
+
+    def sync(self):
+        """
+        Перестраивает фильтр и время отзыва по действующим записям базы данных.
+        """
+        now = timezone.now()
+        jtis = list(RevokedToken.objects.filter(expires_at__gt=now).values_list('jti', flat=True))
+        bloom = BloomFilter(
+            max(len(jtis) * 2, settings.TOKEN_REVOCATION_BLOOM_CAPACITY), settings.TOKEN_REVOCATION_BLOOM_ERROR_RATE
+        )
+        for jti in jtis:
+            bloom.add(jti)
+        # В токенах simplejwt id пользователя - строка
+        cutoffs = {
+            str(user_id): not_before.timestamp()
+            for user_id, not_before in UserTokenCutoff.objects.filter(
+                not_before__gt=now - get_max_token_lifetime()
+            ).values_list('user_id', 'not_before')
+        }
+        self._bloom, self._cutoffs = bloom, cutoffs
+        self._next_sync = self.timer() + settings.TOKEN_REVOCATION_SYNC_INTERVAL
+
+    def reset(self):
+        """
+        Сбрасывает снимок: следующая проверка заново прочитает базу данных.
+        """
+        self._next_sync = 0
+
+    def _ensure_synced(self):
+        if self.timer() >= self._next_sync:
+            with self._lock:
+                if self.timer() >= self._next_sync:
+                    self.sync()
+
+    def add_token(self, jti):
+        self._ensure_synced()
+        self._bloom.add(jti)
+
+    def add_cutoff(self, user_id, not_before):
+        self._ensure_synced()
+        self._cutoffs = {**self._cutoffs, str(user_id): not_before.timestamp()}
+
+    def is_revoked(self, token):
+        """
+        Проверяет, отозван ли проверенный токен simplejwt (доступа или обновления).
+        """
+        self._ensure_synced()
+        not_before = self._cutoffs.get(str(token.get(jwt_settings.USER_ID_CLAIM)))
+        # iat хранится с точностью до секунды, поэтому токены, выданные в ту же секунду, что и отзыв,
+        # тоже считаются отозванными
+        if not_before is not None and token.get('iat', 0) < not_before:
+            return True
+        jti = token.get(jwt_settings.JTI_CLAIM)
+        if jti is None or jti not in self._bloom:
+            return False
+        return RevokedToken.objects.filter(jti=jti).exists()
+
+
+revocation_list = RevocationList()
+
+
+def revoke_token(token):
+    """
+    Отзывает один токен simplejwt до истечения его срока действия.
+    """
+    jti = token[jwt_settings.JTI_CLAIM]
+    RevokedToken.objects.get_or_create(jti=jti, defaults={
+        'user_id': token[jwt_settings.USER_ID_CLAIM],
+        'expires_at': datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc),
+    })
+    revocation_list.add_token(jti)
+
+
+def revoke_user_tokens(user_id, now=None):
+    """
+    Отзывает все токены пользователя, выданные до текущего момента.
+    """
+    now = now or timezone.now()
+    UserTokenCutoff.objects.update_or_create(user_id=user_id, defaults={'not_before': now})
+    revocation_list.add_cutoff(user_id, now)
+
+
+def prune_revocations(now=None):
+    """
+    Удаляет записи об отзыве токенов, срок действия которых уже истёк. Возвращает число удалённых строк.
+    """
+    now = now or timezone.now()
+    deleted, _ = RevokedToken.objects.filter(expires_at__lte=now).delete()
+    cutoffs, _ = UserTokenCutoff.objects.filter(not_before__lte=now - get_max_token_lifetime()).delete()
+    return deleted + cutoffs
@@ -1,7 +1,12 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model, authenticate
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from users.revocation import revocation_list
+
 User = get_user_model()
 
 class UserSerializer(serializers.ModelSerializer):
@@ -29,4 +34,30 @@ class LoginSerializer(serializers.Serializer):
         user = authenticate(email=data.get('email'), password=data.get('password'))
         if user and user.is_active:
             return user
-        raise serializers.ValidationError("Invalid credentials")
\ No newline at end of file
+        raise serializers.ValidationError("Invalid credentials")
+
+
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Обновление токена доступа, отклоняющее отозванные токены обновления.
+    """
+    def validate(self, attrs):
+        if revocation_list.is_revoked(self.token_class(attrs['refresh'])):
+            raise InvalidToken('Токен отозван.')
+        return super().validate(attrs)
+
+
+class TokenRevokeSerializer(serializers.Serializer):
+    """
+    Отзыв текущего токена доступа и, если передан, токена обновления того же пользователя.
+    """
+    refresh = serializers.CharField(required=False)
+
+    def validate_refresh(self, value):
+        try:
+            refresh = RefreshToken(value)
+        except TokenError as exc:
+            raise serializers.ValidationError(str(exc))
+        if str(refresh.get(jwt_settings.USER_ID_CLAIM)) != str(self.context['request'].user.pk):
+            raise serializers.ValidationError('Токен выдан другому пользователю.')
+        return refresh
@@ -0,0 +1,10 @@
+from jobs.registry import task
+from users.revocation import prune_revocations
+
+
+@task(name='users.prune_revoked_tokens', queue='default')
+def prune_revoked_tokens():
+    """
+    Удаляет записи об отзыве токенов с истёкшим сроком действия.
+    """
+    prune_revocations()
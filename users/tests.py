@@ -0,0 +1,129 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.models import User, RevokedToken
+from users.revocation import BloomFilter, revocation_list
+
+
+class UserThrottleTests(APITestCase):
+
+    def setUp(self):
+        """
+        Настройка тестового окружения: очистка кеша со счётчиками и создание пользователя.
+        """
+        cache.clear()
+        # Фиксируем время, чтобы тест не попадал на границу окна
+        patcher = mock.patch('courses.throttling.SlidingWindowRateThrottle.timer', return_value=1000.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user(email='testuser@example.com', password='testpass123412')
+
+    def test_token_throttled_before_password_check(self):
+        """
+        Проверяет, что после исчерпания лимита получения токена запрос отклоняется со статусом 429
+        до обращения к базе данных и проверки пароля.
+        """
+        data = {'email': 'testuser@example.com', 'password': 'wrongpass'}
+        for _ in range(10):
+            response = self.client.post('/users/token/', data)
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        with self.assertNumQueries(0):
+            response = self.client.post('/users/token/', data)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_register_throttled_per_ip(self):
+        """
+        Проверяет ограничение регистрации по IP-адресу: другой адрес продолжает проходить.
+        """
+        for i in range(5):
+            response = self.client.post('/users/create/', {'email': f'user{i}@example.com', 'password': 'pass123412'})
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.post('/users/create/', {'email': 'user5@example.com', 'password': 'pass123412'})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        response = self.client.post('/users/create/', {'email': 'user5@example.com', 'password': 'pass123412'},
+                                    REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+
+class TokenRevocationTests(APITestCase):
+
+    def setUp(self):
+        """
+        Настройка тестового окружения: пользователи с токенами и сброс снимка отзывов.
+        """
+        revocation_list.reset()
+        self.addCleanup(revocation_list.reset)
+        self.user = User.objects.create_user(email='testuser@example.com', password='testpass123412')
+        self.other_user = User.objects.create_user(email='other@example.com', password='otherpass123412')
+        self.refresh = RefreshToken.for_user(self.user)
+
+    def get(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return self.client.get('/users/user_list/')
+
+    def test_bloom_filter(self):
+        """
+        Проверяет, что добавленные ключи всегда находятся, а доля ложных срабатываний близка к заданной.
+        """
+        bloom = BloomFilter(1000, 0.01)
+        for i in range(1000):
+            bloom.add(f'jti-{i}')
+        self.assertTrue(all(f'jti-{i}' in bloom for i in range(1000)))
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_revoke_token(self):
+        """
+        Проверяет выход: отозванные токены доступа и обновления отклоняются, другие токены действуют,
+        а проверка действующего токена не обращается к таблице отзывов.
+        """
+        access = self.refresh.access_token
+        other_access = RefreshToken.for_user(self.user).access_token
+        self.assertEqual(self.get(access).status_code, status.HTTP_200_OK)
+
+        response = self.client.post('/users/token/revoke/', {'refresh': str(self.refresh)})
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(RevokedToken.objects.count(), 2)
+        self.assertEqual(self.get(access).status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.post('/users/token/refresh/', {'refresh': str(self.refresh)})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        # Запросы: пользователь и список пользователей
+        with self.assertNumQueries(2):
+            self.assertEqual(self.get(other_access).status_code, status.HTTP_200_OK)
+
+        # После синхронизации отзыв читается из базы, как в другом процессе
+        revocation_list.reset()
+        self.assertEqual(self.get(access).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revoke_user_tokens(self):
+        """
+        Проверяет отзыв всех токенов пользователя: старые токены отклоняются, новые действуют,
+        отзывать токены другого пользователя может только персонал.
+        """
+        now = self.refresh.current_time
+        with mock.patch('rest_framework_simplejwt.tokens.aware_utcnow', return_value=now - timedelta(seconds=10)):
+            refresh = RefreshToken.for_user(self.user)
+            access = refresh.access_token
+        other_access = RefreshToken.for_user(self.other_user).access_token
+        response = self.client.post(f'/users/{self.user.pk}/revoke_tokens/', HTTP_AUTHORIZATION=f'Bearer {other_access}')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        with mock.patch('users.revocation.timezone.now', return_value=now - timedelta(seconds=5)):
+            response = self.client.post(f'/users/{self.user.pk}/revoke_tokens/', HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.get(access).status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.post('/users/token/refresh/', {'refresh': str(refresh)})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.get(other_access).status_code, status.HTTP_200_OK)
+
+        revocation_list.reset()
+        self.assertEqual(self.get(access).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.get(self.refresh.access_token).status_code, status.HTTP_200_OK)
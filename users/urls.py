@@ -1,7 +1,7 @@
 from django.urls import path
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from rest_framework_simplejwt.views import TokenRefreshView
 from users.views import UsersListAPIView, UserCreateAPIView, UserRetrieveAPIView, UserUpdateAPIView, \
-    UserDestroyAPIView
+    UserDestroyAPIView, UserTokenObtainPairView, TokenRevokeAPIView, UserTokensRevokeAPIView
 
 urlpatterns = [
     path('user_list/', UsersListAPIView.as_view(), name='user_list'),
@@ -9,7 +9,9 @@ urlpatterns = [
     path('<int:pk>/', UserRetrieveAPIView.as_view(), name='user_detail'),
     path('<int:pk>/update/', UserUpdateAPIView.as_view(), name='user_update'),
     path('<int:pk>/delete/', UserDestroyAPIView.as_view(), name='user_delete'),
-    path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('<int:pk>/revoke_tokens/', UserTokensRevokeAPIView.as_view(), name='user_revoke_tokens'),
+    path('token/', UserTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('token/revoke/', TokenRevokeAPIView.as_view(), name='token_revoke'),
 
 ]
\ No newline at end of file
@@ -2,12 +2,15 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import OrderingFilter
 from rest_framework.generics import CreateAPIView, RetrieveAPIView, UpdateAPIView, DestroyAPIView
 from rest_framework.permissions import IsAuthenticated
-from rest_framework import generics, permissions
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenObtainPairView
-from .serializers import UserSerializer, LoginSerializer
+from .serializers import UserSerializer, LoginSerializer, TokenRevokeSerializer
 from rest_framework_simplejwt.tokens import RefreshToken
 from users.models import User
+from courses.throttling import ThrottleFirstMixin, IPRateThrottle
+from users.revocation import revoke_token, revoke_user_tokens
 
 
 class UsersListAPIView(generics.ListAPIView):
@@ -17,8 +20,15 @@ class UsersListAPIView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
 
 
-class UserCreateAPIView(CreateAPIView):
+class UserCreateAPIView(ThrottleFirstMixin, CreateAPIView):
     serializer_class = UserSerializer
+    throttle_classes = [IPRateThrottle]
+    throttle_scope = 'register'
+
+
+class UserTokenObtainPairView(ThrottleFirstMixin, TokenObtainPairView):
+    throttle_classes = [IPRateThrottle]
+    throttle_scope = 'token'
 
 
 class UserRetrieveAPIView(RetrieveAPIView):
@@ -36,3 +46,35 @@ class UserUpdateAPIView(UpdateAPIView):
 class UserDestroyAPIView(DestroyAPIView):
     queryset = User.objects.all()
     permission_classes = [IsAuthenticated]
+
+
+class TokenRevokeAPIView(generics.GenericAPIView):
+    """
+    Выход: отзывает токен доступа текущего запроса и переданный токен обновления.
+    """
+    serializer_class = TokenRevokeSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        revoke_token(request.auth)
+        if 'refresh' in serializer.validated_data:
+            revoke_token(serializer.validated_data['refresh'])
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UserTokensRevokeAPIView(generics.GenericAPIView):
+    """
+    Отзывает все выданные ранее токены пользователя. Доступно самому пользователю и персоналу.
+    """
+    queryset = User.objects.all()
+    serializer_class = UserSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        user = self.get_object()
+        if user.pk != request.user.pk and not request.user.is_staff:
+            raise PermissionDenied('Нет прав отзывать токены этого пользователя.')
+        revoke_user_tokens(user.pk)
+        return Response(status=status.HTTP_204_NO_CONTENT)
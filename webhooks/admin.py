@@ -0,0 +1,20 @@
+from django.contrib import admin
+
+from courses.admin import LargeTableAdmin
+from .models import WebhookEndpoint, OutboxMessage
+
+
+@admin.register(WebhookEndpoint)
+class WebhookEndpointAdmin(admin.ModelAdmin):
+    list_display = ('id', 'url', 'tenant', 'is_active')
+    list_filter = ('is_active',)
+    search_fields = ('url', '=tenant')
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(LargeTableAdmin):
+    list_display = ('id', 'event', 'endpoint', 'status', 'attempts', 'next_attempt_at')
+    list_filter = ('status',)
+    list_select_related = ('endpoint',)
+    search_fields = ('=id', '^event')
+    readonly_fields = ('created_at', 'delivered_at')
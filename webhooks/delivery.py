@@ -0,0 +1,235 @@
+"""
+Доставка исходящих событий на адреса интеграторов.
+
+Воркер блокирует с SKIP LOCKED до WEBHOOK_WORKERS адресов, у которых самое старое ожидающее
+сообщение готово к отправке, забирает у каждого по одной пачке из WEBHOOK_BATCH_SIZE первых
+по порядку записи сообщений и продлевает им next_attempt_at на время одного запроса,
+чтобы другие воркеры их не взяли. Пачки разных адресов отправляются параллельно POST-запросами
+в WEBHOOK_WORKERS потоках через пул постоянных HTTP-соединений, статусы записываются в основном потоке.
+Неудачная пачка повторяется с экспоненциальной задержкой и до тех пор задерживает более новые
+сообщения своего адреса, поэтому события одного адреса приходят в порядке записи.
+После WEBHOOK_MAX_ATTEMPTS попыток сообщение помечается как недоставленное.
+"""
+import hashlib
+import hmac
+import http.client
+import json
+import queue
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction, DEFAULT_DB_ALIAS
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from webhooks.models import OutboxMessage, WebhookEndpoint
+
+SIGNATURE_HEADER = 'X-Webhook-Signature'
+
+
+class DeliveryError(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    Пул постоянных HTTP-соединений: не больше max_size свободных соединений на каждый хост.
+    """
+    def __init__(self, max_size=None, timeout=None):
+        self.max_size = max_size or settings.WEBHOOK_WORKERS
+        self.timeout = timeout or settings.WEBHOOK_TIMEOUT
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _get_queue(self, key):
+        with self._lock:
+            return self._idle.setdefault(key, queue.LifoQueue(self.max_size))
+
+    def acquire(self, scheme, netloc):
+        try:
+            return self._get_queue((scheme, netloc)).get_nowait()
+        except queue.Empty:
+            connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+            return connection_class(netloc, timeout=self.timeout)
+
+    def release(self, scheme, netloc, connection):
+        try:
+            self._get_queue((scheme, netloc)).put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def post(self, url, body, headers):
+        """
+        Отправляет POST-запрос и возвращает код ответа. Соединение, оборванное сервером,
+        открывается заново один раз.
+        """
+        parts = urlsplit(url)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        for retry in (False, True):
+            connection = self.acquire(parts.scheme, parts.netloc)
+            try:
+                connection.request('POST', path, body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                connection.close()
+                if retry:
+                    raise
+                continue
+            except Exception:
+                connection.close()
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                self.release(parts.scheme, parts.netloc, connection)
+            return response.status
+
+    def close(self):
+        with self._lock:
+            queues, self._idle = list(self._idle.values()), {}
+        for idle in queues:
+            while not idle.empty():
+                idle.get_nowait().close()
+
+
+def sign(secret, body):
+    return 'sha256=' + hmac.new(secret.encode('utf-8'), body, hashlib.sha256).hexdigest()
+
+
+def build_body(messages):
+    return json.dumps({
+        'events': [
+            {'id': message.pk, 'event': message.event, 'payload': message.payload,
+             'created_at': message.created_at}
+            for message in messages
+        ]
+    }, cls=DjangoJSONEncoder, ensure_ascii=False).encode('utf-8')
+
+
+def retry_delay(attempts):
+    """
+    Задержка перед следующей попыткой: экспонента от числа попыток со случайным разбросом до половины.
+    """
+    delay = min(settings.WEBHOOK_RETRY_MAX_DELAY, settings.WEBHOOK_RETRY_BASE_DELAY * 2 ** (attempts - 1))
+    return timedelta(seconds=delay * random.uniform(0.5, 1))
+
+
+def claim_batch(using=DEFAULT_DB_ALIAS, limit=None, now=None):
+    """
+    Забирает по одной пачке сообщений не больше чем у limit адресов и откладывает их next_attempt_at
+    на время отправки. Адрес пропускается, пока его самое старое ожидающее сообщение не готово
+    к отправке: ждёт повтора после ошибки или уже отправляется другим воркером.
+    Возвращает списки сообщений по адресам.
+    """
+    now = now or timezone.now()
+    limit = limit or settings.WEBHOOK_WORKERS
+    pending = OutboxMessage.objects.using(using).filter(status=OutboxMessage.STATUS_PENDING)
+    head = pending.filter(endpoint_id=OuterRef('pk')).order_by('pk').values('next_attempt_at')[:1]
+    with transaction.atomic(using=using):
+        endpoints = list(
+            WebhookEndpoint.objects.using(using).select_for_update(skip_locked=True)
+            .annotate(head_attempt_at=Subquery(head))
+            .filter(head_attempt_at__lte=now)
+            .order_by('head_attempt_at', 'pk')[:limit]
+        )
+        chunks = []
+        for endpoint in endpoints:
+            chunk = []
+            for message in pending.filter(endpoint=endpoint).order_by('pk')[:settings.WEBHOOK_BATCH_SIZE]:
+                if message.next_attempt_at > now:
+                    break
+                message.endpoint = endpoint
+                chunk.append(message)
+            if chunk:
+                chunks.append(chunk)
+        # Каждая пачка отправляется одним запросом, который ConnectionPool.post может повторить один раз
+        lease = now + timedelta(seconds=settings.WEBHOOK_TIMEOUT * 2)
+        OutboxMessage.objects.using(using).filter(
+            pk__in=[message.pk for chunk in chunks for message in chunk]
+        ).update(next_attempt_at=lease)
+    return chunks
+
+
+def _send(pool, endpoint, messages):
+    body = build_body(messages)
+    headers = {'Content-Type': 'application/json; charset=utf-8'}
+    if endpoint.secret:
+        headers[SIGNATURE_HEADER] = sign(endpoint.secret, body)
+    status_code = pool.post(endpoint.url, body, headers)
+    if not 200 <= status_code < 300:
+        raise DeliveryError(f'HTTP {status_code}')
+
+
+def _send_chunk(pool, chunk):
+    """
+    Отправляет пачку сообщений одного адреса. Возвращает текст ошибки или пустую строку.
+    """
+    try:
+        _send(pool, chunk[0].endpoint, chunk)
+    except Exception as exc:
+        return f'{type(exc).__name__}: {exc}' if str(exc) else type(exc).__name__
+    return ''
+
+
+def deliver_batch(using=DEFAULT_DB_ALIAS, pool=None, now=None):
+    """
+    Отправляет по одной пачке сообщений каждого забранного адреса из базы using.
+    Возвращает пару (доставлено, не доставлено).
+    """
+    chunks = claim_batch(using, now=now)
+    if not chunks:
+        return 0, 0
+    own_pool = pool is None
+    pool = pool or ConnectionPool()
+    try:
+        with ThreadPoolExecutor(max_workers=settings.WEBHOOK_WORKERS) as executor:
+            errors = list(executor.map(lambda chunk: _send_chunk(pool, chunk), chunks))
+    finally:
+        if own_pool:
+            pool.close()
+
+    now = timezone.now()
+    delivered, failed = [], []
+    for chunk, error in zip(chunks, errors):
+        # Вся пачка откладывается на одно время, чтобы повтор отправил её целиком и в прежнем порядке
+        next_attempt_at = now + retry_delay(max(message.attempts for message in chunk) + 1)
+        for message in chunk:
+            message.attempts += 1
+            if not error:
+                message.status = OutboxMessage.STATUS_DELIVERED
+                message.delivered_at = now
+                message.last_error = ''
+                delivered.append(message)
+                continue
+            message.last_error = error
+            if message.attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+                message.status = OutboxMessage.STATUS_FAILED
+            else:
+                message.next_attempt_at = next_attempt_at
+            failed.append(message)
+    OutboxMessage.objects.using(using).bulk_update(
+        delivered + failed, ['status', 'attempts', 'next_attempt_at', 'delivered_at', 'last_error']
+    )
+    return len(delivered), len(failed)
+
+
+def deliver_pending(using=DEFAULT_DB_ALIAS, pool=None):
+    """
+    Отправляет все готовые к отправке сообщения базы using пачками, пока они не закончатся.
+    Возвращает пару (доставлено, не доставлено).
+    """
+    total_delivered = total_failed = 0
+    while True:
+        delivered, failed = deliver_batch(using, pool=pool)
+        if not delivered and not failed:
+            return total_delivered, total_failed
+        total_delivered += delivered
+        total_failed += failed
@@ -0,0 +1,30 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tenants.context import get_tenant_databases
+from webhooks.delivery import ConnectionPool, deliver_pending
+
+
+class Command(BaseCommand):
+    help = 'Отправляет исходящие события на адреса интеграторов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Отправить накопившиеся события и завершиться')
+        parser.add_argument('--interval', type=float, default=settings.WEBHOOK_POLL_INTERVAL,
+                            help='Пауза между проверками новых событий в секундах')
+
+    def handle(self, *args, **options):
+        pool = ConnectionPool()
+        try:
+            while True:
+                for using in get_tenant_databases():
+                    delivered, failed = deliver_pending(using, pool=pool)
+                    if delivered or failed or options['once']:
+                        self.stdout.write(f'{using}: доставлено {delivered}, ошибок {failed}')
+                if options['once']:
+                    return
+                time.sleep(options['interval'])
+        finally:
+            pool.close()
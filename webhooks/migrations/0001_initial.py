@@ -0,0 +1,53 @@
+# Generated by Django 5.0.14 on 2026-10-19 18:34
+
+import django.db.models.deletion
+import django.utils.timezone
+import tenants.context
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookEndpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(verbose_name='адрес')),
+                ('secret', models.CharField(blank=True, max_length=100, verbose_name='ключ подписи')),
+                ('events', models.JSONField(blank=True, default=list, help_text='Список событий, например ["section.published"]. Пустой список - все события.', verbose_name='события')),
+                ('is_active', models.BooleanField(default=True, verbose_name='активен')),
+                ('tenant', models.SlugField(blank=True, default=tenants.context.get_default_tenant, verbose_name='школа')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='создан')),
+            ],
+            options={
+                'verbose_name': 'адрес для уведомлений',
+                'verbose_name_plural': 'адреса для уведомлений',
+            },
+        ),
+        migrations.CreateModel(
+            name='OutboxMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.CharField(max_length=50, verbose_name='событие')),
+                ('payload', models.JSONField(verbose_name='данные')),
+                ('status', models.CharField(choices=[('pending', 'ожидает отправки'), ('delivered', 'доставлено'), ('failed', 'не доставлено')], default='pending', max_length=20, verbose_name='статус')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='попыток')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='следующая попытка')),
+                ('last_error', models.TextField(blank=True, verbose_name='последняя ошибка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='создано')),
+                ('delivered_at', models.DateTimeField(blank=True, null=True, verbose_name='доставлено')),
+                ('endpoint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='messages', to='webhooks.webhookendpoint', verbose_name='адрес')),
+            ],
+            options={
+                'verbose_name': 'исходящее событие',
+                'verbose_name_plural': 'исходящие события',
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='outbox_pending_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import router, transaction
+
+from webhooks.outbox import enqueue_event
+
+
+class OutboxUpdateMixin:
+    """
+    Записывает событие '<модель>.published', '<модель>.unpublished' или '<модель>.updated'
+    в исходящие события в той же транзакции, что и изменение объекта.
+    """
+    def get_object(self):
+        obj = super().get_object()
+        self._outbox_object = obj
+        self._outbox_was_public = obj.is_public
+        return obj
+
+    def update(self, request, *args, **kwargs):
+        model = self.get_queryset().model
+        using = router.db_for_write(model)
+        with transaction.atomic(using=using):
+            response = super().update(request, *args, **kwargs)
+            instance = self._outbox_object
+            if instance.is_public == self._outbox_was_public:
+                action = 'updated'
+            else:
+                action = 'published' if instance.is_public else 'unpublished'
+            enqueue_event(f'{model._meta.model_name}.{action}', instance, using=using)
+        return response
@@ -0,0 +1,65 @@
+from django.db import models
+from django.utils import timezone
+
+from tenants.context import get_default_tenant
+
+NULLABLE = {'blank': True, 'null': True}
+
+
+class WebhookEndpoint(models.Model):
+    """
+    Адрес интегратора, на который отправляются события публикации и изменения
+    разделов, материалов и тестов своей школы.
+    """
+    url = models.URLField(verbose_name='адрес')
+    secret = models.CharField(max_length=100, blank=True, verbose_name='ключ подписи')
+    events = models.JSONField(default=list, blank=True, verbose_name='события',
+                              help_text='Список событий, например ["section.published"]. Пустой список - все события.')
+    is_active = models.BooleanField(default=True, verbose_name='активен')
+    tenant = models.SlugField(max_length=50, blank=True, default=get_default_tenant, verbose_name='школа')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='создан')
+
+    def __str__(self):
+        return self.url
+
+    def accepts(self, event):
+        return not self.events or event in self.events
+
+    class Meta:
+        verbose_name = 'адрес для уведомлений'
+        verbose_name_plural = 'адреса для уведомлений'
+
+
+class OutboxMessage(models.Model):
+    """
+    Событие для отправки на адрес интегратора. Записывается в одной транзакции с изменением объекта
+    и отправляется позже командой deliver_webhooks.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_DELIVERED = 'delivered'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'ожидает отправки'),
+        (STATUS_DELIVERED, 'доставлено'),
+        (STATUS_FAILED, 'не доставлено'),
+    ]
+
+    endpoint = models.ForeignKey(WebhookEndpoint, on_delete=models.CASCADE, related_name='messages', verbose_name='адрес')
+    event = models.CharField(max_length=50, verbose_name='событие')
+    payload = models.JSONField(verbose_name='данные')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name='статус')
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='попыток')
+    next_attempt_at = models.DateTimeField(default=timezone.now, verbose_name='следующая попытка')
+    last_error = models.TextField(blank=True, verbose_name='последняя ошибка')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='создано')
+    delivered_at = models.DateTimeField(verbose_name='доставлено', **NULLABLE)
+
+    def __str__(self):
+        return f'{self.event} -> {self.endpoint_id}: {self.get_status_display()}'
+
+    class Meta:
+        verbose_name = 'исходящее событие'
+        verbose_name_plural = 'исходящие события'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_pending_idx'),
+        ]
@@ -0,0 +1,31 @@
+from django.db import router
+from django.utils import timezone
+
+from webhooks.models import WebhookEndpoint, OutboxMessage
+
+
+def build_payload(instance):
+    return {
+        'object_type': instance._meta.model_name,
+        'id': instance.pk,
+        'title': instance.title,
+        'is_public': instance.is_public,
+        'occurred_at': timezone.now().isoformat(),
+    }
+
+
+def enqueue_event(event, instance, using=None):
+    """
+    Записывает событие об объекте для всех активных адресов его школы, подписанных на событие.
+    Вызывается внутри транзакции изменения объекта, поэтому событие сохраняется тогда и только тогда,
+    когда сохраняется изменение. Возвращает количество записанных сообщений.
+    """
+    using = using or router.db_for_write(type(instance), instance=instance)
+    endpoints = WebhookEndpoint.objects.using(using).filter(is_active=True, tenant=instance.tenant)
+    payload = build_payload(instance)
+    messages = [
+        OutboxMessage(endpoint=endpoint, event=event, payload=payload)
+        for endpoint in endpoints if endpoint.accepts(event)
+    ]
+    OutboxMessage.objects.using(using).bulk_create(messages)
+    return len(messages)
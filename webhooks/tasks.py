@@ -0,0 +1,16 @@
+from jobs.registry import task
+from tenants.context import get_tenant_databases
+from webhooks.delivery import ConnectionPool, deliver_pending
+
+
+@task(name='webhooks.deliver', queue='webhooks')
+def deliver():
+    """
+    Отправляет накопившиеся исходящие события всех баз школ.
+    """
+    pool = ConnectionPool()
+    try:
+        for using in get_tenant_databases():
+            deliver_pending(using, pool=pool)
+    finally:
+        pool.close()
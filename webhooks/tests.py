@@ -0,0 +1,202 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from courses.models import Section, Material
+from exams.models import Exam
+from users.models import User
+from webhooks.delivery import ConnectionPool, SIGNATURE_HEADER, claim_batch, deliver_batch, deliver_pending, sign
+from webhooks.models import WebhookEndpoint, OutboxMessage
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        server = self.server
+        with server.lock:
+            server.received.append((self.path, dict(self.headers), body))
+            code = server.responses.pop(0) if server.responses else 200
+        self.send_response(code)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    Локальный HTTP-сервер, который записывает полученные запросы и отвечает кодами из responses.
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StandInHandler)
+        self.lock = threading.Lock()
+        self.received = []
+        self.responses = []
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}/hook'
+
+    def events(self):
+        return [event for _, _, body in self.received for event in json.loads(body)['events']]
+
+
+@override_settings(WEBHOOK_BATCH_SIZE=2, WEBHOOK_WORKERS=2, WEBHOOK_TIMEOUT=5, WEBHOOK_MAX_ATTEMPTS=2)
+class WebhookTestCase(TestCase):
+    def setUp(self):
+        """
+        Настройка тестового окружения: локальный сервер интегратора, адрес для уведомлений,
+        пользователь с разделом, материалом и тестом.
+        """
+        self.server = StandInServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.endpoint = WebhookEndpoint.objects.create(url=self.server.url, secret='s3cret')
+        self.user = User.objects.create(email='testuser@example.com', password='testpass123412')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.section = Section.objects.create(title='Раздел', owner=self.user)
+        self.material = Material.objects.create(section=self.section, owner=self.user, title='Материал', content='Текст')
+        self.exam = Exam.objects.create(title='Тест', material=self.material, owner=self.user)
+
+    def test_update_writes_outbox_message(self):
+        """
+        Проверяет, что изменение раздела, материала и теста через API записывает события с видом изменения.
+        """
+        self.client.patch(f'/courses/sections/{self.section.id}/update/', {'is_public': True}, format='json')
+        self.client.patch(f'/courses/sections/{self.section.id}/update/', {'title': 'Новый'}, format='json')
+        self.client.put(f'/courses/materials/{self.material.id}/update/', {
+            'section': self.section.id, 'title': 'Материал 2', 'content': 'Текст',
+        }, format='json')
+        self.client.patch(f'/exams/{self.exam.id}/update/', {'is_public': True}, format='json')
+        self.client.patch(f'/exams/{self.exam.id}/update/', {'is_public': False}, format='json')
+
+        messages = OutboxMessage.objects.order_by('pk')
+        self.assertEqual(list(messages.values_list('event', flat=True)), [
+            'section.published', 'section.updated', 'material.updated', 'exam.published', 'exam.unpublished',
+        ])
+        self.assertEqual(messages[1].payload['title'], 'Новый')
+        self.assertEqual(messages[1].payload['id'], self.section.id)
+
+    def test_outbox_written_in_same_transaction(self):
+        """
+        Проверяет, что при ошибке записи события изменение объекта откатывается,
+        а отказ в доступе не записывает событие.
+        """
+        with mock.patch('webhooks.mixins.enqueue_event', side_effect=RuntimeError('outbox')):
+            with self.assertRaises(RuntimeError):
+                self.client.patch(f'/courses/sections/{self.section.id}/update/', {'title': 'Новый'}, format='json')
+        self.section.refresh_from_db()
+        self.assertEqual(self.section.title, 'Раздел')
+
+        self.client.force_authenticate(user=User.objects.create(email='other@example.com'))
+        response = self.client.patch(f'/courses/sections/{self.section.id}/update/', {'title': 'Чужой'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    def test_endpoint_filters_events_and_tenant(self):
+        """
+        Проверяет, что события получают только активные адреса своей школы, подписанные на событие.
+        """
+        WebhookEndpoint.objects.create(url=self.server.url, events=['exam.published'])
+        WebhookEndpoint.objects.create(url=self.server.url, is_active=False)
+        WebhookEndpoint.objects.create(url=self.server.url, tenant='school-b')
+        self.client.patch(f'/courses/sections/{self.section.id}/update/', {'is_public': True}, format='json')
+        self.assertEqual(list(OutboxMessage.objects.values_list('endpoint', flat=True)), [self.endpoint.id])
+
+    def test_delivery_batches_and_signs(self):
+        """
+        Проверяет, что сообщения одного адреса отправляются пачками по WEBHOOK_BATCH_SIZE с подписью HMAC.
+        """
+        for title in ('Один', 'Два', 'Три'):
+            self.client.patch(f'/courses/sections/{self.section.id}/update/', {'title': title}, format='json')
+
+        self.assertEqual(deliver_pending(), (3, 0))
+        self.assertEqual(len(self.server.received), 2)
+        for path, headers, body in self.server.received:
+            self.assertEqual(path, '/hook')
+            self.assertEqual(headers[SIGNATURE_HEADER], sign('s3cret', body))
+        self.assertEqual([event['payload']['title'] for event in self.server.events()], ['Один', 'Два', 'Три'])
+        self.assertEqual(OutboxMessage.objects.filter(status=OutboxMessage.STATUS_DELIVERED).count(), 3)
+        self.assertEqual(deliver_pending(), (0, 0))
+
+    def test_delivery_retries_with_backoff(self):
+        """
+        Проверяет, что после ошибки сервера сообщение откладывается, доставляется следующей попыткой,
+        а после WEBHOOK_MAX_ATTEMPTS ошибок помечается как недоставленное.
+        """
+        self.client.patch(f'/courses/sections/{self.section.id}/update/', {'is_public': True}, format='json')
+        self.server.responses = [500]
+        self.assertEqual(deliver_batch(), (0, 1))
+        message = OutboxMessage.objects.get()
+        self.assertEqual((message.status, message.attempts, message.last_error), ('pending', 1, 'DeliveryError: HTTP 500'))
+        self.assertGreater(message.next_attempt_at, message.created_at)
+        self.assertEqual(deliver_batch(), (0, 0))
+
+        self.assertEqual(deliver_batch(now=message.next_attempt_at), (1, 0))
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), ('delivered', 2))
+
+        self.client.patch(f'/courses/sections/{self.section.id}/update/', {'is_public': False}, format='json')
+        self.server.responses = [503, 503]
+        message = OutboxMessage.objects.get(status='pending')
+        deliver_batch()
+        deliver_batch(now=OutboxMessage.objects.get(pk=message.pk).next_attempt_at)
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), ('failed', 2))
+
+    def test_failed_batch_blocks_newer_messages(self):
+        """
+        Проверяет, что пока неудачная пачка ждёт повтора, более новые сообщения того же адреса
+        не отправляются, а уже забранные сообщения не забираются повторно до конца отправки.
+        """
+        for title in ('Один', 'Два', 'Три'):
+            self.client.patch(f'/courses/sections/{self.section.id}/update/', {'title': title}, format='json')
+        self.server.responses = [500]
+        self.assertEqual(deliver_batch(), (0, 2))
+        retry_at = OutboxMessage.objects.order_by('pk')[0].next_attempt_at
+        self.assertEqual(set(OutboxMessage.objects.order_by('pk')[:2].values_list('next_attempt_at', flat=True)),
+                         {retry_at})
+        self.assertEqual(deliver_batch(), (0, 0))
+        self.assertEqual(len(self.server.received), 1)
+
+        self.assertEqual(deliver_pending(), (0, 0))
+        self.assertEqual(deliver_batch(now=retry_at), (2, 0))
+        self.assertEqual(deliver_batch(now=retry_at), (1, 0))
+        self.assertEqual([event['payload']['title'] for event in self.server.events()],
+                         ['Один', 'Два', 'Один', 'Два', 'Три'])
+
+    def test_claim_takes_one_batch_per_endpoint(self):
+        """
+        Проверяет, что за раз у адреса забирается одна пачка, а следующая ждёт окончания её отправки.
+        """
+        for title in ('Один', 'Два', 'Три'):
+            self.client.patch(f'/courses/sections/{self.section.id}/update/', {'title': title}, format='json')
+        chunks = claim_batch()
+        self.assertEqual([[message.payload['title'] for message in chunk] for chunk in chunks], [['Один', 'Два']])
+        self.assertEqual(claim_batch(), [])
+
+    def test_connection_pool_reuses_connections(self):
+        """
+        Проверяет, что пул отправляет несколько запросов через одно постоянное соединение.
+        """
+        pool = ConnectionPool(max_size=1)
+        self.addCleanup(pool.close)
+        self.assertEqual(pool.post(self.server.url, b'{}', {'Content-Type': 'application/json'}), 200)
+        connection = pool.acquire('http', f'127.0.0.1:{self.server.server_address[1]}')
+        pool.release('http', f'127.0.0.1:{self.server.server_address[1]}', connection)
+        self.assertIsNotNone(connection.sock)
+        self.assertEqual(pool.post(self.server.url, b'{}', {'Content-Type': 'application/json'}), 200)
+        self.assertIs(pool.acquire('http', f'127.0.0.1:{self.server.server_address[1]}'), connection)